@@ -10,21 +10,29 @@ root = pathlib.Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root))
 
 import copy
+import hashlib
 import json
 import os
 import pathlib
 import re
 import sys
 import sysconfig
+import threading
 import traceback
 from typing import Any, Optional, Sequence
 
 # Graph integration imports
-from src.graph.graph_database_manager import GraphDatabaseManager
-from src.graph.graph_query_service import GraphQueryService
-# Parser import - adjust based on actual parser module
-# from src.parser.code_parser import CodeParserService
-from src.interfaces import ParsedCodeModel
+from src.graph.graph_database_manager import DEFAULT_POOL_SIZE, GraphDatabaseManager
+from src.graph.graph_query_service import DEFAULT_BATCH_SIZE, GraphQueryService
+from src.graph.in_memory_graph_query_service import InMemoryGraphQueryService
+from src.graph.index_store import UNKNOWN_MTIME, IndexStore, indexedFile
+from src.graph.query_cache import DEFAULT_MAX_ENTRIES as DEFAULT_QUERY_CACHE_SIZE
+from src.graph.lazy_graph_query_service import READY, LazyGraphQueryService
+from src.graph.ingest_cache import DEFAULT_MAX_BYTES, IngestCache, fingerprint
+from src.graph.ingest_queue import DEFAULT_MAX_PENDING, IngestQueue
+from src.graph.workspace_indexer import WorkspaceIndexer
+from src.parser.code_parser import CodeParserService
+from src.interfaces import DEFAULT_DEPENDENTS_DEPTH, DEFAULT_DEPENDENTS_LIMIT, IGraphQueryService, ParsedCodeModel
 
 
 # **********************************************************
@@ -90,6 +98,27 @@ TOOL_DISPLAY = "Analyse"
 # all scenarios.
 TOOL_ARGS = []  # default arguments always passed to your tool.
 
+# "gremlin" (default) talks to the server at GREMLIN_ENDPOINT; "memory" keeps the graph in process.
+GRAPH_BACKEND = os.getenv("GRAPH_BACKEND", "gremlin").lower()
+CODE_PARSER = CodeParserService()
+# Parsed models and last-ingested content hashes, so unchanged documents are not re-ingested.
+INGEST_CACHE = IngestCache(int(os.getenv("GRAPH_PARSE_CACHE_BYTES", DEFAULT_MAX_BYTES)))
+# Graph ingest runs on its own worker so a slow graph server never blocks LSP handlers.
+INGEST_QUEUE = IngestQueue(
+    int(os.getenv("GRAPH_INGEST_QUEUE_SIZE", DEFAULT_MAX_PENDING)),
+    onError=lambda uri, e: log_error(f"[Analyse] Graph ingest job failed for {uri}: {e}"),
+)
+# Idle time after the last edit before a changed document is re-ingested.
+INGEST_DEBOUNCE_SECONDS = int(os.getenv("GRAPH_INGEST_DEBOUNCE_MS", "300")) / 1000.0
+# Latest known version of each open document, so ingests of older snapshots are abandoned.
+DOCUMENT_VERSIONS: dict[str, int] = {}
+# Longest a handler waits for room in a full ingest queue before dropping the update.
+INGEST_SUBMIT_TIMEOUT = 1.0
+# Longest shutdown waits for queued ingests to reach the graph.
+INGEST_FLUSH_TIMEOUT = 10.0
+# The index store is opened by whichever of the graph connection and the indexer needs it first.
+INDEX_STORE_LOCK = threading.Lock()
+
 
 # TODO: If your tool is a linter then update this section.
 # Delete "Linting features" section if your tool is NOT a linter.
@@ -108,7 +137,15 @@ def did_open(params: lsp.DidOpenTextDocumentParams) -> None:
     log_to_output(f"[Analyse] did_open: {document.uri}")
     diagnostics: list[lsp.Diagnostic] = _linting_helper(document)
     LSP_SERVER.publish_diagnostics(document.uri, diagnostics)
-    _handle_graph_ingest(document)
+    _schedule_graph_ingest(document)
+
+
+@LSP_SERVER.feature(lsp.TEXT_DOCUMENT_DID_CHANGE)
+def did_change(params: lsp.DidChangeTextDocumentParams) -> None:
+    """LSP handler for textDocument/didChange request."""
+    document = LSP_SERVER.workspace.get_text_document(params.text_document.uri)
+    # Wait for a pause in typing instead of parsing on every keystroke.
+    _schedule_graph_ingest(document, delay=INGEST_DEBOUNCE_SECONDS)
 
 
 @LSP_SERVER.feature(lsp.TEXT_DOCUMENT_DID_SAVE)
@@ -118,7 +155,7 @@ def did_save(params: lsp.DidSaveTextDocumentParams) -> None:
     log_to_output(f"[Analyse] did_save: {document.uri}")
     diagnostics: list[lsp.Diagnostic] = _linting_helper(document)
     LSP_SERVER.publish_diagnostics(document.uri, diagnostics)
-    _handle_graph_ingest(document)
+    _schedule_graph_ingest(document)
 
 
 @LSP_SERVER.feature(lsp.TEXT_DOCUMENT_DID_CLOSE)
@@ -127,9 +164,61 @@ def did_close(params: lsp.DidCloseTextDocumentParams) -> None:
     document = LSP_SERVER.workspace.get_text_document(params.text_document.uri)
     # Publishing empty diagnostics to clear the entries for this file.
     LSP_SERVER.publish_diagnostics(document.uri, [])
+    DOCUMENT_VERSIONS.pop(document.uri, None)
     # Optionally remove nodes from graph? Could implement cleanup if desired.
     # _handle_graph_remove(document)
 
+
+@LSP_SERVER.feature("analyse/graphStats")
+def graph_stats(_params: Optional[Any] = None) -> dict:
+    """Custom request returning counters of the graph ingest pipeline."""
+    stats = {"ingestCache": INGEST_CACHE.stats(), "ingestQueue": INGEST_QUEUE.stats()}
+    svc = getattr(LSP_SERVER, 'graph_query_service', None)
+    if isinstance(svc, LazyGraphQueryService):
+        stats["graphConnection"] = svc.status()
+    manager = getattr(LSP_SERVER, 'graph_db_manager', None)
+    if manager:
+        stats["connectionPool"] = manager.poolStats()
+    backend = svc.backend if isinstance(svc, LazyGraphQueryService) else svc
+    if isinstance(backend, GraphQueryService):
+        stats["queryCache"] = backend.cache.stats()
+    return stats
+
+
+@LSP_SERVER.feature("analyse/functionCounts")
+def function_counts(_params: Optional[Any] = None) -> dict:
+    """Custom request returning the number of functions per file in the graph."""
+    svc = getattr(LSP_SERVER, 'graph_query_service', None)
+    if not svc:
+        return {}
+    # Columnar, so a large workspace is counted without building a node object per function.
+    return svc.getNodeColumns('Function').countByFile()
+
+
+def _param(params: Any, name: str, default: Any = None) -> Any:
+    # Custom request params arrive as a dict or as pygls' attribute object.
+    if isinstance(params, dict):
+        return params.get(name, default)
+    return getattr(params, name, default)
+
+
+@LSP_SERVER.feature("analyse/transitiveDependents")
+def transitive_dependents(params: Any) -> dict:
+    """Custom request returning the nodes affected by a change to `nodeId`, nearest first."""
+    svc = getattr(LSP_SERVER, 'graph_query_service', None)
+    node_id = _param(params, 'nodeId')
+    if not svc or not node_id:
+        return {}
+    result = svc.getTransitiveDependents(
+        node_id,
+        _param(params, 'edgeTypes'),
+        int(_param(params, 'maxDepth', DEFAULT_DEPENDENTS_DEPTH)),
+        int(_param(params, 'limit', DEFAULT_DEPENDENTS_LIMIT)),
+    )
+    log_to_output(f"[Analyse] {len(result.nodes)} dependents of {node_id} in {result.durationMs:.1f} ms"
+                  f"{' (truncated)' if result.truncated else ''}")
+    return result.model_dump()
+
 # def _handle_graph_ingest(document: workspace.Document) -> None:
 #     """Parse the document and ingest into GraphQueryService."""
 #     try:
@@ -149,6 +238,19 @@ def did_close(params: lsp.DidCloseTextDocumentParams) -> None:
 #     except Exception as e:
 #         log_error(f"Graph ingest failed for {document.path}: {e}")
 
+def _schedule_graph_ingest(document: workspace.Document, delay: float = 0.0) -> None:
+    """Queue the document's current content for ingest on the background worker."""
+    if document.version is not None:
+        DOCUMENT_VERSIONS[document.uri] = document.version
+    # The workspace document is updated in place by later edits, so hand the worker a copy.
+    snapshot = workspace.TextDocument(document.uri, source=document.source, version=document.version)
+    queued = INGEST_QUEUE.submit(
+        document.uri, lambda: _handle_graph_ingest(snapshot), timeout=INGEST_SUBMIT_TIMEOUT, delay=delay
+    )
+    if not queued:
+        log_warning(f"[Analyse] Graph ingest queue is full or closed, skipped {document.path}")
+
+
 def _handle_graph_ingest(document: workspace.Document) -> None:
     """Parse the document and ingest into GraphQueryService."""
     try:
@@ -157,13 +259,44 @@ def _handle_graph_ingest(document: workspace.Document) -> None:
         if not file_path.endswith('.py'):
             log_to_output(f"[Analyse] _handle_graph_ingest skipped (not .py): {file_path}")
             return
+        if _is_superseded(document):
+            return
+        # Content already in the graph (reopened tab, no-op save): nothing to parse or write.
+        digest, size = fingerprint(document.source)
+        if INGEST_CACHE.isIngested(file_path, digest):
+            log_to_output(f"[Analyse] Graph up to date for {file_path}, content unchanged")
+            return
         # Parse document to ParsedCodeModel
-        parsed: ParsedCodeModel = _parse_document_to_model(document)
+        parsed: Optional[ParsedCodeModel] = INGEST_CACHE.getParsed(file_path, digest)
+        if parsed is None:
+            parsed = _parse_document_to_model(document)
+            if parsed:
+                INGEST_CACHE.putParsed(file_path, digest, size, parsed)
         if parsed:
             svc = getattr(LSP_SERVER, 'graph_query_service', None)
+            if _is_superseded(document):
+                return
             if svc:
-                svc.ingestParsedCode(parsed)
-                log_to_output(f"[Analyse] Ingested graph for {file_path}")
+                stats = svc.ingestParsedCode(parsed)
+                INGEST_CACHE.markIngested(file_path, digest)
+                # Editor content may differ from the disk copy the index store describes:
+                # keep the symbols that are now in the graph, but make the next startup
+                # re-read the file.
+                store = getattr(LSP_SERVER, 'index_store', None)
+                if store:
+                    if isinstance(svc, LazyGraphQueryService) and svc.backend is None:
+                        store.remove([file_path])
+                    else:
+                        store.upsertMany([indexedFile(file_path, UNKNOWN_MTIME, size, digest, parsed)])
+                if stats:
+                    mode = "incremental" if stats.incremental else "full"
+                    log_to_output(
+                        f"[Analyse] Ingested graph for {file_path} ({mode}): {stats.vertexCount} vertices, "
+                        f"{stats.edgeCount} edges written, {stats.removedCount} removed in "
+                        f"{stats.requestCount} requests, {stats.durationMs:.1f} ms"
+                    )
+                else:
+                    log_to_output(f"[Analyse] Ingested graph for {file_path}")
             else:
                 log_to_output(f"[Analyse] No graph_query_service available to ingest {file_path}")
         else:
@@ -171,12 +304,19 @@ def _handle_graph_ingest(document: workspace.Document) -> None:
     except Exception as e:
         log_error(f"[Analyse] Graph ingest failed for {file_path}: {e}")
 
+def _is_superseded(document: workspace.Document) -> bool:
+    """True if a newer version of the document has arrived since this snapshot was taken."""
+    latest = DOCUMENT_VERSIONS.get(document.uri)
+    return latest is not None and document.version is not None and document.version < latest
+
+
 def _parse_document_to_model(document: workspace.Document) -> Optional[ParsedCodeModel]:
-    """Stub for parsing document.source into ParsedCodeModel."""
+    """Parse document.source into a ParsedCodeModel."""
     try:
-        # TODO: Replace with actual parsing logic
-        # For example:
-        # return CodeParserService.parse_to_model(document.source, document.path)
+        return CODE_PARSER.parseCode(pathlib.Path(document.path), document.source)
+    except SyntaxError as e:
+        # Expected while a file is being edited; keep the last good graph for it.
+        log_to_output(f"[Analyse] Skipping graph update, syntax error in {document.path}: {e}")
         return None
     except Exception as e:
         log_error(f"Parsing document failed: {e}")
@@ -338,6 +478,7 @@ def initialize(params: lsp.InitializeParams) -> None:
     log_to_output(f"sys.path used to run Server:\r\n   {paths}")
 
     GLOBAL_SETTINGS.update(**params.initialization_options.get("globalSettings", {}))
+    LSP_SERVER.storage_path = params.initialization_options.get("storagePath")
 
     settings = params.initialization_options["settings"]
     _update_workspace_settings(settings)
@@ -350,17 +491,193 @@ def initialize(params: lsp.InitializeParams) -> None:
 
     # Setup GraphDatabaseManager and GraphQueryService
     try:
+        if GRAPH_BACKEND == "memory":
+            LSP_SERVER.graph_query_service = InMemoryGraphQueryService(roots=_get_workspace_roots())
+            log_to_output("Initialized in-memory graph; no Gremlin server is used.")
+            return
         endpoint = os.getenv("GREMLIN_ENDPOINT", "ws://localhost:8182/gremlin")
-        LSP_SERVER.graph_db_manager = GraphDatabaseManager(endpoint)
-        LSP_SERVER.graph_query_service = GraphQueryService(LSP_SERVER.graph_db_manager)
-        log_to_output(f"Initialized GraphQueryService with endpoint {endpoint}")
+        # Absolute imports resolve against these when reference edges are drawn.
+        roots = _get_workspace_roots()
+        # Connecting happens in the background so a slow or unreachable server does not
+        # hold up the initialize response; until then the graph is kept in memory.
+        LSP_SERVER.graph_query_service = LazyGraphQueryService(
+            lambda: _connect_graph(endpoint, roots),
+            connectTimeout=int(os.getenv("GRAPH_CONNECT_TIMEOUT_MS", "10000")) / 1000.0,
+            maxBackoff=int(os.getenv("GRAPH_RECONNECT_MAX_MS", "60000")) / 1000.0,
+            dispose=lambda svc: svc.dbManager.close(),
+            prepare=_seed_graph,
+            onStateChange=_on_graph_state,
+            roots=roots,
+        )
+        LSP_SERVER.graph_query_service.start()
+        log_to_output(f"Connecting to graph at {endpoint} in the background")
     except Exception as e:
         log_error(f"Failed to initialize Graph services: {e}")
 
 
+def _connect_graph(endpoint: str, roots: list[str]) -> GraphQueryService:
+    """Open the Gremlin connection pool and the service on top of it. Runs off the LSP thread."""
+    # Concurrent graph calls (LSP workers, ingest queue, indexer) each borrow a pooled connection.
+    pool_size = int(os.getenv("GRAPH_POOL_SIZE", DEFAULT_POOL_SIZE))
+    manager = GraphDatabaseManager(endpoint, poolSize=pool_size)
+    batch_size = int(os.getenv("GRAPH_INGEST_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+    # "incremental" (default) re-ingests only what changed since the last ingest of a file.
+    incremental = os.getenv("GRAPH_INGEST_MODE", "incremental") != "full"
+    # Snapshot/neighbour results are cached until an ingest touches them; "off" for debugging.
+    cache_size = int(os.getenv("GRAPH_QUERY_CACHE_SIZE", DEFAULT_QUERY_CACHE_SIZE))
+    if os.getenv("GRAPH_QUERY_CACHE", "on") == "off":
+        cache_size = 0
+    return GraphQueryService(manager, batch_size, incremental=incremental,
+                             cacheSize=cache_size, roots=roots)
+
+
+def _seed_graph(service: IGraphQueryService) -> None:
+    """Load the symbols of previously ingested files into a backend that just connected."""
+    # Runs before the backend takes any write, outside the connect timeout: re-ingesting a
+    # file drops the reference edges into it, and only files in the symbol table get theirs
+    # written again.
+    store = _open_index_store()
+    if store:
+        models = [record.model for record in store.loadAll().values() if record.model is not None]
+        seeded = service.seedSymbols(models)
+        log_to_output(f"[Analyse] Loaded symbols of {seeded} previously ingested files")
+
+
+def _open_index_store() -> Optional[IndexStore]:
+    """The persistent index of the workspace's graph, opened on first use; None if unavailable."""
+    with INDEX_STORE_LOCK:
+        store = getattr(LSP_SERVER, 'index_store', None)
+        if store is None:
+            try:
+                store = IndexStore(_get_index_store_path(_get_workspace_roots()))
+            except Exception as e:
+                log_warning(f"[Analyse] Persistent index unavailable: {e}")
+                return None
+            LSP_SERVER.index_store = store
+        return store
+
+
+def _on_graph_state(state: str, error: Optional[Exception]) -> None:
+    if error:
+        log_warning(f"[Analyse] Graph connection attempt failed, retrying: {error}")
+        return
+    if state == READY:
+        # Only the backend that went live; an attempt that timed out is disposed of.
+        LSP_SERVER.graph_db_manager = LSP_SERVER.graph_query_service.backend.dbManager
+    log_to_output(f"[Analyse] Graph connection {state}.")
+
+
+@LSP_SERVER.feature(lsp.INITIALIZED)
+def initialized(_params: lsp.InitializedParams) -> None:
+    """LSP handler for initialized notification."""
+    # Opt-in: index every Python file in the workspace, not just the ones opened.
+    if os.getenv("GRAPH_INDEX_WORKSPACE", "off") != "on":
+        return
+    svc = getattr(LSP_SERVER, 'graph_query_service', None)
+    if not svc:
+        log_warning("[Analyse] Workspace indexing skipped, no graph_query_service available.")
+        return
+    threading.Thread(
+        target=_index_workspace, args=(svc, _get_workspace_roots()), name="graph-index", daemon=True
+    ).start()
+
+
+def _index_workspace(svc: IGraphQueryService, roots: list[str]) -> None:
+    """Parse all workspace files in a process pool and stream them into the graph."""
+    token = "analyse/indexWorkspace"
+    reporter = _ProgressReporter(token, "Indexing Python files")
+    jobs = int(os.getenv("GRAPH_INDEX_JOBS", "0")) or None
+    if isinstance(svc, LazyGraphQueryService) and not svc.waitUntilReady():
+        # The index store must only record what reached the real graph.
+        return
+    # The in-memory graph starts empty, so there is nothing a previous run could vouch for.
+    store = _open_index_store() if GRAPH_BACKEND != "memory" else None
+    indexer = WorkspaceIndexer(
+        svc,
+        jobs=jobs,
+        ingestCache=INGEST_CACHE,
+        indexStore=store,
+        onProgress=reporter.report,
+        # Open documents are kept current by the editor events; their disk copy may be stale.
+        shouldSkip=lambda path: uris.from_fs_path(path) in LSP_SERVER.workspace.text_documents,
+    )
+    LSP_SERVER.workspace_indexer = indexer
+    message = "Indexing failed"
+    try:
+        log_to_output(f"[Analyse] Indexing workspace folders: {roots}")
+        summary = indexer.index(roots)
+        message = f"Indexed {summary.indexed} of {summary.files} files"
+        log_to_output(
+            f"[Analyse] {message} in {summary.durationMs / 1000.0:.1f} s "
+            f"({summary.unchanged} unchanged, {summary.removed} deleted, {summary.requests} graph requests, "
+            f"{summary.failed} failed, {summary.skipped} open in editor)"
+        )
+        for error in summary.errors[:20]:
+            log_to_output(f"[Analyse]   {error}")
+    except Exception as e:
+        log_error(f"[Analyse] Workspace indexing failed: {e}")
+    finally:
+        reporter.end(message)
+
+
+class _ProgressReporter:
+    """Sends $/progress notifications for server-initiated work, if the client supports them."""
+
+    def __init__(self, token: str, title: str):
+        self.token = token
+        self._percentage = -1
+        self._active = False
+        try:
+            window = LSP_SERVER.client_capabilities.window
+            if window and window.work_done_progress:
+                LSP_SERVER.progress.create(token).result(timeout=5)
+                LSP_SERVER.progress.begin(token, lsp.WorkDoneProgressBegin(title=title, percentage=0))
+                self._active = True
+        except Exception as e:
+            log_warning(f"[Analyse] Progress reporting unavailable: {e}")
+
+    def report(self, done: int, total: int) -> None:
+        percentage = int(done * 100 / total) if total else 100
+        # One notification per percent is plenty for a progress bar.
+        if not self._active or percentage == self._percentage:
+            return
+        self._percentage = percentage
+        LSP_SERVER.progress.report(
+            self.token, lsp.WorkDoneProgressReport(message=f"{done}/{total} files", percentage=percentage)
+        )
+
+    def end(self, message: str) -> None:
+        if self._active:
+            LSP_SERVER.progress.end(self.token, lsp.WorkDoneProgressEnd(message=message))
+            self._active = False
+
+
+def _get_index_store_path(roots: list[str]) -> str:
+    """One index file per graph endpoint and set of workspace roots, under the workspace storage."""
+    storage = (
+        getattr(LSP_SERVER, 'storage_path', None)
+        or os.getenv("GRAPH_INDEX_STORE_DIR")
+        or os.path.join(os.path.expanduser("~"), ".cache", "analyse")
+    )
+    endpoint = os.getenv("GREMLIN_ENDPOINT", "ws://localhost:8182/gremlin")
+    key = hashlib.blake2b("\n".join([endpoint] + sorted(roots)).encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(storage, f"graph-index-{key}.sqlite")
+
+
+def _get_workspace_roots() -> list[str]:
+    roots = [s["workspaceFS"] for s in WORKSPACE_SETTINGS.values() if s.get("workspaceFS")]
+    if not roots:
+        roots = [uris.to_fs_path(f.uri) for f in LSP_SERVER.workspace.folders.values()]
+    if not roots and LSP_SERVER.workspace.root_path:
+        roots = [LSP_SERVER.workspace.root_path]
+    return roots
+
+
 @LSP_SERVER.feature(lsp.EXIT)
 def on_exit(_params: Optional[Any] = None) -> None:
     """Handle clean up on exit."""
+    # Normally already drained by shutdown; this covers an exit without a shutdown request.
+    _stop_graph_workers()
     # Close Graph database connection
     try:
         if hasattr(LSP_SERVER, 'graph_db_manager'):
@@ -373,6 +690,8 @@ def on_exit(_params: Optional[Any] = None) -> None:
 @LSP_SERVER.feature(lsp.SHUTDOWN)
 def on_shutdown(_params: Optional[Any] = None) -> None:
     """Handle clean up on shutdown."""
+    # Let queued ingests reach the graph before its connection goes away.
+    _stop_graph_workers()
     # Close Graph database connection
     try:
         if hasattr(LSP_SERVER, 'graph_db_manager'):
@@ -383,6 +702,29 @@ def on_shutdown(_params: Optional[Any] = None) -> None:
     jsonrpc.shutdown_json_rpc()
 
 
+def _stop_graph_workers() -> None:
+    # Writers first, so everything they flush is handed to the service before it closes.
+    indexer = getattr(LSP_SERVER, 'workspace_indexer', None)
+    if indexer:
+        indexer.cancel()
+    if not INGEST_QUEUE.close(flush=True, timeout=INGEST_FLUSH_TIMEOUT):
+        log_warning("[Analyse] Timed out waiting for queued graph ingests to finish.")
+    svc = getattr(LSP_SERVER, 'graph_query_service', None)
+    if isinstance(svc, LazyGraphQueryService):
+        svc.close()
+        # Changes made while still connecting only reached the local graph.
+        status = svc.status()
+        if status['pendingFiles'] or status['pendingRemovals']:
+            log_warning(
+                f"[Analyse] Graph never connected; changes to {status['pendingFiles']} files and "
+                f"{status['pendingRemovals']} node removals were not written."
+            )
+    store = getattr(LSP_SERVER, 'index_store', None)
+    if store:
+        LSP_SERVER.index_store = None
+        store.close()
+
+
 def _get_global_defaults():
     return {
         "path": GLOBAL_SETTINGS.get("path", []),
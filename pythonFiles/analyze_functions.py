@@ -2,49 +2,268 @@ import sys
 import os
 import ast
 import json
+import argparse
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# The directory walk is shared with the workspace indexer under src/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.file_walker import DEFAULT_EXCLUDES, IgnoreRules, walk_python_files  # noqa: E402
+
+# Below this many files a process pool costs more to start than it saves.
+MIN_PARALLEL_FILES = 64
+# Files per task sent to a worker; the walk hands over a chunk as soon as it fills.
+CHUNK_SIZE = 64
+
+# Failures reading or parsing one file; the scan reports them and goes on.
+PARSE_ERRORS = (SyntaxError, ValueError, UnicodeDecodeError, OSError, RecursionError)
+
+
+# Bump when the cached counts would no longer match what count_source returns.
+CACHE_VERSION = 1
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def count_source(file_path, with_hash=False):
+    """
+    (number of top-level functions, None, digest) for a file, or (None, error message,
+    digest). The digest of the content is only computed with `with_hash`.
+    """
+    digest = None
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if with_hash:
+            digest = content_hash(data)
+        node = ast.parse(data.decode('utf-8'), filename=file_path)
+    except PARSE_ERRORS as e:
+        return None, f"{type(e).__name__}: {e}", digest
+    return sum(isinstance(n, ast.FunctionDef) for n in node.body), None, digest
+
+
+def count_chunk(file_paths, with_hash=False):
+    """count_source for each path of a chunk; runs in a worker process."""
+    return [count_source(path, with_hash) for path in file_paths]
+
+
+class CountCache:
+    """
+    Per-file results of earlier scans, kept in a JSON file between runs.
+
+    Entries are keyed by absolute path and valid while the file's mtime_ns and size are
+    unchanged, so an unchanged file costs one stat(). With `verify_hash` a matching
+    entry must also match a hash of the file's content, which catches edits that keep
+    both (at the cost of reading every file, though still not parsing it).
+    """
+    def __init__(self, path, verify_hash=False):
+        self.path = path
+        self.verify_hash = verify_hash
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._dirty = False
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if isinstance(data, dict) and data.get('version') == CACHE_VERSION:
+            self._entries = data.get('files') or {}
+        return self
+
+    def lookup(self, full_path, st):
+        """The cached (count, error) for a file with stat result `st`, or None."""
+        entry = self._entries.get(os.path.abspath(full_path))
+        if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+            self.misses += 1
+            return None
+        if self.verify_hash:
+            try:
+                with open(full_path, 'rb') as f:
+                    digest = content_hash(f.read())
+            except OSError:
+                digest = None
+            if digest is None or digest != entry[4]:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry[2], entry[3]
+
+    def store(self, full_path, st, count, error, digest):
+        self._entries[os.path.abspath(full_path)] = [st.st_mtime_ns, st.st_size, count, error, digest]
+        self._dirty = True
+
+    def prune(self, base_path, seen):
+        """Drop the entries under `base_path` whose files were not seen in the scan."""
+        prefix = os.path.join(os.path.abspath(base_path), '')
+        keep = {os.path.abspath(p) for p in seen}
+        for path in [p for p in self._entries if p.startswith(prefix) and p not in keep]:
+            del self._entries[path]
+            self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temp = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'files': self._entries}, f, separators=(',', ':'))
+        # Readers see the old file or the new one, never half of one.
+        os.replace(temp, self.path)
+        self._dirty = False
+
 
 class FunctionCounter:
     """Recursively scan a directory and count top-level functions in .py files."""
-    def __init__(self, base_path):
+    def __init__(self, base_path, jobs=1, cache=None, excludes=DEFAULT_EXCLUDES, use_gitignore=True):
         self.base_path = base_path
+        self.jobs = max(1, jobs or 1)
+        # Optional CountCache; files it knows unchanged are not read again.
+        self.cache = cache
+        self.excludes = excludes
+        self.use_gitignore = use_gitignore
+        # (relative path, message) of the files that could not be parsed in the last scan.
+        self.errors = []
 
     def count_in_file(self, file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                node = ast.parse(f.read(), filename=file_path)
-        except (SyntaxError, UnicodeDecodeError):
-            return None
-        count = sum(isinstance(n, ast.FunctionDef) for n in node.body)
-        return count
+        return count_source(file_path)[0]
+
+    def python_files(self):
+        """(full path, relative path, DirEntry) of every .py file not excluded, as walked."""
+        return walk_python_files(self.base_path, self.excludes, self.use_gitignore)
 
     def scan(self):
+        """
+        Counts by relative path, in walk order. Files are handed to the parser in chunks
+        as the walk finds them; with jobs > 1 the chunks go to a process pool, started
+        once there are enough files to be worth it.
+        """
+        with_hash = self.cache is not None and self.cache.verify_hash
+        paths, rel_paths, counts = [], [], []
+        # (indices, paths, stats, list of results or a Future of one) per chunk sent.
+        batches = []
+        chunk = ([], [], [])
+        sent = 0
+        pool = None
+        try:
+            for full_path, rel_path, entry in self.python_files():
+                index = len(paths)
+                paths.append(full_path)
+                rel_paths.append(rel_path)
+                st = self._stat(entry) if self.cache is not None else None
+                cached = self.cache.lookup(full_path, st) if st is not None else None
+                counts.append(cached)
+                if cached is not None:
+                    continue
+                for column, value in zip(chunk, (index, full_path, st)):
+                    column.append(value)
+                if len(chunk[0]) >= CHUNK_SIZE:
+                    sent += len(chunk[0])
+                    pool = self._send(pool, batches, chunk, sent, with_hash)
+                    chunk = ([], [], [])
+            if chunk[0]:
+                sent += len(chunk[0])
+                pool = self._send(pool, batches, chunk, sent, with_hash)
+            self._collect(batches, counts, with_hash)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if self.cache is not None:
+            self.cache.prune(self.base_path, paths)
+        # Merged in walk order whatever order the workers finished in, so the output
+        # does not depend on --jobs or on what was cached.
         result = {}
-        for root, dirs, files in os.walk(self.base_path):
-            rel_root = os.path.relpath(root, self.base_path)
-            for fname in files:
-                if fname.endswith('.py'):
-                    full_path = os.path.join(root, fname)
-                    count = self.count_in_file(full_path)
-                    if count is None:
-                        continue
-                    if rel_root == '.' or rel_root == '':
-                        rel_path = fname
-                    else:
-                        rel_path = os.path.join(rel_root, fname)
-                    result[rel_path] = count
+        self.errors = []
+        for rel_path, (count, error) in zip(rel_paths, counts):
+            if count is None:
+                self.errors.append((rel_path, error))
+            else:
+                result[rel_path] = count
         return result
 
-def main():
-    if len(sys.argv) < 2:
+    def _send(self, pool, batches, chunk, sent, with_hash):
+        indices, paths, stats = chunk
+        if pool is None and self.jobs > 1 and sent >= MIN_PARALLEL_FILES:
+            pool = ProcessPoolExecutor(max_workers=self.jobs)
+        if pool is None:
+            batches.append((indices, paths, stats, count_chunk(paths, with_hash)))
+        else:
+            batches.append((indices, paths, stats, pool.submit(count_chunk, paths, with_hash)))
+        return pool
+
+    def _collect(self, batches, counts, with_hash):
+        broken = False
+        for indices, paths, stats, pending in batches:
+            if isinstance(pending, list):
+                fresh = pending
+            else:
+                try:
+                    fresh = pending.result()
+                except BrokenProcessPool as e:
+                    # A worker died (e.g. out of memory); finish the scan in this process.
+                    if not broken:
+                        print(f"Parallel scan failed ({e}); scanning serially", file=sys.stderr)
+                        broken = True
+                    fresh = count_chunk(paths, with_hash)
+            for index, path, st, (count, error, digest) in zip(indices, paths, stats, fresh):
+                counts[index] = (count, error)
+                if self.cache is not None and st is not None:
+                    self.cache.store(path, st, count, error, digest)
+
+    @staticmethod
+    def _stat(entry):
+        try:
+            return entry.stat()
+        except OSError:
+            return None
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Count top-level functions in the .py files of a folder.")
+    parser.add_argument('folder', nargs='?', help="Folder to scan.")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes to parse with (default: CPU count; 1 scans serially).")
+    parser.add_argument('--exclude', action='append', default=[], metavar='PATTERN',
+                        help="Skip paths matching this .gitignore-style pattern (repeatable), "
+                             "on top of .git, node_modules, virtualenvs, build output and caches.")
+    parser.add_argument('--no-gitignore', action='store_true',
+                        help="Do not read .gitignore files.")
+    parser.add_argument('--cache', metavar='FILE',
+                        help="Keep per-file counts in FILE and only re-parse files whose mtime or size changed.")
+    parser.add_argument('--verify-hash', action='store_true',
+                        help="With --cache, also compare a hash of each file's content before trusting its entry.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    folder = args.folder
+    if not folder:
         print(json.dumps({"error": "No folder path provided"}))
         sys.exit(1)
-    folder = sys.argv[1]
     if not os.path.isdir(folder):
         print(json.dumps({"error": f"Not a directory: {folder}"}))
         sys.exit(1)
-    counter = FunctionCounter(folder)
+    cache = CountCache(args.cache, verify_hash=args.verify_hash).load() if args.cache else None
+    counter = FunctionCounter(folder, jobs=args.jobs, cache=cache,
+                              excludes=DEFAULT_EXCLUDES + tuple(args.exclude),
+                              use_gitignore=not args.no_gitignore)
     data = counter.scan()
+    if cache is not None:
+        try:
+            cache.save()
+        except OSError as e:
+            print(f"Could not write cache {args.cache}: {e}", file=sys.stderr)
+    for rel_path, error in counter.errors:
+        print(f"Skipped {rel_path}: {error}", file=sys.stderr)
     print(json.dumps(data))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,193 @@
+# src/columnar.py
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional; columns are then used as plain arrays
+    np = None
+
+# Stands in for a missing line number or file in the integer columns.
+MISSING = -1
+
+
+class _Interner:
+    """Maps repeated strings to small indices into a table of distinct values."""
+    __slots__ = ('table', '_index')
+
+    def __init__(self):
+        self.table: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def __call__(self, value: Optional[str]) -> int:
+        if not value:
+            return MISSING
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.table)
+            self.table.append(value)
+        return index
+
+
+def _endLine(properties: Any) -> Any:
+    # Models carry a dict, NodeRecords a tuple of pairs.
+    if isinstance(properties, dict):
+        return properties.get('endLine')
+    for key, value in properties:
+        if key == 'endLine':
+            return value
+    return None
+
+
+class NodeColumns:
+    """
+    Nodes as parallel columns rather than a list of objects, for bulk consumers.
+
+    Row i is ids[i], names[i], typeTable[typeIndex[i]], fileTable[fileIndex[i]],
+    startLines[i] and endLines[i]. Types and file paths are interned into tables, and
+    the integer columns are compact `array('q')`s (MISSING where a value is absent).
+    With NumPy installed, toNumpy() gives zero-copy arrays for vectorized filtering
+    and aggregation.
+    """
+    __slots__ = ('ids', 'names', 'typeIndex', 'typeTable', 'fileIndex', 'fileTable',
+                 'startLines', 'endLines', '_types', '_files')
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.typeIndex = array('q')
+        self.fileIndex = array('q')
+        self.startLines = array('q')
+        self.endLines = array('q')
+        self._types = _Interner()
+        self._files = _Interner()
+        self.typeTable = self._types.table
+        self.fileTable = self._files.table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, id: str, type: str, name: str, filePath: Optional[str],
+               startLine: Optional[int], endLine: Optional[int]) -> None:
+        self.ids.append(id)
+        self.names.append(name)
+        self.typeIndex.append(self._types(type))
+        self.fileIndex.append(self._files(filePath))
+        self.startLines.append(MISSING if startLine is None else int(startLine))
+        self.endLines.append(MISSING if endLine is None else int(endLine))
+
+    @classmethod
+    def fromNodes(cls, nodes: Iterable[Any]) -> 'NodeColumns':
+        """Columns of GraphNodeData models or NodeRecords; endLine is read from properties."""
+        columns = cls()
+        append = columns.append
+        for node in nodes:
+            append(node.id, node.type, node.name, node.filePath, node.startLine, _endLine(node.properties))
+        return columns
+
+    @classmethod
+    def fromRows(cls, rows: Iterable[Dict[str, Any]]) -> 'NodeColumns':
+        """Columns of flat dicts with id, type, name, filePath, startLine and endLine keys."""
+        columns = cls()
+        append = columns.append
+        for row in rows:
+            append(row['id'], row['type'], row['name'], row['filePath'], row['startLine'], row['endLine'])
+        return columns
+
+    def typeCode(self, nodeType: str) -> int:
+        """Index of `nodeType` in typeTable, or MISSING if no node has it."""
+        return self._types._index.get(nodeType, MISSING)
+
+    def countByFile(self, nodeType: Optional[str] = None) -> Dict[str, int]:
+        """Number of nodes, optionally of one type, per file path. Files with none are left out."""
+        code = None if nodeType is None else self.typeCode(nodeType)
+        if code == MISSING:
+            return {}
+        if np is not None:
+            files = np.frombuffer(self.fileIndex, dtype=np.int64)
+            if code is not None:
+                files = files[np.frombuffer(self.typeIndex, dtype=np.int64) == code]
+            counts = np.bincount(files[files != MISSING], minlength=len(self.fileTable))
+            return {self.fileTable[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+        if code is None:
+            counts = Counter(self.fileIndex)
+        else:
+            counts = Counter(f for f, t in zip(self.fileIndex, self.typeIndex) if t == code)
+        counts.pop(MISSING, None)
+        return {self.fileTable[i]: n for i, n in sorted(counts.items())}
+
+    def toNumpy(self) -> Dict[str, Any]:
+        """The integer columns as NumPy arrays sharing memory with these columns."""
+        if np is None:
+            raise RuntimeError("NumPy is not installed")
+        return {
+            'typeIndex': np.frombuffer(self.typeIndex, dtype=np.int64),
+            'fileIndex': np.frombuffer(self.fileIndex, dtype=np.int64),
+            'startLines': np.frombuffer(self.startLines, dtype=np.int64),
+            'endLines': np.frombuffer(self.endLines, dtype=np.int64),
+        }
+
+    def toDict(self) -> Dict[str, Any]:
+        """JSON-ready form, e.g. for an LSP response."""
+        return {
+            'ids': self.ids,
+            'names': self.names,
+            'typeIndex': self.typeIndex.tolist(),
+            'typeTable': self.typeTable,
+            'fileIndex': self.fileIndex.tolist(),
+            'fileTable': self.fileTable,
+            'startLines': self.startLines.tolist(),
+            'endLines': self.endLines.tolist(),
+        }
+
+
+class EdgeColumns:
+    """
+    Edges as parallel columns: sourceIndex[i] and targetIndex[i] are row numbers in the
+    NodeColumns of the same result (MISSING if that end is not among them), and the
+    edge type is typeTable[typeIndex[i]].
+    """
+    __slots__ = ('sourceIndex', 'targetIndex', 'typeIndex', 'typeTable', '_types')
+
+    def __init__(self):
+        self.sourceIndex = array('q')
+        self.targetIndex = array('q')
+        self.typeIndex = array('q')
+        self._types = _Interner()
+        self.typeTable = self._types.table
+
+    def __len__(self) -> int:
+        return len(self.typeIndex)
+
+    @classmethod
+    def fromEdges(cls, edges: Iterable[Any], nodes: NodeColumns) -> 'EdgeColumns':
+        """Columns of GraphEdgeData models or EdgeRecords, indexed against `nodes`."""
+        return cls.fromTriples(((e.sourceId, e.targetId, e.type) for e in edges), nodes)
+
+    @classmethod
+    def fromTriples(cls, triples: Iterable[Any], nodes: NodeColumns) -> 'EdgeColumns':
+        columns = cls()
+        row = {node_id: i for i, node_id in enumerate(nodes.ids)}
+        for source, target, edge_type in triples:
+            columns.sourceIndex.append(row.get(source, MISSING))
+            columns.targetIndex.append(row.get(target, MISSING))
+            columns.typeIndex.append(columns._types(edge_type))
+        return columns
+
+    def toNumpy(self) -> Dict[str, Any]:
+        if np is None:
+            raise RuntimeError("NumPy is not installed")
+        return {
+            'sourceIndex': np.frombuffer(self.sourceIndex, dtype=np.int64),
+            'targetIndex': np.frombuffer(self.targetIndex, dtype=np.int64),
+            'typeIndex': np.frombuffer(self.typeIndex, dtype=np.int64),
+        }
+
+    def toDict(self) -> Dict[str, Any]:
+        return {
+            'sourceIndex': self.sourceIndex.tolist(),
+            'targetIndex': self.targetIndex.tolist(),
+            'typeIndex': self.typeIndex.tolist(),
+            'typeTable': self.typeTable,
+        }
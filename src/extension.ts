@@ -290,7 +290,9 @@ export async function activate(context: vscode.ExtensionContext): Promise<void>
 
             // 3. Spawn Python subprocess
             const pythonExec = 'python'; // or fetch from setting
-            const proc = cp.spawn(pythonExec, [scriptPath, folderPath]);
+            // Per-file counts from earlier runs; only changed files are parsed again.
+            const cachePath = path.join(context.globalStorageUri.fsPath, 'function-counts.json');
+            const proc = cp.spawn(pythonExec, [scriptPath, folderPath, '--cache', cachePath]);
 
             let stdout = '';
             let stderr = '';
@@ -405,6 +407,8 @@ export async function activate(context: vscode.ExtensionContext): Promise<void>
         documentSelector: [{ scheme: 'file', language: 'python' }],
         initializationOptions: {
             // pass any globalSettings or custom options here
+            // Where the server keeps its persistent graph index.
+            storagePath: (context.storageUri ?? context.globalStorageUri).fsPath,
         },
         outputChannel: outputChannel,
         // synchronize: { fileEvents: vscode.workspace.createFileSystemWatcher('**/*.py') },
@@ -0,0 +1,157 @@
+# src/file_walker.py
+# The .py file walk shared by the "Analyze Functions" script and the workspace indexer,
+# so both skip the same directories.
+import os
+import re
+
+# Directories not worth descending into, in .gitignore syntax; callers may add more.
+DEFAULT_EXCLUDES = (
+    '.git/', '.hg/', '.svn/', 'node_modules/', '__pycache__/', '.venv/', 'venv/',
+    '.tox/', '.nox/', '.mypy_cache/', '.pytest_cache/', 'build/', 'dist/',
+    '*.egg-info/', 'site-packages/',
+)
+
+
+class IgnoreRules:
+    """
+    .gitignore-style patterns, matched against '/'-separated paths relative to `base`.
+
+    Blank lines and '#' comments are skipped, '!' re-includes, a trailing '/' matches
+    directories only, and a pattern with a '/' other than a trailing one is anchored
+    at `base`; otherwise it matches a name at any depth. '*', '?', '[...]' and '**'
+    behave as in git. The last matching pattern decides.
+    """
+    def __init__(self, patterns, base=''):
+        self.base = base
+        self.rules = [rule for rule in map(self._compile, patterns) if rule is not None]
+
+    @classmethod
+    def from_file(cls, path, base):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return cls(f.read().splitlines(), base)
+        except OSError:
+            return None
+
+    def match(self, rel_path, is_dir):
+        """True if ignored, False if re-included, None if no pattern matches."""
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        decision = None
+        for regex, negate, dir_only in self.rules:
+            if (is_dir or not dir_only) and regex.match(rel_path):
+                decision = not negate
+        return decision
+
+    @classmethod
+    def _compile(cls, pattern):
+        pattern = pattern.rstrip('\r')
+        if not pattern.strip() or pattern.startswith('#'):
+            return None
+        negate = pattern.startswith('!')
+        if negate:
+            pattern = pattern[1:]
+        elif pattern.startswith(('\\!', '\\#')):
+            pattern = pattern[1:]
+        # Trailing spaces are ignored unless escaped.
+        if not pattern.endswith('\\ '):
+            pattern = pattern.rstrip(' ')
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        if not pattern:
+            return None
+        anchored = '/' in pattern
+        body = cls._translate(pattern.lstrip('/'))
+        return re.compile(('' if anchored else '(?:.*/)?') + body + '$', re.DOTALL), negate, dir_only
+
+    @staticmethod
+    def _translate(pattern):
+        out = []
+        i, n = 0, len(pattern)
+        while i < n:
+            c = pattern[i]
+            if pattern.startswith('**/', i):
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i):
+                out.append('.*')
+                i += 2
+                continue
+            if c == '*':
+                out.append('[^/]*')
+            elif c == '?':
+                out.append('[^/]')
+            elif c == '[' and pattern.find(']', i + 2) != -1:
+                end = pattern.find(']', i + 2)
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end + 1
+                continue
+            elif c == '\\' and i + 1 < n:
+                out.append(re.escape(pattern[i + 1]))
+                i += 2
+                continue
+            else:
+                out.append(re.escape(c))
+            i += 1
+        return ''.join(out)
+
+
+def walk_python_files(base_path, excludes=DEFAULT_EXCLUDES, use_gitignore=True):
+    """
+    Yield (full path, path relative to base_path, os.DirEntry) for every .py file under
+    base_path, files of a directory before its subdirectories, names in sorted order.
+
+    Built on os.scandir: directories matched by `excludes` or a .gitignore, and
+    virtualenvs (those holding a pyvenv.cfg), are pruned before being listed. Being a
+    generator, it lets the caller start on the first files while the walk goes on.
+    """
+    excluded = IgnoreRules(excludes)
+    # (directory relative to base_path, its rules); deeper .gitignore files come later.
+    stack = [('', [])]
+    while stack:
+        rel_dir, rules = stack.pop()
+        directory = os.path.join(base_path, rel_dir) if rel_dir else base_path
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        names = {entry.name for entry in entries}
+        if rel_dir and 'pyvenv.cfg' in names:
+            continue
+        if use_gitignore and '.gitignore' in names:
+            own = IgnoreRules.from_file(os.path.join(directory, '.gitignore'), rel_dir)
+            if own is not None:
+                rules = rules + [own]
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if not is_dir and not entry.name.endswith('.py'):
+                continue
+            if _ignored(rel_path, is_dir, excluded, rules):
+                continue
+            if is_dir:
+                subdirs.append(rel_path)
+            elif entry.is_file():
+                yield entry.path, rel_path.replace('/', os.sep), entry
+        stack.extend((subdir, rules) for subdir in reversed(subdirs))
+
+
+def _ignored(rel_path, is_dir, excluded, rules):
+    decision = None
+    for rule_set in rules:
+        matched = rule_set.match(rel_path, is_dir)
+        if matched is not None:
+            decision = matched
+    # The exclude list has the last word over .gitignore re-includes.
+    return bool(decision) or bool(excluded.match(rel_path, is_dir))
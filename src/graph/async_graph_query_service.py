@@ -0,0 +1,160 @@
+# src/graph/async_graph_query_service.py
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+from src.interfaces import (DEFAULT_DEPENDENTS_DEPTH, DEFAULT_DEPENDENTS_LIMIT, DEFAULT_PAGE_SIZE, DependentsResult,
+                            ParsedCodeModel, GraphNodeData, IngestStats, NodePage)
+from src.columnar import NodeColumns
+from src.graph.graph_database_manager import GraphDatabaseManager
+from src.graph.graph_query_service import DEFAULT_BATCH_SIZE, GraphQueryService
+from src.graph.query_cache import DEFAULT_MAX_ENTRIES
+
+# Traversals in flight at once. The driver's connection holds 8 websockets by default and
+# a submission beyond that blocks the calling thread, which here would be the event loop.
+DEFAULT_MAX_IN_FLIGHT = 8
+
+
+class AsyncGraphQueryService:
+    """
+    Coroutine counterpart of GraphQueryService for callers running on an asyncio loop
+    (such as pygls async handlers). Traversals are submitted with the driver's
+    futures-based promise() and awaited, so no thread is held while the server works
+    and many queries can be in flight at once.
+
+    Offers the same methods as IGraphQueryService, as coroutines; it does not subclass
+    it because the signatures differ. Mutation planning, incremental state and result
+    decoding are those of the wrapped GraphQueryService.
+    """
+
+    def __init__(self, dbManager: GraphDatabaseManager, batchSize: int = DEFAULT_BATCH_SIZE,
+                 incremental: bool = False, maxInFlight: int = DEFAULT_MAX_IN_FLIGHT,
+                 cacheSize: int = DEFAULT_MAX_ENTRIES, roots: Iterable[str] = ()):
+        self.sync = GraphQueryService(dbManager, batchSize, incremental, cacheSize, roots)
+        self.g = dbManager.getClient()
+        self.maxInFlight = max(1, maxInFlight)
+        # Created on first use, inside the loop that will await them.
+        self._slots: Optional[asyncio.Semaphore] = None
+        # The coroutine counterpart of GraphQueryService.writeLock, which would block the
+        # loop: one ingest at a time from plan to state update.
+        self._writer: Optional[asyncio.Lock] = None
+
+    async def ingestParsedCode(self, parsedCode: ParsedCodeModel) -> IngestStats:
+        started = time.perf_counter()
+        async with self._writeLock():
+            mutations, stats, recreated = self.sync._planIngest(parsedCode)
+            plan = self.sync._planReferences([parsedCode], recreated, mutations, stats)
+            try:
+                stats.requestCount = await self._submitMutations(mutations)
+            finally:
+                self.sync._invalidate([parsedCode], plan.nodeIds())
+            self.sync._remember(parsedCode)
+        stats.durationMs = (time.perf_counter() - started) * 1000.0
+        return stats
+
+    async def ingestParsedCodeBatch(self, parsedCodes: List[ParsedCodeModel]) -> IngestStats:
+        started = time.perf_counter()
+        async with self._writeLock():
+            mutations, batch, plan = self.sync._planBatch(parsedCodes)
+            try:
+                batch.requestCount = await self._submitMutations(mutations)
+            finally:
+                self.sync._invalidate(parsedCodes, plan.nodeIds())
+            for parsedCode in parsedCodes:
+                self.sync._remember(parsedCode)
+        batch.durationMs = (time.perf_counter() - started) * 1000.0
+        return batch
+
+    async def getAllNodes(self, nodeType: Optional[str] = None, fields: Optional[List[str]] = None) -> List[GraphNodeData]:
+        results = await self._toList(self.sync._allNodesTraversal(self.g, nodeType, fields))
+        return self.sync.decoder.decodeVertices(results)
+
+    async def getNodesPage(self, nodeType: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                           after: Optional[str] = None, fields: Optional[List[str]] = None) -> NodePage:
+        results = await self._toList(self.sync._nodesPageTraversal(self.g, nodeType, limit, after, fields))
+        return self.sync._decodePage(results, limit, self.sync.decoder)
+
+    async def iterNodes(self, nodeType: Optional[str] = None,
+                        pageSize: int = DEFAULT_PAGE_SIZE,
+                        fields: Optional[List[str]] = None) -> AsyncIterator[GraphNodeData]:
+        after = None
+        while True:
+            page = await self.getNodesPage(nodeType, pageSize, after, fields)
+            for node in page.nodes:
+                yield node
+            if page.nextCursor is None:
+                return
+            after = page.nextCursor
+
+    async def getConnectedNodes(self, nodeId: str, edgeType: Optional[str] = None, fields: Optional[List[str]] = None) -> List[GraphNodeData]:
+        async def fetch() -> List[GraphNodeData]:
+            results = await self._toList(self.sync._connectedNodesTraversal(self.g, nodeId, edgeType, fields))
+            return self.sync.decoder.decodeVertices(results)
+        nodes = await self._readThrough(self.sync._connectedKey(nodeId, edgeType, fields), fetch,
+                                        lambda nodes: self.sync._connectedDeps(nodeId, nodes))
+        return list(nodes)
+
+    async def getCodeGraphSnapshot(self, filePath: str, hops: int = 0, limit: Optional[int] = None,
+                                   fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        async def fetch() -> Dict[str, Any]:
+            results = await self._toList(self.sync._snapshotTraversal(self.g, filePath, hops, limit, fields))
+            return self.sync._decodeSnapshot(results[0] if results else {}, limit, self.sync.decoder)
+        snapshot = await self._readThrough(self.sync._snapshotKey(filePath, hops, limit, fields), fetch,
+                                           lambda snapshot: self.sync._snapshotDeps(filePath, snapshot))
+        return self.sync._copySnapshot(snapshot)
+
+    async def getTransitiveDependents(self, nodeId: str, edgeTypes: Optional[List[str]] = None,
+                                      maxDepth: int = DEFAULT_DEPENDENTS_DEPTH,
+                                      limit: int = DEFAULT_DEPENDENTS_LIMIT) -> DependentsResult:
+        if maxDepth < 1:
+            return DependentsResult(nodeId=nodeId, nodes=[], depths={}, truncated=False)
+        started = time.perf_counter()
+        results = await self._toList(self.sync._dependentsTraversal(self.g, nodeId, edgeTypes, maxDepth, limit))
+        result = self.sync._decodeDependents(nodeId, results, limit, self.sync.decoder)
+        result.durationMs = (time.perf_counter() - started) * 1000.0
+        return result
+
+    async def getNodeColumns(self, nodeType: Optional[str] = None) -> NodeColumns:
+        results = await self._toList(self.sync._nodeColumnsTraversal(self.g, nodeType))
+        return NodeColumns.fromRows(results)
+
+    async def getCodeGraphSnapshotColumns(self, filePath: str, hops: int = 0,
+                                          limit: Optional[int] = None) -> Dict[str, Any]:
+        traversal = self.sync._snapshotTraversal(self.g, filePath, hops, limit, nodeRow=self.sync._columnRow())
+        results = await self._toList(traversal)
+        return self.sync._decodeSnapshotColumns(results[0] if results else {}, limit)
+
+    async def _readThrough(self, key: Any, fetch: Callable[[], Awaitable[Any]], deps: Callable[[Any], Any]) -> Any:
+        # Same cache as the wrapped GraphQueryService, so both see each other's ingests.
+        cache = self.sync.cache
+        if not cache.enabled:
+            return await fetch()
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        token = cache.begin()
+        value = await fetch()
+        node_ids, file_paths, volatile = deps(value)
+        cache.put(key, value, token, node_ids, file_paths, volatile)
+        return value
+
+    async def _submitMutations(self, mutations: List[Any]) -> int:
+        # Chunks run one after another: a later chunk may add what an earlier one dropped.
+        requests = 0
+        for traversal in self.sync._mutationChunks(self.g, mutations):
+            await self._run(traversal, lambda t: t.iterate())
+            requests += 1
+        return requests
+
+    def _writeLock(self) -> asyncio.Lock:
+        if self._writer is None:
+            self._writer = asyncio.Lock()
+        return self._writer
+
+    async def _toList(self, traversal: Any) -> List[Any]:
+        return await self._run(traversal, lambda t: t.to_list())
+
+    async def _run(self, traversal: Any, collect: Callable[[Any], Any]) -> Any:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.maxInFlight)
+        async with self._slots:
+            return await asyncio.wrap_future(traversal.promise(collect))
@@ -0,0 +1,55 @@
+# src/graph/benchmark_records.py
+"""
+Memory benchmark for holding graph nodes as GraphNodeData models versus NodeRecords.
+
+Run from the extension root:
+    python -m src.graph.benchmark_records [--nodes 200000]
+
+Prints the bytes allocated per node for each representation, as measured by tracemalloc.
+"""
+import argparse
+import sys
+import tracemalloc
+from typing import Any, Callable, List
+
+from src.interfaces import GraphNodeData
+from src.graph.records import NodeRecord
+
+
+def measure(build: Callable[[int], Any], count: int) -> float:
+    """Bytes per node still allocated after building `count` nodes with `build`."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        nodes: List[Any] = [build(i) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del nodes
+    return (after - before) / count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nodes', type=int, default=200000, help='Number of nodes to hold.')
+    args = parser.parse_args(argv)
+
+    # Ids and names are unique per node; file paths and labels are shared, as after an ingest.
+    paths = [f"/src/module_{i}.py" for i in range(args.nodes // 50 + 1)]
+    ids = [f"fn:/src/module_{i // 50}.py::sym_{i}" for i in range(args.nodes)]
+    names = [f"sym_{i}" for i in range(args.nodes)]
+
+    model = measure(lambda i: GraphNodeData(
+        id=ids[i], type='Function', name=names[i], filePath=paths[i // 50],
+        startLine=i % 400, properties={'endLine': i % 400 + 12},
+    ), args.nodes)
+    record = measure(lambda i: NodeRecord(
+        ids[i], 'Function', names[i], paths[i // 50], i % 400, (('endLine', i % 400 + 12),),
+    ), args.nodes)
+    print(f"GraphNodeData {model:8.1f} bytes/node")
+    print(f"NodeRecord    {record:8.1f} bytes/node  ({model / record:.1f}x smaller)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,50 @@
 from gremlin_python.driver.driver_remote_connection import DriverRemoteConnection
+from gremlin_python.driver.protocol import GremlinServerError
 from gremlin_python.process.anonymous_traversal import traversal
 from gremlin_python.structure.graph import Graph
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+import threading
 import time
 
+# Connections kept to the Gremlin server, i.e. traversals that can run at the same time.
+DEFAULT_POOL_SIZE = 4
+# A pooled connection idle for longer than this is pinged before it is handed out.
+DEFAULT_HEALTH_CHECK_SECONDS = 30.0
+
+
+class _PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.g = traversal().with_remote(connection)
+        self.lastUsed = time.monotonic()
+
 
 class GraphDatabaseManager:
-    def __init__(self, endpoint: str = 'ws://localhost:8182/gremlin', use_in_memory: bool = False):
+    def __init__(self, endpoint: str = 'ws://localhost:8182/gremlin', use_in_memory: bool = False,
+                 poolSize: int = DEFAULT_POOL_SIZE,
+                 healthCheckSeconds: float = DEFAULT_HEALTH_CHECK_SECONDS,
+                 connectionFactory: Optional[Callable[[], object]] = None):
         """
         Connect to Gremlin Server at the given WebSocket endpoint or use in-memory graph.
+
+        Besides the shared connection behind getClient(), up to `poolSize` pooled
+        connections are opened on demand; `checkout()` lends one to a single caller at a
+        time, so traversals from different threads run concurrently on the server.
         """
         self.use_in_memory = use_in_memory
-        
+        self.endpoint = endpoint
+        self.poolSize = max(1, poolSize)
+        self.healthCheckSeconds = healthCheckSeconds
+        self._connectionFactory = connectionFactory or (lambda: DriverRemoteConnection(endpoint, 'g', pool_size=1))
+        self._cond = threading.Condition()
+        self._idle: List[_PooledConnection] = []
+        self._open = 0
+        self._closed = False
+        self.checkouts = 0
+        self.waits = 0
+        self.replaced = 0
+
         if use_in_memory:
             # Use TinkerGraph for testing
             self.graph = Graph()
@@ -20,7 +54,7 @@ class GraphDatabaseManager:
             try:
                 print(f"Attempting to connect to Gremlin server at {endpoint}")
                 # 'g' is the traversal source configured in the server
-                self.connection = DriverRemoteConnection(endpoint, 'g')
+                self.connection = connectionFactory() if connectionFactory else DriverRemoteConnection(endpoint, 'g')
                 # Use the recommended way to create a remote traversal source
                 self.g = traversal().with_remote(self.connection)
                 self.graph = None
@@ -38,16 +72,121 @@ class GraphDatabaseManager:
     def getClient(self):
         """
         Returns the Gremlin traversal source for queries and mutations.
+        It is shared by every caller; prefer checkout() for work that may run concurrently.
         """
         return self.g
 
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[object]:
+        """
+        Borrow a pooled connection's traversal source for the duration of the block.
+        Blocks while all `poolSize` connections are in use, raising TimeoutError after
+        `timeout` seconds. A connection that fails with anything other than a server-side
+        query error is closed and replaced.
+        """
+        if self.use_in_memory:
+            yield self.g
+            return
+        pooled = self._acquire(timeout)
+        healthy = True
+        try:
+            yield pooled.g
+        except GremlinServerError:
+            raise
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self._release(pooled, healthy)
+
+    def poolStats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                'size': self.poolSize,
+                'open': self._open,
+                'idle': len(self._idle),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'replaced': self.replaced,
+            }
+
+    def _acquire(self, timeout: Optional[float]) -> _PooledConnection:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self.checkouts += 1
+        while True:
+            with self._cond:
+                while not self._idle and self._open >= self.poolSize and not self._closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No graph connection free after {timeout} s")
+                    self.waits += 1
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("GraphDatabaseManager is closed")
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    # Reserve the slot, then connect outside the lock.
+                    self._open += 1
+            if pooled is None:
+                try:
+                    return _PooledConnection(self._connectionFactory())
+                except Exception:
+                    self._dropSlot()
+                    raise
+            if time.monotonic() - pooled.lastUsed <= self.healthCheckSeconds or self._isHealthy(pooled):
+                return pooled
+            self._discard(pooled)
+            with self._cond:
+                self.replaced += 1
+
+    def _release(self, pooled: _PooledConnection, healthy: bool) -> None:
+        if not healthy or self._closed:
+            self._discard(pooled)
+            if not healthy:
+                with self._cond:
+                    self.replaced += 1
+            return
+        pooled.lastUsed = time.monotonic()
+        with self._cond:
+            # Most recently used last: the warmest connection is handed out next.
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @staticmethod
+    def _isHealthy(pooled: _PooledConnection) -> bool:
+        try:
+            pooled.g.inject(1).to_list()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+        self._dropSlot()
+
+    def _dropSlot(self) -> None:
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
     def close(self):
         """
-        Close the connection to Gremlin Server.
+        Close the connections to Gremlin Server. Pooled connections still checked out
+        are closed when they are returned.
         """
         if self.connection:
             self.connection.close()
-    
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
     def clear_graph(self):
         """
         Clear all vertices and edges from the graph (useful for testing).
@@ -60,7 +199,7 @@ class GraphDatabaseManager:
         except Exception as e:
             print(f"Error clearing graph: {e}")
             raise
-            
+
     def test_connection(self):
         """
         Test the connection by running a simple query
@@ -71,4 +210,4 @@ class GraphDatabaseManager:
             return True
         except Exception as e:
             print(f"Connection test failed: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -1,185 +1,575 @@
 # src/graph/graph_query_service.py
-from typing import List, Optional, Dict, Any
-from gremlin_python.process.traversal import P
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+from gremlin_python.process.traversal import Cardinality, Column, Operator, P, T
 from gremlin_python.process.graph_traversal import __
-from src.interfaces import IGraphQueryService, ParsedCodeModel, GraphNodeData, GraphEdgeData
+from src.interfaces import (DEFAULT_DEPENDENTS_DEPTH, DEFAULT_DEPENDENTS_LIMIT, DEFAULT_PAGE_SIZE, REFERENCE_EDGE_TYPES,
+                            DependentsResult, IGraphQueryService, ParsedCodeModel, GraphNodeData, IngestStats, NodePage)
+from src.columnar import MISSING, EdgeColumns, NodeColumns
 from src.graph.graph_database_manager import GraphDatabaseManager
+from src.graph.model_diff import EdgeKey, ParsedCodeDiff, VertexChange, diffParsedCode, edgeKeys, vertexRows
+from src.graph.vertex_decoder import VERTEX_DECODER, VertexDecoder
+from src.graph.query_cache import DEFAULT_MAX_ENTRIES, QueryCache
+from src.graph.symbol_table import PLACEHOLDER_LABEL, ReferencePlan, SymbolTable
+
+# Mutation steps sent per round trip during ingest.
+DEFAULT_BATCH_SIZE = 500
+
+# GraphNodeData fields stored under a different vertex property name.
+_FIELD_PROPERTIES = {'id': 'nodeId'}
+
+
+def _propertyKeys(fields: Optional[List[str]]) -> List[str]:
+    """
+    The vertex properties to fetch for the requested GraphNodeData fields: an empty list
+    (everything) when no projection is asked for. nodeId is always fetched, and the
+    label comes with value_map(True) anyway.
+    """
+    if fields is None or 'properties' in fields:
+        return []
+    keys = {'nodeId'}
+    keys.update(_FIELD_PROPERTIES.get(f, f) for f in fields if f != 'type')
+    return sorted(keys)
 
 class GraphQueryService(IGraphQueryService):
-    def __init__(self, dbManager: GraphDatabaseManager):
+    def __init__(self, dbManager: GraphDatabaseManager, batchSize: int = DEFAULT_BATCH_SIZE,
+                 incremental: bool = False, cacheSize: int = DEFAULT_MAX_ENTRIES, roots: Iterable[str] = ()):
+        # Every call borrows its own pooled connection, so concurrent callers don't queue
+        # behind one shared traversal source.
         self.dbManager = dbManager
-        self.g = dbManager.getClient()
-
-    def ingestParsedCode(self, parsedCode: ParsedCodeModel):
-        file_node = parsedCode.file
-        file_id = file_node.id
-        try:
-            self.g.V().has('nodeId', file_id).drop().iterate()
-        except Exception:
-            pass
-        self.g.add_v('File') \
-            .property('nodeId', file_id) \
-            .property('filePath', file_node.filePath) \
-            .property('language', getattr(file_node, 'language', '')) \
-            .iterate()
-        for fn in parsedCode.functions:
+        self.batchSize = max(1, batchSize)
+        # In incremental mode the last model ingested for each file is kept so a
+        # re-ingest only writes what changed.
+        self.incremental = incremental
+        self._lastModels: Dict[str, ParsedCodeModel] = {}
+        self.decoder = VERTEX_DECODER
+        # Snapshot and neighbour results, read through and dropped when an ingest touches
+        # their nodes or file. cacheSize=0 turns caching off.
+        self.cache = QueryCache(cacheSize)
+        # Node ids each file's last ingest wrote, so the next one knows what it replaces.
+        self._fileNodeIds: Dict[str, Set[str]] = {}
+        # Symbols and references of every ingested file, to resolve CALLS, IMPORTS and
+        # INHERITS edges across files without querying the graph. Absolute imports resolve
+        # against the workspace `roots` and package tops.
+        self.symbols = SymbolTable(roots)
+        # Held by every writer from planning through submitting to updating the state
+        # above, so the graph receives plans in the order the symbol table made them.
+        # Ingests of different files still run one at a time; reads never take it.
+        self.writeLock = threading.RLock()
+
+    def ingestParsedCode(self, parsedCode: ParsedCodeModel) -> IngestStats:
+        """
+        Write a file's File, Function and Class vertices, their CONTAINS edges and the
+        CALLS, IMPORTS and INHERITS edges of its references.
+        All mutations are folded into side_effect() steps of a single traversal, split into
+        chunks of `batchSize` steps, so the number of round trips stays small and does not
+        grow one-per-symbol.
+        In incremental mode, a file seen before is diffed against its previous model and
+        only added, removed and changed vertices and edges are sent.
+        """
+        started = time.perf_counter()
+        with self.writeLock:
+            mutations, stats, recreated = self._planIngest(parsedCode)
+            plan = self._planReferences([parsedCode], recreated, mutations, stats)
+            try:
+                stats.requestCount = self._submitMutations(mutations)
+            finally:
+                self._invalidate([parsedCode], plan.nodeIds())
+            self._remember(parsedCode)
+        stats.durationMs = (time.perf_counter() - started) * 1000.0
+        return stats
+
+    def ingestParsedCodeBatch(self, parsedCodes: List[ParsedCodeModel]) -> IngestStats:
+        """
+        Ingest several files, packing all their mutations into shared round trips.
+        References are resolved once for the whole batch, after every file's symbols are
+        known, and their edges written after all the vertices.
+        """
+        started = time.perf_counter()
+        with self.writeLock:
+            mutations, batch, plan = self._planBatch(parsedCodes)
             try:
-                self.g.V().has('nodeId', fn.id).drop().iterate()
-            except Exception:
-                pass
-            self.g.add_v('Function') \
-                .property('nodeId', fn.id) \
-                .property('name', fn.name) \
-                .property('fileId', fn.fileId) \
-                .property('startLine', fn.startLine) \
-                .property('endLine', fn.endLine) \
-                .iterate()
-            self.g.V().has('nodeId', file_id).as_('f') \
-                .V().has('nodeId', fn.id) \
-                .add_e('CONTAINS').from_('f') \
-                .iterate()
-        for cls in parsedCode.classes:
+                batch.requestCount = self._submitMutations(mutations)
+            finally:
+                self._invalidate(parsedCodes, plan.nodeIds())
+            for parsedCode in parsedCodes:
+                self._remember(parsedCode)
+        batch.durationMs = (time.perf_counter() - started) * 1000.0
+        return batch
+
+    def _planBatch(self, parsedCodes: List[ParsedCodeModel]) -> Tuple[List[Any], IngestStats, ReferencePlan]:
+        batch = IngestStats(fileCount=len(parsedCodes))
+        mutations: List[Any] = []
+        recreated: Set[str] = set()
+        for parsedCode in parsedCodes:
+            file_mutations, stats, written = self._planIngest(parsedCode)
+            mutations.extend(file_mutations)
+            recreated |= written
+            batch.vertexCount += stats.vertexCount
+            batch.edgeCount += stats.edgeCount
+            batch.removedCount += stats.removedCount
+        plan = self._planReferences(parsedCodes, recreated, mutations, batch)
+        return mutations, batch, plan
+
+    def _planIngest(self, parsedCode: ParsedCodeModel) -> Tuple[List[Any], IngestStats, Set[str]]:
+        """
+        The mutations that bring a file's vertices and CONTAINS edges in line with
+        `parsedCode`, their summary, and the ids of the vertices they (re)create.
+        """
+        file_path = parsedCode.file.filePath
+        previous = self._lastModels.get(file_path) if self.incremental else None
+        if previous is not None:
+            diff = diffParsedCode(previous, parsedCode)
+            return self._diffMutations(diff), IngestStats(
+                filePath=file_path,
+                incremental=True,
+                vertexCount=len(diff.addedVertices) + len(diff.changedVertices),
+                edgeCount=len(diff.addedEdges),
+                removedCount=len(diff.removedVertexIds) + len(diff.removedEdges),
+            ), {row.nodeId for row in diff.addedVertices}
+        rows = vertexRows(parsedCode)
+        edges = edgeKeys(parsedCode)
+        mutations = self._replaceMutations(parsedCode.file.id, rows, edges)
+        return mutations, IngestStats(filePath=file_path, vertexCount=len(rows), edgeCount=len(edges)), set(rows)
+
+    def _planReferences(self, parsedCodes: List[ParsedCodeModel], recreated: Set[str],
+                        mutations: List[Any], stats: IngestStats) -> ReferencePlan:
+        """Resolve the files' references and append the edge mutations after the vertex ones."""
+        plan = self.symbols.update(parsedCodes, recreated)
+        mutations.extend(self._referenceMutations(plan))
+        stats.edgeCount += len(plan.addEdges)
+        stats.removedCount += len(plan.removeEdges) + len(plan.dropPlaceholders)
+        return plan
+
+    def _remember(self, parsedCode: ParsedCodeModel) -> None:
+        if self.incremental:
+            self._lastModels[parsedCode.file.filePath] = parsedCode
+
+    def removeNodes(self, nodeIds: List[str]) -> IngestStats:
+        started = time.perf_counter()
+        ids = list(nodeIds)
+        mutations = [
+            __.V().has('nodeId', P.within(ids[i:i + self.batchSize])).drop()
+            for i in range(0, len(ids), self.batchSize)
+        ]
+        removed = set(ids)
+        with self.writeLock:
+            for file_path, model in list(self._lastModels.items()):
+                if model.file.id in removed:
+                    del self._lastModels[file_path]
+            plan = self.symbols.remove(
+                path for path in map(self.symbols.filePathOf, ids) if path is not None
+            )
+            mutations.extend(self._referenceMutations(plan))
+            try:
+                requests = self._submitMutations(mutations)
+            finally:
+                self._invalidateRemoved(removed, plan.nodeIds())
+        return IngestStats(
+            fileCount=0,
+            removedCount=len(ids),
+            requestCount=requests,
+            durationMs=(time.perf_counter() - started) * 1000.0,
+        )
+
+    def seedSymbols(self, parsedCodes: List[ParsedCodeModel]) -> int:
+        """
+        Seed the symbol table with files ingested before this service was created, and
+        drop placeholder vertices that earlier sessions left without incoming edges.
+        """
+        with self.writeLock:
+            known = len(self.symbols)
+            plan = self.symbols.seed(parsedCodes)
+            mutations = self._referenceMutations(plan)
+            mutations.append(__.V().has_label(PLACEHOLDER_LABEL).not_(__.in_e()).drop())
             try:
-                self.g.V().has('nodeId', cls.id).drop().iterate()
-            except Exception:
-                pass
-            self.g.add_v('Class') \
-                .property('nodeId', cls.id) \
-                .property('name', cls.name) \
-                .property('fileId', cls.fileId) \
-                .property('startLine', cls.startLine) \
-                .property('endLine', cls.endLine) \
-                .iterate()
-            self.g.V().has('nodeId', file_id).as_('f') \
-                .V().has('nodeId', cls.id) \
-                .add_e('CONTAINS').from_('f') \
-                .iterate()
-
-    def getAllNodes(self, nodeType: Optional[str] = None) -> List[GraphNodeData]:
-        traversal = self.g.V()
+                self._submitMutations(mutations)
+            finally:
+                self._invalidate((), plan.nodeIds())
+            return len(self.symbols) - known
+
+    def _invalidate(self, parsedCodes: Iterable[ParsedCodeModel], referenceIds: Iterable[str] = ()) -> None:
+        """
+        Drop cached results that depend on what ingesting `parsedCodes` changed: the
+        files, the nodes and edge ends they now have and those they had before, and the
+        ends of reference edges written or removed.
+        """
+        if not self.cache.enabled:
+            return
+        node_ids: Set[str] = set(referenceIds)
+        file_paths: List[str] = []
+        for parsedCode in parsedCodes:
+            file_path = parsedCode.file.filePath
+            current = {parsedCode.file.id}
+            current.update(symbol.id for symbol in parsedCode.functions)
+            current.update(symbol.id for symbol in parsedCode.classes)
+            for source, target, _ in edgeKeys(parsedCode):
+                current.add(source)
+                current.add(target)
+            node_ids |= current
+            node_ids |= self._fileNodeIds.get(file_path, set())
+            self._fileNodeIds[file_path] = current
+            file_paths.append(file_path)
+        self.cache.invalidate(node_ids, file_paths)
+
+    def _invalidateRemoved(self, removed: Set[str], referenceIds: Iterable[str] = ()) -> None:
+        if not self.cache.enabled:
+            return
+        node_ids = set(removed)
+        node_ids.update(referenceIds)
+        file_paths = []
+        for file_path, ids in list(self._fileNodeIds.items()):
+            if ids & removed:
+                node_ids |= ids
+                file_paths.append(file_path)
+                ids -= removed
+                if not ids:
+                    del self._fileNodeIds[file_path]
+        self.cache.invalidate(node_ids, file_paths)
+
+    def forgetFile(self, filePath: str) -> None:
+        """Discard the remembered model for a file, so its next ingest is a full replace."""
+        with self.writeLock:
+            self._lastModels.pop(filePath, None)
+
+    def _replaceMutations(self, file_id: str, rows: Dict[str, VertexChange], edges: List[EdgeKey]) -> List[Any]:
+        # Drop leftovers of earlier parses too, so the graph matches the model exactly
+        # and later incremental diffs apply cleanly.
+        mutations = [
+            __.V().has('nodeId', P.within(list(rows))).drop(),
+            __.V().has('fileId', file_id).drop(),
+        ]
+        mutations.extend(self._addVertexMutation(row) for row in rows.values())
+        mutations.extend(self._addEdgeMutation(edge) for edge in edges)
+        return mutations
+
+    def _diffMutations(self, diff: ParsedCodeDiff) -> List[Any]:
+        mutations: List[Any] = []
+        if diff.removedVertexIds:
+            mutations.append(__.V().has('nodeId', P.within(diff.removedVertexIds)).drop())
+        for source, target, label in diff.removedEdges:
+            mutations.append(
+                __.V().has('nodeId', source).out_e(label)
+                .where(__.in_v().has('nodeId', target)).drop()
+            )
+        mutations.extend(self._addVertexMutation(row) for row in diff.addedVertices)
+        for change in diff.changedVertices:
+            mutation = __.V().has('nodeId', change.nodeId)
+            for key, value in change.properties.items():
+                mutation = mutation.property(Cardinality.single, key, value)
+            if change.removedKeys:
+                mutation = mutation.side_effect(__.properties(*change.removedKeys).drop())
+            mutations.append(mutation)
+        mutations.extend(self._addEdgeMutation(edge) for edge in diff.addedEdges)
+        return mutations
+
+    @staticmethod
+    def _addVertexMutation(row: VertexChange) -> Any:
+        mutation = __.add_v(row.label).property('nodeId', row.nodeId)
+        for key, value in row.properties.items():
+            mutation = mutation.property(key, value)
+        return mutation
+
+    @staticmethod
+    def _addEdgeMutation(edge: EdgeKey) -> Any:
+        source, target, label = edge
+        return __.V().has('nodeId', source).add_e(label).to(__.V().has('nodeId', target))
+
+    def _referenceMutations(self, plan: ReferencePlan) -> List[Any]:
+        """
+        Placeholders first, then edges, then placeholders nothing references any more.
+        Placeholder and edge writes are guarded so repeating them adds nothing.
+        """
+        mutations: List[Any] = [
+            __.V().has('nodeId', node_id).fold().coalesce(
+                __.unfold(),
+                __.add_v(PLACEHOLDER_LABEL).property('nodeId', node_id).property('name', name),
+            )
+            for node_id, name in plan.addPlaceholders
+        ]
+        for source, target, label in plan.removeEdges:
+            mutations.append(
+                __.V().has('nodeId', source).out_e(label)
+                .where(__.in_v().has('nodeId', target)).drop()
+            )
+        for source, target, label in plan.addEdges:
+            mutations.append(
+                __.V().has('nodeId', target).as_('t').V().has('nodeId', source).coalesce(
+                    __.out_e(label).where(__.in_v().as_('t')),
+                    __.add_e(label).to('t'),
+                )
+            )
+        # Edges from files outside the symbol table (not yet seeded) keep a placeholder.
+        ids = plan.dropPlaceholders
+        mutations.extend(
+            __.V().has('nodeId', P.within(ids[i:i + self.batchSize])).not_(__.in_e()).drop()
+            for i in range(0, len(ids), self.batchSize)
+        )
+        return mutations
+
+    def _submitMutations(self, mutations: List[Any]) -> int:
+        """
+        Run anonymous mutation traversals in order, `batchSize` per round trip.
+        Returns the number of requests sent.
+        """
+        requests = 0
+        if not mutations:
+            return requests
+        with self.dbManager.checkout() as g:
+            for traversal in self._mutationChunks(g, mutations):
+                traversal.iterate()
+                requests += 1
+        return requests
+
+    def _mutationChunks(self, g: Any, mutations: List[Any]) -> Iterator[Any]:
+        """One traversal per `batchSize` mutations, each folded into a side_effect() step."""
+        for start in range(0, len(mutations), self.batchSize):
+            traversal = g.inject(0)
+            for mutation in mutations[start:start + self.batchSize]:
+                traversal = traversal.side_effect(mutation)
+            yield traversal
+
+    def getAllNodes(self, nodeType: Optional[str] = None, fields: Optional[List[str]] = None) -> List[GraphNodeData]:
+        with self.dbManager.checkout() as g:
+            results = self._allNodesTraversal(g, nodeType, fields).to_list()
+        return self.decoder.decodeVertices(results)
+
+    def getNodesPage(self, nodeType: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                     after: Optional[str] = None, fields: Optional[List[str]] = None) -> NodePage:
+        """One page of nodes ordered by nodeId, fetched in a single bounded traversal."""
+        with self.dbManager.checkout() as g:
+            results = self._nodesPageTraversal(g, nodeType, limit, after, fields).to_list()
+        return self._decodePage(results, limit, self.decoder)
+
+    def getConnectedNodes(self, nodeId: str, edgeType: Optional[str] = None, fields: Optional[List[str]] = None) -> List[GraphNodeData]:
+        def fetch() -> List[GraphNodeData]:
+            with self.dbManager.checkout() as g:
+                results = self._connectedNodesTraversal(g, nodeId, edgeType, fields).to_list()
+            return self.decoder.decodeVertices(results)
+        nodes = self._readThrough(self._connectedKey(nodeId, edgeType, fields), fetch,
+                                  lambda nodes: self._connectedDeps(nodeId, nodes))
+        return list(nodes)
+
+    def getCodeGraphSnapshot(self, filePath: str, hops: int = 0, limit: Optional[int] = None,
+                             fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        The file's vertex, the vertices it CONTAINS and, with `hops` > 0, every vertex up to
+        that many edges further away, plus the edges among them. Computed in one traversal
+        anchored at the file vertex, so the cost follows the size of the subgraph rather
+        than of the whole graph. `limit` caps the nodes and the edges returned; 'truncated'
+        is True when either cap was reached.
+        """
+        def fetch() -> Dict[str, Any]:
+            with self.dbManager.checkout() as g:
+                results = self._snapshotTraversal(g, filePath, hops, limit, fields).to_list()
+            return self._decodeSnapshot(results[0] if results else {}, limit, self.decoder)
+        snapshot = self._readThrough(self._snapshotKey(filePath, hops, limit, fields), fetch,
+                                     lambda snapshot: self._snapshotDeps(filePath, snapshot))
+        return self._copySnapshot(snapshot)
+
+    def getTransitiveDependents(self, nodeId: str, edgeTypes: Optional[List[str]] = None,
+                                maxDepth: int = DEFAULT_DEPENDENTS_DEPTH,
+                                limit: int = DEFAULT_DEPENDENTS_LIMIT) -> DependentsResult:
+        """One repeat().emit().times() traversal, however many hops the walk takes."""
+        if maxDepth < 1:
+            return DependentsResult(nodeId=nodeId, nodes=[], depths={}, truncated=False)
+        started = time.perf_counter()
+        with self.dbManager.checkout() as g:
+            results = self._dependentsTraversal(g, nodeId, edgeTypes, maxDepth, limit).to_list()
+        result = self._decodeDependents(nodeId, results, limit, self.decoder)
+        result.durationMs = (time.perf_counter() - started) * 1000.0
+        return result
+
+    def getNodeColumns(self, nodeType: Optional[str] = None) -> NodeColumns:
+        """All nodes as columns, built straight from flat projected rows without models."""
+        with self.dbManager.checkout() as g:
+            results = self._nodeColumnsTraversal(g, nodeType).to_list()
+        return NodeColumns.fromRows(results)
+
+    def getCodeGraphSnapshotColumns(self, filePath: str, hops: int = 0,
+                                    limit: Optional[int] = None) -> Dict[str, Any]:
+        """The snapshot traversal, with nodes projected to flat rows for the columns."""
+        with self.dbManager.checkout() as g:
+            results = self._snapshotTraversal(g, filePath, hops, limit, nodeRow=self._columnRow()).to_list()
+        return self._decodeSnapshotColumns(results[0] if results else {}, limit)
+
+    def _readThrough(self, key: Hashable, fetch: Callable[[], Any],
+                     deps: Callable[[Any], Tuple[Iterable[str], Iterable[str], bool]]) -> Any:
+        """The cached value for `key`, or the result of `fetch()`, stored with its dependencies."""
+        if not self.cache.enabled:
+            return fetch()
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        token = self.cache.begin()
+        value = fetch()
+        node_ids, file_paths, volatile = deps(value)
+        self.cache.put(key, value, token, node_ids, file_paths, volatile)
+        return value
+
+    # Cache keys and dependencies, shared with AsyncGraphQueryService. Cached results are
+    # shared, so callers get fresh lists around the (read-only) models.
+
+    @staticmethod
+    def _connectedKey(nodeId: str, edgeType: Optional[str], fields: Optional[List[str]]) -> Hashable:
+        return ('connected', nodeId, edgeType, None if fields is None else tuple(sorted(fields)))
+
+    @staticmethod
+    def _connectedDeps(nodeId: str, nodes: List[GraphNodeData]) -> Tuple[Iterable[str], Iterable[str], bool]:
+        return [nodeId] + [n.id for n in nodes], (), False
+
+    @staticmethod
+    def _snapshotKey(filePath: str, hops: int, limit: Optional[int], fields: Optional[List[str]]) -> Hashable:
+        return ('snapshot', filePath, hops, limit, None if fields is None else tuple(sorted(fields)))
+
+    @staticmethod
+    def _snapshotDeps(filePath: str, snapshot: Dict[str, Any]) -> Tuple[Iterable[str], Iterable[str], bool]:
+        # A cut-off result may change with any node beyond the cut, so any ingest drops it.
+        return [n.id for n in snapshot['nodes']], [filePath], snapshot['truncated']
+
+    @staticmethod
+    def _copySnapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        return {'nodes': list(snapshot['nodes']), 'edges': list(snapshot['edges']), 'truncated': snapshot['truncated']}
+
+    # Traversal builders and result decoders, shared with AsyncGraphQueryService.
+
+    @staticmethod
+    def _allNodesTraversal(g: Any, nodeType: Optional[str], fields: Optional[List[str]] = None) -> Any:
+        traversal = g.V()
         if nodeType:
             traversal = traversal.has_label(nodeType)
-        results = traversal.value_map(True).to_list()
-        nodes: List[GraphNodeData] = []
-        for vm in results:
-            # Flatten only string keys
-            flat: Dict[Any, Any] = {}
-            for k, v in vm.items():
-                if not isinstance(k, str):
-                    continue
-                flat[k] = v[0] if isinstance(v, list) and len(v) == 1 else v
-            node_id = flat.get('nodeId', '')
-            label = flat.get('label') or ''
-            name = flat.get('name', '')
-            filePath = flat.get('filePath', '')
-            startLine = flat.get('startLine', 0) or 0
-            endLine = flat.get('endLine', 0) or 0
-            props = {
-                k: val for k, val in flat.items()
-                if isinstance(k, str) and k not in {'label','nodeId','name','filePath','startLine','endLine','fileId','language'}
-            }
-            nodes.append(GraphNodeData(
-                id=str(node_id),
-                type=str(label),
-                name=str(name),
-                filePath=str(filePath),
-                startLine=int(startLine),
-                endLine=int(endLine),
-                properties=props
-            ))
-        return nodes
-
-    def getConnectedNodes(self, nodeId: str, edgeType: Optional[str] = None) -> List[GraphNodeData]:
-        traversal = self.g.V().has('nodeId', nodeId)
+        return traversal.value_map(True, *_propertyKeys(fields))
+
+    @staticmethod
+    def _nodesPageTraversal(g: Any, nodeType: Optional[str], limit: int, after: Optional[str],
+                            fields: Optional[List[str]] = None) -> Any:
+        traversal = g.V()
+        if nodeType:
+            traversal = traversal.has_label(nodeType)
+        if after is not None:
+            traversal = traversal.has('nodeId', P.gt(after))
+        # One node past the page says whether there is a next one.
+        return traversal.order().by('nodeId').limit(limit + 1).value_map(True, *_propertyKeys(fields))
+
+    @staticmethod
+    def _decodePage(results: List[Dict[Any, Any]], limit: int,
+                    decoder: VertexDecoder = VERTEX_DECODER) -> NodePage:
+        nodes = decoder.decodeVertices(results[:limit])
+        return NodePage(nodes=nodes, nextCursor=nodes[-1].id if len(results) > limit and nodes else None)
+
+    @staticmethod
+    def _connectedNodesTraversal(g: Any, nodeId: str, edgeType: Optional[str],
+                                 fields: Optional[List[str]] = None) -> Any:
+        traversal = g.V().has('nodeId', nodeId)
         if edgeType:
             traversal = traversal.both_e(edgeType).other_v()
         else:
             traversal = traversal.both()
-        results = traversal.value_map(True).to_list()
-        nodes: List[GraphNodeData] = []
-        for vm in results:
-            flat: Dict[Any, Any] = {}
-            for k, v in vm.items():
-                if not isinstance(k, str):
-                    continue
-                flat[k] = v[0] if isinstance(v, list) and len(v) == 1 else v
-            nid = flat.get('nodeId', '')
-            label = flat.get('label') or ''
-            name = flat.get('name', '')
-            filePath = flat.get('filePath', '')
-            startLine = flat.get('startLine', 0) or 0
-            endLine = flat.get('endLine', 0) or 0
-            props = {
-                k: val for k, val in flat.items()
-                if isinstance(k, str) and k not in {'label','nodeId','name','filePath','startLine','endLine','fileId','language'}
-            }
-            nodes.append(GraphNodeData(
-                id=str(nid),
-                type=str(label),
-                name=str(name),
-                filePath=str(filePath),
-                startLine=int(startLine),
-                endLine=int(endLine),
-                properties=props
-            ))
-        return nodes
-
-    def getCodeGraphSnapshot(self, filePath: str) -> Dict[str, Any]:
-        try:
-            vm_list = self.g.V().has('filePath', filePath).value_map('nodeId').to_list()
-            if not vm_list:
-                return {'nodes': [], 'edges': []}
-            file_nodeId = vm_list[0].get('nodeId')[0]
-        except Exception:
-            return {'nodes': [], 'edges': []}
-        nodes_raw = self.g.V().has('nodeId', file_nodeId).union(__.identity(), __.out('CONTAINS')).value_map(True).to_list()
-        nodes: List[GraphNodeData] = []
-        ids = set()
-        for vm in nodes_raw:
-            flat: Dict[Any, Any] = {}
-            for k, v in vm.items():
-                if not isinstance(k, str):
-                    continue
-                flat[k] = v[0] if isinstance(v, list) and len(v) == 1 else v
-            nid = flat.get('nodeId', '')
-            ids.add(nid)
-            label = flat.get('label') or ''
-            name = flat.get('name', '')
-            filePathProp = flat.get('filePath', '')
-            startLine = flat.get('startLine', 0) or 0
-            endLine = flat.get('endLine', 0) or 0
-            props = {
-                k: val for k, val in flat.items()
-                if isinstance(k, str) and k not in {'label','nodeId','name','filePath','startLine','endLine','fileId','language'}
-            }
-            nodes.append(GraphNodeData(
-                id=str(nid),
-                type=str(label),
-                name=str(name),
-                filePath=str(filePathProp),
-                startLine=int(startLine),
-                endLine=int(endLine),
-                properties=props
-            ))
-        edges_raw = self.g.E().has_label('CONTAINS') \
-            .where(__.out_v().values('nodeId').is_(P.within(ids))) \
-            .where(__.in_v().values('nodeId').is_(P.within(ids))) \
-            .project('source','target','type') \
-                .by(__.out_v().values('nodeId')) \
-                .by(__.in_v().values('nodeId')) \
-                .by(__.label()) \
-            .to_list()
-        edges: List[GraphEdgeData] = []
-        for e in edges_raw:
-            src = e.get('source')
-            tgt = e.get('target')
-            etype = e.get('type')
-            edge_id = f"{src}->{tgt}"
-            edges.append(GraphEdgeData(
-                id=edge_id,
-                sourceId=str(src),
-                targetId=str(tgt),
-                type=str(etype),
-                properties={}
-            ))
-        return {'nodes': nodes, 'edges': edges}
\ No newline at end of file
+        return traversal.value_map(True, *_propertyKeys(fields))
+
+    @staticmethod
+    def _columnRow() -> Any:
+        # Symbol vertices carry fileId, not filePath; take the path from the containing file.
+        return __.project('id', 'type', 'name', 'filePath', 'startLine', 'endLine') \
+            .by('nodeId') \
+            .by(T.label) \
+            .by(__.coalesce(__.values('name'), __.constant(''))) \
+            .by(__.coalesce(__.values('filePath'), __.in_('CONTAINS').values('filePath'), __.constant(''))) \
+            .by(__.coalesce(__.values('startLine'), __.constant(MISSING))) \
+            .by(__.coalesce(__.values('endLine'), __.constant(MISSING)))
+
+    @classmethod
+    def _nodeColumnsTraversal(cls, g: Any, nodeType: Optional[str]) -> Any:
+        traversal = g.V()
+        if nodeType:
+            traversal = traversal.has_label(nodeType)
+        return traversal.map(cls._columnRow())
+
+    @staticmethod
+    def _snapshotTraversal(g: Any, filePath: str, hops: int, limit: Optional[int],
+                           fields: Optional[List[str]] = None, nodeRow: Any = None) -> Any:
+        nodes = g.V().has('File', 'filePath', filePath).union(__.identity(), __.out('CONTAINS'))
+        if hops > 0:
+            # dedup() inside repeat() stops the walk from revisiting vertices at every level.
+            nodes = nodes.emit().repeat(__.both().dedup()).times(hops)
+        nodes = nodes.dedup()
+        # One element over the cap tells the decoder the result was cut.
+        if limit is not None:
+            nodes = nodes.limit(limit + 1)
+        edges = __.unfold().out_e().where(__.in_v().where(P.within('snapshot')))
+        if limit is not None:
+            edges = edges.limit(limit + 1)
+        rows = __.unfold().value_map(True, *_propertyKeys(fields)) if nodeRow is None else __.unfold().map(nodeRow)
+        return nodes.aggregate('snapshot').fold() \
+            .project('nodes', 'edges') \
+                .by(rows.fold()) \
+                .by(edges.project('source', 'target', 'type')
+                    .by(__.out_v().values('nodeId'))
+                    .by(__.in_v().values('nodeId'))
+                    .by(__.label())
+                    .fold())
+
+    @staticmethod
+    def _dependentsTraversal(g: Any, nodeId: str, edgeTypes: Optional[List[str]],
+                             maxDepth: int, limit: int) -> Any:
+        # repeat() runs its step before checking times(), so maxDepth must be at least 1;
+        # callers answer maxDepth < 1 without a query, as the in-memory walk does.
+        # The sack counts the edges walked. dedup() inside repeat() keeps each vertex to its
+        # first visit; the group by minimum depth still holds if one arrives twice per level.
+        step = __.in_(*(edgeTypes or REFERENCE_EDGE_TYPES)).sack(Operator.sum_).by(__.constant(1)).dedup()
+        return g.with_sack(0).V().has('nodeId', nodeId) \
+            .repeat(step).emit().times(maxDepth) \
+            .has('nodeId', P.neq(nodeId)) \
+            .group().by().by(__.sack().min_()) \
+            .unfold() \
+            .order().by(__.select(Column.values)).by(__.select(Column.keys).values('nodeId')) \
+            .limit(limit + 1) \
+            .project('node', 'depth') \
+                .by(__.select(Column.keys).value_map(True)) \
+                .by(__.select(Column.values))
+
+    @staticmethod
+    def _decodeDependents(nodeId: str, results: List[Dict[str, Any]], limit: int,
+                          decoder: VertexDecoder = VERTEX_DECODER) -> DependentsResult:
+        rows = results[:limit]
+        nodes = decoder.decodeVertices(row['node'] for row in rows)
+        return DependentsResult(
+            nodeId=nodeId,
+            nodes=nodes,
+            depths={node.id: int(row['depth']) for node, row in zip(nodes, rows)},
+            truncated=len(results) > limit,
+        )
+
+    @staticmethod
+    def _decodeSnapshotColumns(result: Dict[str, Any], limit: Optional[int]) -> Dict[str, Any]:
+        rows = result.get('nodes', [])
+        edges = result.get('edges', [])
+        truncated = False
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            kept = {row['id'] for row in rows}
+            edges = [e for e in edges if e.get('source') in kept and e.get('target') in kept]
+            truncated = True
+        if limit is not None and len(edges) > limit:
+            edges = edges[:limit]
+            truncated = True
+        nodes = NodeColumns.fromRows(rows)
+        triples = ((e.get('source'), e.get('target'), e.get('type')) for e in edges)
+        return {'nodes': nodes, 'edges': EdgeColumns.fromTriples(triples, nodes), 'truncated': truncated}
+
+    @staticmethod
+    def _decodeSnapshot(result: Dict[str, Any], limit: Optional[int],
+                        decoder: VertexDecoder = VERTEX_DECODER) -> Dict[str, Any]:
+        nodes = decoder.decodeVertices(result.get('nodes', []))
+        edges = decoder.decodeEdges(result.get('edges', []))
+        truncated = False
+        if limit is not None and len(nodes) > limit:
+            nodes = nodes[:limit]
+            kept = {n.id for n in nodes}
+            edges = [e for e in edges if e.sourceId in kept and e.targetId in kept]
+            truncated = True
+        if limit is not None and len(edges) > limit:
+            edges = edges[:limit]
+            truncated = True
+        return {'nodes': nodes, 'edges': edges, 'truncated': truncated}
@@ -0,0 +1,144 @@
+# src/graph/in_memory_graph_query_service.py
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from src.interfaces import (DEFAULT_DEPENDENTS_DEPTH, DEFAULT_DEPENDENTS_LIMIT, DEFAULT_PAGE_SIZE, REFERENCE_EDGE_TYPES,
+                            DependentsResult, IGraphQueryService, ParsedCodeModel, GraphNodeData, IngestStats, NodePage)
+from src.graph.in_memory_graph_store import InMemoryGraphStore, edgeId
+from src.graph.records import EdgeRecord, NodeRecord, toModels
+from src.columnar import EdgeColumns, NodeColumns
+from src.graph.symbol_table import PLACEHOLDER_LABEL, ReferencePlan, SymbolTable
+
+
+def graphNodes(parsedCode: ParsedCodeModel) -> List[NodeRecord]:
+    """The File, Function and Class nodes of a parsed file, file node first."""
+    file = parsedCode.file
+    nodes = [NodeRecord(file.id, 'File', os.path.basename(file.filePath), file.filePath, None,
+                        (('language', file.language),))]
+    for label, symbols in (('Function', parsedCode.functions), ('Class', parsedCode.classes)):
+        for symbol in symbols:
+            nodes.append(NodeRecord(symbol.id, label, symbol.name, file.filePath, symbol.startLine,
+                                    (('endLine', symbol.endLine),)))
+    return nodes
+
+
+def containsEdges(parsedCode: ParsedCodeModel) -> List[EdgeRecord]:
+    file_id = parsedCode.file.id
+    return [
+        EdgeRecord(edgeId(file_id, symbol.id, 'CONTAINS'), file_id, symbol.id, 'CONTAINS')
+        for symbol in list(parsedCode.functions) + list(parsedCode.classes)
+    ]
+
+
+class InMemoryGraphQueryService(IGraphQueryService):
+    """
+    IGraphQueryService backed by an InMemoryGraphStore in this process: no Gremlin
+    server, no network round trips. The graph lasts as long as the process.
+    """
+
+    def __init__(self, store: Optional[InMemoryGraphStore] = None, roots: Iterable[str] = ()):
+        self.store = store if store is not None else InMemoryGraphStore()
+        # Resolves CALLS, IMPORTS and INHERITS references across the ingested files;
+        # absolute imports against the workspace `roots` and package tops.
+        self.symbols = SymbolTable(roots)
+
+    def ingestParsedCode(self, parsedCode: ParsedCodeModel) -> IngestStats:
+        """Replace everything previously ingested for the file with the nodes of `parsedCode`."""
+        stats = self.ingestParsedCodeBatch([parsedCode])
+        stats.filePath = parsedCode.file.filePath
+        return stats
+
+    def ingestParsedCodeBatch(self, parsedCodes: List[ParsedCodeModel]) -> IngestStats:
+        """Ingest several files, then resolve all their references in one pass."""
+        started = time.perf_counter()
+        batch = IngestStats(fileCount=len(parsedCodes))
+        with self.store.lock:
+            for parsedCode in parsedCodes:
+                nodes = self._graphNodes(parsedCode)
+                edges = self._containsEdges(parsedCode)
+                wanted = {node.id for node in nodes}
+                for node_id in self.store.nodeIdsInFile(parsedCode.file.filePath):
+                    if node_id not in wanted:
+                        batch.removedCount += self.store.removeNode(node_id)
+                for node in nodes:
+                    self.store.putNode(node)
+                for edge in edges:
+                    self.store.putEdge(edge)
+                batch.vertexCount += len(nodes)
+                batch.edgeCount += len(edges)
+            # Nodes kept across re-ingests keep their edges, so nothing counts as recreated.
+            added, removed = self._applyReferences(self.symbols.update(parsedCodes))
+        batch.edgeCount += added
+        batch.removedCount += removed
+        batch.durationMs = (time.perf_counter() - started) * 1000.0
+        return batch
+
+    def removeNodes(self, nodeIds: List[str]) -> IngestStats:
+        started = time.perf_counter()
+        with self.store.lock:
+            removed = sum(self.store.removeNode(node_id) for node_id in nodeIds)
+            plan = self.symbols.remove(
+                path for path in map(self.symbols.filePathOf, nodeIds) if path is not None
+            )
+            removed += self._applyReferences(plan)[1]
+        return IngestStats(fileCount=0, removedCount=removed,
+                           durationMs=(time.perf_counter() - started) * 1000.0)
+
+    def _graphNodes(self, parsedCode: ParsedCodeModel) -> List[NodeRecord]:
+        return graphNodes(parsedCode)
+
+    def _containsEdges(self, parsedCode: ParsedCodeModel) -> List[EdgeRecord]:
+        return containsEdges(parsedCode)
+
+    def _applyReferences(self, plan: ReferencePlan) -> Tuple[int, int]:
+        """Write a ReferencePlan to the store. Returns the edges added and the elements removed."""
+        store = self.store
+        for node_id, name in plan.addPlaceholders:
+            if store.getNode(node_id) is None:
+                store.putNode(NodeRecord(node_id, PLACEHOLDER_LABEL, name))
+        removed = sum(store.removeEdge(edgeId(*edge)) for edge in plan.removeEdges)
+        added = 0
+        for source, target, label in plan.addEdges:
+            added += store.putEdge(EdgeRecord(edgeId(source, target, label), source, target, label))
+        removed += sum(store.removeNode(node_id) for node_id in plan.dropPlaceholders)
+        return added, removed
+
+    def getAllNodes(self, nodeType: Optional[str] = None, fields: Optional[List[str]] = None) -> List[GraphNodeData]:
+        # Nodes are already in memory, so `fields` saves nothing; full nodes are returned.
+        return toModels(self.store.nodes(nodeType))
+
+    def getNodesPage(self, nodeType: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                     after: Optional[str] = None, fields: Optional[List[str]] = None) -> NodePage:
+        nodes, more = self.store.nodesPage(nodeType, limit, after)
+        return NodePage(nodes=toModels(nodes), nextCursor=nodes[-1].id if more and nodes else None)
+
+    def getConnectedNodes(self, nodeId: str, edgeType: Optional[str] = None, fields: Optional[List[str]] = None) -> List[GraphNodeData]:
+        return toModels(self.store.neighbors(nodeId, 'both', edgeType))
+
+    def getCodeGraphSnapshot(self, filePath: str, hops: int = 0, limit: Optional[int] = None,
+                             fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        nodes, edges, truncated = self.store.snapshot(self.store.nodeIdsInFile(filePath), hops, limit)
+        return {'nodes': toModels(nodes), 'edges': toModels(edges), 'truncated': truncated}
+
+    def getTransitiveDependents(self, nodeId: str, edgeTypes: Optional[List[str]] = None,
+                                maxDepth: int = DEFAULT_DEPENDENTS_DEPTH,
+                                limit: int = DEFAULT_DEPENDENTS_LIMIT) -> DependentsResult:
+        started = time.perf_counter()
+        found, truncated = self.store.dependents(nodeId, edgeTypes or REFERENCE_EDGE_TYPES, maxDepth, limit)
+        return DependentsResult(
+            nodeId=nodeId,
+            nodes=toModels(node for node, _ in found),
+            depths={node.id: depth for node, depth in found},
+            truncated=truncated,
+            durationMs=(time.perf_counter() - started) * 1000.0,
+        )
+
+    def getNodeColumns(self, nodeType: Optional[str] = None) -> NodeColumns:
+        # Straight from the stored records; no model is made per node.
+        return NodeColumns.fromNodes(self.store.nodes(nodeType))
+
+    def getCodeGraphSnapshotColumns(self, filePath: str, hops: int = 0,
+                                    limit: Optional[int] = None) -> Dict[str, Any]:
+        nodes, edges, truncated = self.store.snapshot(self.store.nodeIdsInFile(filePath), hops, limit)
+        columns = NodeColumns.fromNodes(nodes)
+        return {'nodes': columns, 'edges': EdgeColumns.fromEdges(edges, columns), 'truncated': truncated}
@@ -0,0 +1,240 @@
+# src/graph/in_memory_graph_store.py
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from src.interfaces import GraphEdgeData, GraphNodeData
+from src.graph.records import EdgeRecord, NodeRecord
+
+# Insertion-ordered sets are plain dicts with None values: O(1) add/remove, stable iteration.
+_IdSet = Dict[str, None]
+
+
+def edgeId(sourceId: str, targetId: str, edgeType: str) -> str:
+    """Id of the single edge of `edgeType` between two nodes; adding it twice is a no-op."""
+    return f"{sourceId}-{edgeType}->{targetId}"
+
+
+class InMemoryGraphStore:
+    """
+    A property graph held in process memory, for use without a Gremlin server.
+
+    Nodes are kept by id and indexed by label (node type) and filePath; each node has
+    outgoing and incoming adjacency sets of edge ids. Every lookup is a dict access, so
+    neighbour queries cost O(degree) and per-file queries O(nodes in the file), not
+    O(graph). Removing a node removes its edges. All methods are thread-safe; hold
+    `lock` (re-entrant) to make a sequence of calls atomic for other threads.
+
+    Nodes and edges are held as slotted NodeRecord / EdgeRecord objects, several times
+    smaller than the pydantic models, and returned as-is; services convert them with
+    toModel() when handing them out. put* also accept the models and convert them.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._nodes: Dict[str, NodeRecord] = {}
+        self._edges: Dict[str, EdgeRecord] = {}
+        self._byType: Dict[str, _IdSet] = {}
+        self._byFile: Dict[str, _IdSet] = {}
+        self._out: Dict[str, _IdSet] = {}
+        self._in: Dict[str, _IdSet] = {}
+        # Sorted node ids per type (None: all types) for cursor paging; dropped whenever
+        # the set of nodes changes, rebuilt on the next page request.
+        self._sortedIds: Dict[Optional[str], List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def edgeCount(self) -> int:
+        return len(self._edges)
+
+    def putNode(self, node: Union[NodeRecord, GraphNodeData]) -> None:
+        """Add a node, or replace the node with the same id (keeping its edges)."""
+        if not isinstance(node, NodeRecord):
+            node = NodeRecord.fromModel(node)
+        with self.lock:
+            previous = self._nodes.get(node.id)
+            if previous is not None:
+                self._unindex(previous)
+            if previous is None or previous.type != node.type:
+                self._sortedIds.clear()
+            self._nodes[node.id] = node
+            self._byType.setdefault(node.type, {})[node.id] = None
+            if node.filePath:
+                self._byFile.setdefault(node.filePath, {})[node.id] = None
+
+    def putEdge(self, edge: Union[EdgeRecord, GraphEdgeData]) -> bool:
+        """Add an edge between two existing nodes. Returns False if it is already present."""
+        if not isinstance(edge, EdgeRecord):
+            edge = EdgeRecord.fromModel(edge)
+        with self.lock:
+            if edge.id in self._edges:
+                return False
+            if edge.sourceId not in self._nodes or edge.targetId not in self._nodes:
+                raise KeyError(f"Edge {edge.id} refers to a missing node")
+            self._edges[edge.id] = edge
+            self._out.setdefault(edge.sourceId, {})[edge.id] = None
+            self._in.setdefault(edge.targetId, {})[edge.id] = None
+            return True
+
+    def removeNode(self, nodeId: str) -> int:
+        """Remove a node and every edge touching it. Returns the number of elements removed."""
+        with self.lock:
+            node = self._nodes.pop(nodeId, None)
+            if node is None:
+                return 0
+            self._unindex(node)
+            self._sortedIds.clear()
+            removed = 1
+            for edge_id in list(self._out.pop(nodeId, ())) + list(self._in.pop(nodeId, ())):
+                removed += self.removeEdge(edge_id)
+            return removed
+
+    def removeEdge(self, edgeId: str) -> int:
+        with self.lock:
+            edge = self._edges.pop(edgeId, None)
+            if edge is None:
+                return 0
+            self._out.get(edge.sourceId, {}).pop(edgeId, None)
+            self._in.get(edge.targetId, {}).pop(edgeId, None)
+            return 1
+
+    def getNode(self, nodeId: str) -> Optional[NodeRecord]:
+        return self._nodes.get(nodeId)
+
+    def nodes(self, nodeType: Optional[str] = None) -> List[NodeRecord]:
+        with self.lock:
+            if not nodeType:
+                return list(self._nodes.values())
+            return [self._nodes[i] for i in self._byType.get(nodeType, ())]
+
+    def nodesPage(self, nodeType: Optional[str], limit: int, after: Optional[str]) -> Tuple[List[NodeRecord], bool]:
+        """Up to `limit` nodes with an id greater than `after`, in id order, and whether more follow."""
+        with self.lock:
+            ids = self._sortedIds.get(nodeType)
+            if ids is None:
+                ids = sorted(self._byType.get(nodeType, ()) if nodeType else self._nodes)
+                self._sortedIds[nodeType] = ids
+            start = 0 if after is None else bisect.bisect_right(ids, after)
+            page = ids[start:start + limit]
+            return [self._nodes[i] for i in page], start + limit < len(ids)
+
+    def nodeIdsInFile(self, filePath: str) -> List[str]:
+        with self.lock:
+            return list(self._byFile.get(filePath, ()))
+
+    def nodesInFile(self, filePath: str) -> List[NodeRecord]:
+        with self.lock:
+            return [self._nodes[i] for i in self._byFile.get(filePath, ())]
+
+    def edges(self, nodeId: str, direction: str = 'both', edgeType: Optional[str] = None) -> List[EdgeRecord]:
+        """Edges leaving ('out'), entering ('in') or touching ('both') a node."""
+        with self.lock:
+            ids: List[str] = []
+            if direction in ('out', 'both'):
+                ids.extend(self._out.get(nodeId, ()))
+            if direction in ('in', 'both'):
+                ids.extend(self._in.get(nodeId, ()))
+            found = [self._edges[i] for i in ids]
+        if edgeType:
+            found = [e for e in found if e.type == edgeType]
+        return found
+
+    def neighbors(self, nodeId: str, direction: str = 'both', edgeType: Optional[str] = None) -> List[NodeRecord]:
+        """Nodes at the other end of a node's edges, once per edge (like Gremlin's both())."""
+        with self.lock:
+            return [
+                self._nodes[e.targetId if e.sourceId == nodeId else e.sourceId]
+                for e in self.edges(nodeId, direction, edgeType)
+            ]
+
+    def dependents(self, nodeId: str, edgeTypes: Iterable[str], maxDepth: int,
+                   limit: Optional[int] = None) -> Tuple[List[Tuple[NodeRecord, int]], bool]:
+        """
+        Breadth-first walk against incoming edges of `edgeTypes`: the nodes that reach
+        `nodeId` in at most `maxDepth` edges, each with its distance, nearest first.
+        `limit` caps the nodes returned; the flag is True if it was reached.
+        """
+        types = set(edgeTypes)
+        with self.lock:
+            seen = {nodeId}
+            found: List[Tuple[NodeRecord, int]] = []
+            frontier = [nodeId] if nodeId in self._nodes else []
+            for depth in range(1, maxDepth + 1):
+                reached: List[str] = []
+                for target in frontier:
+                    for edge_id in self._in.get(target, ()):
+                        edge = self._edges[edge_id]
+                        if edge.type in types and edge.sourceId not in seen:
+                            seen.add(edge.sourceId)
+                            reached.append(edge.sourceId)
+                            found.append((self._nodes[edge.sourceId], depth))
+                            if limit is not None and len(found) > limit:
+                                return found[:limit], True
+                if not reached:
+                    break
+                frontier = reached
+            return found, False
+
+    def subgraph(self, nodeIds: Iterable[str]) -> List[EdgeRecord]:
+        """The edges whose two ends are both among `nodeIds`."""
+        with self.lock:
+            ordered = list(nodeIds)
+            ids = set(ordered)
+            return [
+                self._edges[edge_id]
+                for node_id in ordered
+                for edge_id in self._out.get(node_id, ())
+                if self._edges[edge_id].targetId in ids
+            ]
+
+    def snapshot(self, seedIds: Iterable[str], hops: int = 0,
+                 limit: Optional[int] = None) -> Tuple[List[NodeRecord], List[EdgeRecord], bool]:
+        """
+        The seed nodes plus every node up to `hops` edges away (breadth-first, any
+        direction), and the edges among them. `limit` caps the nodes and the edges
+        returned; the flag is True if either cap was reached.
+        """
+        with self.lock:
+            order = [i for i in dict.fromkeys(seedIds) if i in self._nodes]
+            seen = set(order)
+            frontier = order
+            cap = None if limit is None else limit + 1
+            for _ in range(hops):
+                if cap is not None and len(order) >= cap:
+                    break
+                reached: List[str] = []
+                for node_id in frontier:
+                    for edge_id in list(self._out.get(node_id, ())) + list(self._in.get(node_id, ())):
+                        edge = self._edges[edge_id]
+                        other = edge.targetId if edge.sourceId == node_id else edge.sourceId
+                        if other not in seen:
+                            seen.add(other)
+                            reached.append(other)
+                order.extend(reached)
+                frontier = reached
+            truncated = limit is not None and len(order) > limit
+            if truncated:
+                order = order[:limit]
+            edges = self.subgraph(order)
+            if limit is not None and len(edges) > limit:
+                edges = edges[:limit]
+                truncated = True
+            return [self._nodes[i] for i in order], edges, truncated
+
+    def clear(self) -> None:
+        with self.lock:
+            for index in (self._nodes, self._edges, self._byType, self._byFile, self._out, self._in, self._sortedIds):
+                index.clear()
+
+    def _unindex(self, node: NodeRecord) -> None:
+        self._discard(self._byType, node.type, node.id)
+        if node.filePath:
+            self._discard(self._byFile, node.filePath, node.id)
+
+    @staticmethod
+    def _discard(index: Dict[str, _IdSet], key: str, nodeId: str) -> None:
+        members = index.get(key)
+        if members is not None:
+            members.pop(nodeId, None)
+            if not members:
+                del index[key]
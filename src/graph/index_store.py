@@ -0,0 +1,91 @@
+# src/graph/index_store.py
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from src.interfaces import ParsedCodeModel
+from src.graph.model_diff import vertexRows
+
+# mtime_ns of a record that must not match the file on disk, e.g. one describing editor
+# content: the next run reads the file again and compares digests instead.
+UNKNOWN_MTIME = -1
+
+
+class IndexedFile(NamedTuple):
+    """What was last ingested for a file, and the on-disk fingerprint it was read at."""
+    path: str
+    mtimeNs: int
+    size: int
+    digest: str
+    nodeIds: List[str]
+    # The model ingested, so a restarted service knows the file's symbols and references
+    # without parsing it again. None for records written before models were kept.
+    model: Optional[ParsedCodeModel] = None
+
+
+def indexedFile(path: str, mtimeNs: int, size: int, digest: str, model: ParsedCodeModel) -> IndexedFile:
+    """The record for an ingest of `model`."""
+    return IndexedFile(path, mtimeNs, size, digest, list(vertexRows(model)), model)
+
+
+class IndexStore:
+    """
+    Persistent record of the files ingested into one graph, kept in a SQLite database.
+
+    Lets workspace indexing after a restart skip files whose mtime and size (or, failing
+    that, content hash) match the last ingest, and find the nodes of files deleted since.
+    The ingested models let the graph service seed its symbol table, so reference edges
+    into files re-ingested after a restart are written again.
+    The record is only as good as the graph it describes: use one store per graph
+    endpoint, and delete the file if the graph is cleared.
+    """
+
+    def __init__(self, dbPath: str):
+        self.dbPath = dbPath
+        directory = os.path.dirname(dbPath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(dbPath, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            ' path TEXT PRIMARY KEY,'
+            ' mtime_ns INTEGER NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' digest TEXT NOT NULL,'
+            ' node_ids TEXT NOT NULL,'
+            ' model TEXT)'
+        )
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(files)')}
+        if 'model' not in columns:
+            # Stores from before models were kept; their records load with model=None.
+            self._conn.execute('ALTER TABLE files ADD COLUMN model TEXT')
+        self._conn.commit()
+
+    def loadAll(self) -> Dict[str, IndexedFile]:
+        with self._lock:
+            rows = self._conn.execute('SELECT path, mtime_ns, size, digest, node_ids, model FROM files').fetchall()
+        return {
+            path: IndexedFile(path, mtime_ns, size, digest, json.loads(node_ids),
+                              ParsedCodeModel.model_validate_json(model) if model else None)
+            for path, mtime_ns, size, digest, node_ids, model in rows
+        }
+
+    def upsertMany(self, records: Iterable[IndexedFile]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO files (path, mtime_ns, size, digest, node_ids, model) VALUES (?, ?, ?, ?, ?, ?)',
+                [(r.path, r.mtimeNs, r.size, r.digest, json.dumps(r.nodeIds),
+                  r.model.model_dump_json() if r.model is not None else None) for r in records],
+            )
+
+    def remove(self, paths: Iterable[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM files WHERE path = ?', [(p,) for p in paths])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
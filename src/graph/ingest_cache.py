@@ -0,0 +1,96 @@
+# src/graph/ingest_cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from src.interfaces import ParsedCodeModel
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def fingerprint(source: str) -> Tuple[str, int]:
+    """Content hash and encoded size of a document's source."""
+    data = source.encode('utf-8', 'surrogatepass')
+    return hashlib.blake2b(data, digest_size=16).hexdigest(), len(data)
+
+
+class IngestCache:
+    """
+    Remembers what was parsed and ingested for each file, keyed by a content hash.
+
+    Two levels are kept:
+      * the hash last ingested for each path. A document whose content hashes to the
+        same value needs neither parsing nor ingesting (a hit);
+      * parsed models keyed by (path, hash), so content that comes back after an edit
+        (e.g. undo, then save) is ingested again without being re-parsed (a parse hit).
+    Parsed models are evicted least-recently-used first once the total size of their
+    sources exceeds `maxBytes`.
+    """
+
+    def __init__(self, maxBytes: int = DEFAULT_MAX_BYTES):
+        self.maxBytes = maxBytes
+        self._lock = threading.Lock()
+        self._ingested: Dict[str, str] = {}
+        self._parsed: "OrderedDict[Tuple[str, str], Tuple[ParsedCodeModel, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.parseHits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def isIngested(self, filePath: str, digest: str) -> bool:
+        """True if `digest` is the content last ingested for `filePath`. Counts a hit or miss."""
+        with self._lock:
+            if self._ingested.get(filePath) == digest:
+                self.hits += 1
+                key = (filePath, digest)
+                if key in self._parsed:
+                    self._parsed.move_to_end(key)
+                return True
+            self.misses += 1
+            return False
+
+    def getParsed(self, filePath: str, digest: str) -> Optional[ParsedCodeModel]:
+        with self._lock:
+            entry = self._parsed.get((filePath, digest))
+            if entry is None:
+                return None
+            self._parsed.move_to_end((filePath, digest))
+            self.parseHits += 1
+            return entry[0]
+
+    def putParsed(self, filePath: str, digest: str, size: int, model: ParsedCodeModel) -> None:
+        with self._lock:
+            key = (filePath, digest)
+            previous = self._parsed.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            if size > self.maxBytes:
+                return
+            self._parsed[key] = (model, size)
+            self._bytes += size
+            while self._bytes > self.maxBytes:
+                _, (_, evicted_size) = self._parsed.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def markIngested(self, filePath: str, digest: str) -> None:
+        with self._lock:
+            self._ingested[filePath] = digest
+
+    def invalidate(self, filePath: str) -> None:
+        """Forget that `filePath` was ingested, e.g. after its graph data was removed."""
+        with self._lock:
+            self._ingested.pop(filePath, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'parseHits': self.parseHits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._parsed),
+                'bytes': self._bytes,
+                'maxBytes': self.maxBytes,
+            }
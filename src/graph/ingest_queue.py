@@ -0,0 +1,137 @@
+# src/graph/ingest_queue.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+DEFAULT_MAX_PENDING = 256
+
+
+class IngestQueue:
+    """
+    Runs graph ingest jobs on a dedicated worker thread, off the LSP handler thread.
+
+    Jobs are keyed, normally by document URI. Submitting a key that is still waiting
+    replaces the waiting job in place, so only the latest version of a file is ingested.
+    At most `maxPending` distinct keys wait at once; beyond that `submit` blocks the
+    caller (backpressure) until the worker catches up or the timeout expires.
+    A job may be submitted with a delay; resubmitting the key restarts the delay, which
+    debounces bursts of updates to the same file.
+    """
+
+    def __init__(self, maxPending: int = DEFAULT_MAX_PENDING,
+                 onError: Optional[Callable[[str, Exception], None]] = None,
+                 name: str = 'graph-ingest'):
+        self.maxPending = max(1, maxPending)
+        self.onError = onError
+        self._cond = threading.Condition()
+        # key -> (job, monotonic time at which it may run)
+        self._pending: "OrderedDict[str, Tuple[Callable[[], None], float]]" = OrderedDict()
+        self._running = False
+        self._closed = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, key: str, job: Callable[[], None], timeout: Optional[float] = None,
+               delay: float = 0.0) -> bool:
+        """
+        Queue `job` under `key` to run no sooner than `delay` seconds from now, replacing
+        a job already waiting under the same key.
+        Returns False if the queue is closed, or still full after `timeout` seconds.
+        """
+        with self._cond:
+            if self._closed:
+                self.rejected += 1
+                return False
+            if key in self._pending:
+                self._pending[key] = (job, time.monotonic() + delay)
+                self.coalesced += 1
+                self._cond.notify_all()
+                return True
+            has_room = self._cond.wait_for(
+                lambda: self._closed or len(self._pending) < self.maxPending, timeout
+            )
+            if self._closed or not has_room:
+                self.rejected += 1
+                return False
+            self._pending[key] = (job, time.monotonic() + delay)
+            self.submitted += 1
+            self._cond.notify_all()
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued job has run. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._running, timeout)
+
+    def close(self, flush: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Stop accepting jobs and stop the worker. With `flush`, jobs already queued run
+        first; otherwise they are discarded. Returns False if the worker is still busy
+        after `timeout` seconds.
+        """
+        with self._cond:
+            if not flush:
+                self._pending.clear()
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not threading.current_thread():
+            self._worker.join(timeout)
+        return not self._worker.is_alive()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                'pending': len(self._pending),
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'rejected': self.rejected,
+                'completed': self.completed,
+                'failed': self.failed,
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed and not self._pending:
+                        return
+                    key, wait = self._nextReady()
+                    if key is not None:
+                        break
+                    self._cond.wait(wait)
+                job, _ = self._pending.pop(key)
+                self._running = True
+                # A slot just freed up for a blocked submitter.
+                self._cond.notify_all()
+            try:
+                job()
+            except Exception as e:
+                with self._cond:
+                    self.failed += 1
+                if self.onError:
+                    self.onError(key, e)
+            finally:
+                with self._cond:
+                    self._running = False
+                    self.completed += 1
+                    self._cond.notify_all()
+
+    def _nextReady(self) -> Tuple[Optional[str], Optional[float]]:
+        """
+        The oldest key whose delay has passed, or None and how long until one will be
+        ready (None if nothing is waiting). Once closed, delays are ignored.
+        """
+        now = time.monotonic()
+        earliest: Optional[float] = None
+        for key, (_, ready_at) in self._pending.items():
+            if self._closed or ready_at <= now:
+                return key, None
+            if earliest is None or ready_at < earliest:
+                earliest = ready_at
+        return None, (earliest - now if earliest is not None else None)
@@ -0,0 +1,245 @@
+# src/graph/lazy_graph_query_service.py
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from src.interfaces import (DEFAULT_DEPENDENTS_DEPTH, DEFAULT_DEPENDENTS_LIMIT, DEFAULT_PAGE_SIZE, DependentsResult,
+                            IGraphQueryService, ParsedCodeModel, GraphNodeData, IngestStats, NodePage)
+from src.graph.in_memory_graph_query_service import InMemoryGraphQueryService
+from src.columnar import NodeColumns
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_INITIAL_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 60.0
+
+CONNECTING = 'connecting'
+READY = 'ready'
+CLOSED = 'closed'
+
+
+class LazyGraphQueryService(IGraphQueryService):
+    """
+    An IGraphQueryService whose real backend is connected in the background.
+
+    `start()` returns at once; a daemon thread calls `connect` until it succeeds, giving
+    each attempt `connectTimeout` seconds and waiting between attempts with exponential
+    backoff (`initialBackoff`, doubling up to `maxBackoff`). Until the backend is ready,
+    ingests and removals are applied to a local in-memory graph, which also serves
+    reads, and the latest model of each file is kept. Once connected, `prepare` is run
+    on the backend, the kept changes are replayed into it and every call is delegated to it.
+    """
+
+    def __init__(self, connect: Callable[[], IGraphQueryService],
+                 connectTimeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 initialBackoff: float = DEFAULT_INITIAL_BACKOFF,
+                 maxBackoff: float = DEFAULT_MAX_BACKOFF,
+                 dispose: Optional[Callable[[IGraphQueryService], None]] = None,
+                 prepare: Optional[Callable[[IGraphQueryService], None]] = None,
+                 onStateChange: Optional[Callable[[str, Optional[Exception]], None]] = None,
+                 roots: Iterable[str] = ()):
+        self.connect = connect
+        self.connectTimeout = connectTimeout
+        self.initialBackoff = initialBackoff
+        self.maxBackoff = max(initialBackoff, maxBackoff)
+        # Releases a backend that is no longer wanted, e.g. one that connected after close().
+        self.dispose = dispose
+        # Readies a connected backend before the kept changes are replayed into it, e.g.
+        # seeding its symbols. It is not bound by `connectTimeout`; if it fails, the
+        # backend is released and connecting is retried.
+        self.prepare = prepare
+        # Called with the new state and, for failed attempts, the error (state unchanged).
+        self.onStateChange = onStateChange
+        # Workspace roots for resolving the local graph's references.
+        self.roots = list(roots)
+        self.local = InMemoryGraphQueryService(roots=self.roots)
+        self.state = CONNECTING
+        self.attempts = 0
+        self.lastError: Optional[Exception] = None
+        self._remote: Optional[IGraphQueryService] = None
+        self._pending: "OrderedDict[str, ParsedCodeModel]" = OrderedDict()
+        self._pendingRemovals: List[str] = []
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='graph-connect', daemon=True)
+            self._thread.start()
+
+    def waitUntilReady(self, timeout: Optional[float] = None) -> bool:
+        """Block until the backend is ready. Returns False on timeout or if closed first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._ready.is_set() and not self._stopped.is_set():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            self._ready.wait(0.1 if remaining is None else min(0.1, remaining))
+        return self._ready.is_set()
+
+    def close(self) -> None:
+        """Stop connecting. A backend that is already connected is left to its owner."""
+        self._stopped.set()
+        self._setState(CLOSED)
+
+    @property
+    def backend(self) -> Optional[IGraphQueryService]:
+        """The connected backend, or None while still connecting."""
+        return self._remote
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'attempts': self.attempts,
+                'pendingFiles': len(self._pending),
+                'pendingRemovals': len(self._pendingRemovals),
+                'lastError': str(self.lastError) if self.lastError else None,
+            }
+
+    def ingestParsedCode(self, parsedCode: ParsedCodeModel) -> Optional[IngestStats]:
+        with self._lock:
+            remote = self._remote
+            if remote is None:
+                self._keep(parsedCode)
+                return self.local.ingestParsedCode(parsedCode)
+        return remote.ingestParsedCode(parsedCode)
+
+    def ingestParsedCodeBatch(self, parsedCodes: List[ParsedCodeModel]) -> IngestStats:
+        with self._lock:
+            remote = self._remote
+            if remote is None:
+                for parsedCode in parsedCodes:
+                    self._keep(parsedCode)
+                return self.local.ingestParsedCodeBatch(parsedCodes)
+        return remote.ingestParsedCodeBatch(parsedCodes)
+
+    def removeNodes(self, nodeIds: List[str]) -> Optional[IngestStats]:
+        with self._lock:
+            remote = self._remote
+            if remote is None:
+                removed = set(nodeIds)
+                for file_path, model in list(self._pending.items()):
+                    if model.file.id in removed:
+                        del self._pending[file_path]
+                self._pendingRemovals.extend(nodeIds)
+                return self.local.removeNodes(nodeIds)
+        return remote.removeNodes(nodeIds)
+
+    def seedSymbols(self, parsedCodes: List[ParsedCodeModel]) -> int:
+        # Seeds describe the backend's graph; the local one starts empty.
+        remote = self._remote
+        return remote.seedSymbols(parsedCodes) if remote is not None else 0
+
+    def getAllNodes(self, nodeType: Optional[str] = None, fields: Optional[List[str]] = None) -> List[GraphNodeData]:
+        return self._reader().getAllNodes(nodeType, fields)
+
+    def getNodesPage(self, nodeType: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                     after: Optional[str] = None, fields: Optional[List[str]] = None) -> NodePage:
+        return self._reader().getNodesPage(nodeType, limit, after, fields)
+
+    def getConnectedNodes(self, nodeId: str, edgeType: Optional[str] = None, fields: Optional[List[str]] = None) -> List[GraphNodeData]:
+        return self._reader().getConnectedNodes(nodeId, edgeType, fields)
+
+    def getCodeGraphSnapshot(self, filePath: str, hops: int = 0, limit: Optional[int] = None,
+                             fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        return self._reader().getCodeGraphSnapshot(filePath, hops, limit, fields)
+
+    def getTransitiveDependents(self, nodeId: str, edgeTypes: Optional[List[str]] = None,
+                                maxDepth: int = DEFAULT_DEPENDENTS_DEPTH,
+                                limit: int = DEFAULT_DEPENDENTS_LIMIT) -> DependentsResult:
+        return self._reader().getTransitiveDependents(nodeId, edgeTypes, maxDepth, limit)
+
+    def getNodeColumns(self, nodeType: Optional[str] = None) -> NodeColumns:
+        return self._reader().getNodeColumns(nodeType)
+
+    def getCodeGraphSnapshotColumns(self, filePath: str, hops: int = 0,
+                                    limit: Optional[int] = None) -> Dict[str, Any]:
+        return self._reader().getCodeGraphSnapshotColumns(filePath, hops, limit)
+
+    def _reader(self) -> IGraphQueryService:
+        return self._remote or self.local
+
+    def _keep(self, parsedCode: ParsedCodeModel) -> None:
+        file_path = parsedCode.file.filePath
+        self._pending[file_path] = parsedCode
+        self._pending.move_to_end(file_path)
+
+    def _run(self) -> None:
+        delay = self.initialBackoff
+        while not self._stopped.is_set():
+            self.attempts += 1
+            try:
+                remote = self._attempt()
+            except Exception as e:
+                failure = e
+            else:
+                if self._stopped.is_set():
+                    self._release(remote)
+                    return
+                try:
+                    self._goLive(remote)
+                    return
+                except Exception as e:
+                    # The backend failed while catching up; keep the pending changes and retry.
+                    self._release(remote)
+                    failure = e
+            self.lastError = failure
+            if self.onStateChange:
+                self.onStateChange(self.state, failure)
+            if self._stopped.wait(delay):
+                return
+            delay = min(delay * 2, self.maxBackoff)
+
+    def _attempt(self) -> IGraphQueryService:
+        """Run `connect` on its own thread, giving up after `connectTimeout` seconds."""
+        future: Future = Future()
+
+        def run():
+            try:
+                future.set_result(self.connect())
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name='graph-connect-attempt', daemon=True).start()
+        try:
+            return future.result(self.connectTimeout)
+        except FutureTimeoutError:
+            # If the attempt still succeeds later, its backend is not used.
+            future.add_done_callback(lambda f: f.exception() is None and self._release(f.result()))
+            raise TimeoutError(f"Graph connection not established within {self.connectTimeout} s")
+
+    def _goLive(self, remote: IGraphQueryService) -> None:
+        # Writers wait on the lock while the backend catches up, so nothing they send
+        # can be overtaken by an older replayed model.
+        with self._lock:
+            if self.prepare:
+                self.prepare(remote)
+            if self._pendingRemovals:
+                remote.removeNodes(self._pendingRemovals)
+            if self._pending:
+                remote.ingestParsedCodeBatch(list(self._pending.values()))
+            self._pending.clear()
+            self._pendingRemovals = []
+            self._remote = remote
+            self.local = InMemoryGraphQueryService(roots=self.roots)
+            self.lastError = None
+            self._setState(READY)
+            self._ready.set()
+
+    def _release(self, remote: IGraphQueryService) -> None:
+        if self.dispose:
+            try:
+                self.dispose(remote)
+            except Exception:
+                pass
+
+    def _setState(self, state: str) -> None:
+        with self._lock:
+            if self.state == state or self.state == CLOSED:
+                return
+            self.state = state
+        if self.onStateChange:
+            self.onStateChange(state, None)
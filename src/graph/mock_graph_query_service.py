@@ -1,62 +1,28 @@
 # src/graph/mock_graph_query_service.py
-from typing import List, Optional, Dict, Any
-from src.interfaces import IGraphQueryService, ParsedCodeModel, GraphNodeData, GraphEdgeData, FileNode, FunctionNode, ClassNode
+from typing import List
+from src.interfaces import ParsedCodeModel
+from src.graph.in_memory_graph_query_service import InMemoryGraphQueryService
+from src.graph.records import EdgeRecord, NodeRecord
 
-class MockGraphQueryService(IGraphQueryService):
-    def __init__(self):
-        # Pre-populate with some dummy data or leave empty
-        self._nodes: Dict[str, GraphNodeData] = {}
-        self._edges: List[GraphEdgeData] = []
+class MockGraphQueryService(InMemoryGraphQueryService):
+    """
+    InMemoryGraphQueryService with the node and edge shapes the mock has always had:
+    Function and Class nodes carry no properties, and CONTAINS edges are named
+    'e_<file id>_<symbol id>'. Storage, queries and reference edges are inherited.
+    """
 
-    def ingestParsedCode(self, parsedCode: ParsedCodeModel):
-        # Simulate ingestion by creating GraphNodeData entries
+    def _graphNodes(self, parsedCode: ParsedCodeModel) -> List[NodeRecord]:
         file = parsedCode.file
-        file_node = GraphNodeData(
-            id=file.id, type='File', name=file.filePath.split('/')[-1],
-            filePath=file.filePath, startLine=None, properties={'language': file.language}
-        )
-        self._nodes[file.id] = file_node
-        for fn in parsedCode.functions:
-            node = GraphNodeData(
-                id=fn.id, type='Function', name=fn.name,
-                filePath=parsedCode.file.filePath, startLine=fn.startLine, properties={}
-            )
-            self._nodes[fn.id] = node
-            edge = GraphEdgeData(
-                id=f"e_{file.id}_{fn.id}", sourceId=file.id, targetId=fn.id, type='CONTAINS', properties={}
-            )
-            self._edges.append(edge)
-        for cls in parsedCode.classes:
-            node = GraphNodeData(
-                id=cls.id, type='Class', name=cls.name,
-                filePath=parsedCode.file.filePath, startLine=cls.startLine, properties={}
-            )
-            self._nodes[cls.id] = node
-            edge = GraphEdgeData(
-                id=f"e_{file.id}_{cls.id}", sourceId=file.id, targetId=cls.id, type='CONTAINS', properties={}
-            )
-            self._edges.append(edge)
-
-    def getAllNodes(self, nodeType: Optional[str] = None) -> List[GraphNodeData]:
-        nodes = list(self._nodes.values())
-        if nodeType:
-            nodes = [n for n in nodes if n.type == nodeType]
+        nodes = [NodeRecord(file.id, 'File', file.filePath.split('/')[-1], file.filePath, None,
+                            (('language', file.language),))]
+        for label, symbols in (('Function', parsedCode.functions), ('Class', parsedCode.classes)):
+            for symbol in symbols:
+                nodes.append(NodeRecord(symbol.id, label, symbol.name, file.filePath, symbol.startLine))
         return nodes
 
-    def getConnectedNodes(self, nodeId: str, edgeType: Optional[str] = None) -> List[GraphNodeData]:
-        connected = []
-        for e in self._edges:
-            if edgeType and e.type != edgeType:
-                continue
-            if e.sourceId == nodeId and e.targetId in self._nodes:
-                connected.append(self._nodes[e.targetId])
-            elif e.targetId == nodeId and e.sourceId in self._nodes:
-                connected.append(self._nodes[e.sourceId])
-        return connected
-
-    def getCodeGraphSnapshot(self, filePath: str) -> Dict[str, Any]:
-        # Return all nodes with matching filePath, and edges among them
-        nodes = [n for n in self._nodes.values() if n.filePath == filePath]
-        ids = {n.id for n in nodes}
-        edges = [e for e in self._edges if e.sourceId in ids and e.targetId in ids]
-        return {'nodes': nodes, 'edges': edges}
\ No newline at end of file
+    def _containsEdges(self, parsedCode: ParsedCodeModel) -> List[EdgeRecord]:
+        file_id = parsedCode.file.id
+        return [
+            EdgeRecord(f"e_{file_id}_{symbol.id}", file_id, symbol.id, 'CONTAINS')
+            for symbol in list(parsedCode.functions) + list(parsedCode.classes)
+        ]
@@ -0,0 +1,105 @@
+# src/graph/model_diff.py
+from typing import Any, Dict, List, Optional, Set, Tuple
+from pydantic import BaseModel, Field
+from src.interfaces import ParsedCodeModel
+
+# (sourceId, targetId, label) of an edge between two vertices identified by nodeId.
+EdgeKey = Tuple[str, str, str]
+
+_MISSING = object()
+
+
+class VertexChange(BaseModel):
+    """A vertex to add, or the property changes to apply to an existing vertex."""
+    nodeId: str = Field(..., description="nodeId property of the vertex.")
+    label: str = Field(..., description="Vertex label (e.g., 'File', 'Function', 'Class').")
+    properties: Dict[str, Any] = Field({}, description="Properties to set, excluding nodeId.")
+    removedKeys: List[str] = Field([], description="Properties to remove from an existing vertex.")
+
+
+class ParsedCodeDiff(BaseModel):
+    """Graph mutations needed to move a file from one ParsedCodeModel to another."""
+    addedVertices: List[VertexChange] = []
+    changedVertices: List[VertexChange] = []
+    removedVertexIds: List[str] = []
+    addedEdges: List[EdgeKey] = []
+    removedEdges: List[EdgeKey] = []
+
+    def isEmpty(self) -> bool:
+        return not (self.addedVertices or self.changedVertices or self.removedVertexIds
+                    or self.addedEdges or self.removedEdges)
+
+
+def vertexRows(parsedCode: ParsedCodeModel) -> Dict[str, VertexChange]:
+    """Every vertex a ParsedCodeModel maps to, keyed by nodeId, in insertion order."""
+    file_node = parsedCode.file
+    rows: Dict[str, VertexChange] = {
+        file_node.id: VertexChange(
+            nodeId=file_node.id, label='File',
+            properties={'filePath': file_node.filePath, 'language': getattr(file_node, 'language', '')},
+        )
+    }
+    for label, nodes in (('Function', parsedCode.functions), ('Class', parsedCode.classes)):
+        for node in nodes:
+            rows[node.id] = VertexChange(
+                nodeId=node.id, label=label,
+                properties={
+                    'name': node.name,
+                    'fileId': node.fileId,
+                    'startLine': node.startLine,
+                    'endLine': node.endLine,
+                },
+            )
+    return rows
+
+
+def edgeKeys(parsedCode: ParsedCodeModel) -> List[EdgeKey]:
+    """Every edge a ParsedCodeModel maps to: one CONTAINS edge from the file to each symbol."""
+    file_id = parsedCode.file.id
+    return [(file_id, node.id, 'CONTAINS') for node in parsedCode.functions] + \
+        [(file_id, node.id, 'CONTAINS') for node in parsedCode.classes]
+
+
+def diffParsedCode(old: Optional[ParsedCodeModel], new: ParsedCodeModel) -> ParsedCodeDiff:
+    """
+    Compare two parses of the same file by nodeId and properties.
+    Edges incident to a removed vertex are not listed in removedEdges, since dropping
+    the vertex drops them as well. A vertex whose label changed is removed and re-added.
+    """
+    new_rows = vertexRows(new)
+    new_edges = edgeKeys(new)
+    if old is None:
+        return ParsedCodeDiff(addedVertices=list(new_rows.values()), addedEdges=new_edges)
+
+    old_rows = vertexRows(old)
+    diff = ParsedCodeDiff()
+    for node_id, row in new_rows.items():
+        previous = old_rows.get(node_id)
+        if previous is None or previous.label != row.label:
+            diff.addedVertices.append(row)
+            continue
+        changed = {k: v for k, v in row.properties.items() if previous.properties.get(k, _MISSING) != v}
+        removed = [k for k in previous.properties if k not in row.properties]
+        if changed or removed:
+            diff.changedVertices.append(
+                VertexChange(nodeId=node_id, label=row.label, properties=changed, removedKeys=removed)
+            )
+
+    readded: Set[str] = {row.nodeId for row in diff.addedVertices}
+    diff.removedVertexIds = [
+        node_id for node_id in old_rows if node_id not in new_rows or node_id in readded
+    ]
+    dropped = set(diff.removedVertexIds)
+
+    old_edge_set = set(edgeKeys(old))
+    new_edge_set = set(new_edges)
+    diff.addedEdges = [
+        e for e in new_edges
+        if e not in old_edge_set or e[0] in dropped or e[1] in dropped
+    ]
+    diff.removedEdges = [
+        e for e in sorted(old_edge_set - new_edge_set)
+        if e[0] not in dropped and e[1] not in dropped
+    ]
+    return diff
+
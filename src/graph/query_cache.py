@@ -0,0 +1,128 @@
+# src/graph/query_cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, NamedTuple, Optional, Set
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class _Entry(NamedTuple):
+    value: Any
+    nodeIds: frozenset
+    filePaths: frozenset
+    # Depends on parts of the graph it cannot name, e.g. a result cut off by a limit.
+    volatile: bool
+
+
+class QueryCache:
+    """
+    Least-recently-used cache of query results, invalidated by what ingests touch.
+
+    Each entry is stored with the node ids and file paths its result depends on.
+    `invalidate(nodeIds, filePaths)` drops exactly the entries sharing one of them,
+    plus volatile entries, which any change may affect.
+
+    Reads use begin() before querying and pass its token to put(): a result fetched
+    while an invalidation ran may predate the change and is not stored.
+    """
+
+    def __init__(self, maxEntries: int = DEFAULT_MAX_ENTRIES):
+        self.maxEntries = maxEntries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._byNode: Dict[str, Set[Hashable]] = {}
+        self._byFile: Dict[str, Set[Hashable]] = {}
+        self._volatile: Set[Hashable] = set()
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxEntries > 0
+
+    def get(self, key: Hashable) -> Any:
+        """The cached value for `key`, or None. Counts a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def begin(self) -> int:
+        with self._lock:
+            return self._epoch
+
+    def put(self, key: Hashable, value: Any, token: int, nodeIds: Iterable[str] = (),
+            filePaths: Iterable[str] = (), volatile: bool = False) -> None:
+        with self._lock:
+            if not self.enabled or token != self._epoch:
+                return
+            self._drop(key)
+            entry = _Entry(value, frozenset(nodeIds), frozenset(filePaths), volatile)
+            self._entries[key] = entry
+            for node_id in entry.nodeIds:
+                self._byNode.setdefault(node_id, set()).add(key)
+            for file_path in entry.filePaths:
+                self._byFile.setdefault(file_path, set()).add(key)
+            if volatile:
+                self._volatile.add(key)
+            while len(self._entries) > self.maxEntries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, nodeIds: Iterable[str] = (), filePaths: Iterable[str] = ()) -> int:
+        """Drop the entries depending on any of `nodeIds` or `filePaths`. Returns how many."""
+        with self._lock:
+            self._epoch += 1
+            keys = set(self._volatile)
+            for node_id in nodeIds:
+                keys.update(self._byNode.get(node_id, ()))
+            for file_path in filePaths:
+                keys.update(self._byFile.get(file_path, ()))
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            for index in (self._entries, self._byNode, self._byFile, self._volatile):
+                index.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'maxEntries': self.maxEntries,
+            }
+
+    def _drop(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        for node_id in entry.nodeIds:
+            self._discard(self._byNode, node_id, key)
+        for file_path in entry.filePaths:
+            self._discard(self._byFile, file_path, key)
+        self._volatile.discard(key)
+        return entry
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[Hashable]], name: str, key: Hashable) -> None:
+        keys = index.get(name)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[name]
@@ -0,0 +1,79 @@
+# src/graph/records.py
+from typing import Any, Iterable, List, Optional, Tuple
+from src.interfaces import GraphNodeData, GraphEdgeData
+
+# Properties are kept as a tuple of (key, value) pairs: a fraction of the size of a dict
+# and immutable, so stored records can be shared between readers.
+_Properties = Tuple[Tuple[str, Any], ...]
+
+
+class NodeRecord:
+    """
+    Compact, read-only stand-in for GraphNodeData on internal hot paths, such as graphs
+    held in memory. Several times smaller than the pydantic model; convert with
+    toModel() when handing a node out of the service.
+    """
+    __slots__ = ('id', 'type', 'name', 'filePath', 'startLine', 'properties')
+
+    def __init__(self, id: str, type: str, name: str, filePath: Optional[str] = None,
+                 startLine: Optional[int] = None, properties: _Properties = ()):
+        self.id = id
+        self.type = type
+        self.name = name
+        self.filePath = filePath
+        self.startLine = startLine
+        self.properties = properties
+
+    @classmethod
+    def fromModel(cls, node: GraphNodeData) -> 'NodeRecord':
+        return cls(node.id, node.type, node.name, node.filePath, node.startLine, tuple(node.properties.items()))
+
+    def toModel(self) -> GraphNodeData:
+        # The validating constructor: on pydantic 2 it is faster than model_construct.
+        return GraphNodeData(id=self.id, type=self.type, name=self.name, filePath=self.filePath,
+                             startLine=self.startLine, properties=dict(self.properties))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, NodeRecord):
+            return NotImplemented
+        return all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"NodeRecord(id={self.id!r}, type={self.type!r}, name={self.name!r})"
+
+
+class EdgeRecord:
+    """Compact, read-only stand-in for GraphEdgeData; see NodeRecord."""
+    __slots__ = ('id', 'sourceId', 'targetId', 'type', 'properties')
+
+    def __init__(self, id: str, sourceId: str, targetId: str, type: str, properties: _Properties = ()):
+        self.id = id
+        self.sourceId = sourceId
+        self.targetId = targetId
+        self.type = type
+        self.properties = properties
+
+    @classmethod
+    def fromModel(cls, edge: GraphEdgeData) -> 'EdgeRecord':
+        return cls(edge.id, edge.sourceId, edge.targetId, edge.type, tuple(edge.properties.items()))
+
+    def toModel(self) -> GraphEdgeData:
+        return GraphEdgeData(id=self.id, sourceId=self.sourceId, targetId=self.targetId,
+                             type=self.type, properties=dict(self.properties))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, EdgeRecord):
+            return NotImplemented
+        return all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"EdgeRecord(id={self.id!r}, type={self.type!r})"
+
+
+def toModels(records: Iterable[Any]) -> List[Any]:
+    """Convert NodeRecords or EdgeRecords to their pydantic models, at the API boundary."""
+    return [record.toModel() for record in records]
@@ -0,0 +1,330 @@
+# src/graph/symbol_table.py
+import os
+import threading
+from pathlib import PurePath
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from src.interfaces import CodeReference, ParsedCodeModel
+from src.graph.model_diff import EdgeKey
+from src.parser.code_parser import modulePath, qualifiedNameOf
+
+# Label and id prefix of the vertices standing in for targets outside the indexed files.
+PLACEHOLDER_LABEL = 'External'
+PLACEHOLDER_PREFIX = 'ext:'
+
+
+def placeholderId(targetName: str) -> str:
+    return PLACEHOLDER_PREFIX + targetName
+
+
+def isPlaceholder(nodeId: str) -> bool:
+    return nodeId.startswith(PLACEHOLDER_PREFIX)
+
+
+def _pathParts(directory: str) -> List[str]:
+    path = PurePath(directory)
+    return [p for p in path.parts if p != path.anchor]
+
+
+def hasInitFile(directory: str) -> bool:
+    return os.path.isfile(os.path.join(directory, '__init__.py'))
+
+
+def _prefixes(dottedName: str) -> List[str]:
+    """'a', 'a.b', 'a.b.c' for 'a.b.c'."""
+    parts = dottedName.split('.')
+    return ['.'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+class ReferencePlan(NamedTuple):
+    """What to write so the reference edges match the symbol table after an update."""
+    addEdges: List[EdgeKey]
+    removeEdges: List[EdgeKey]
+    # (nodeId, targetName) of placeholder vertices to create if missing.
+    addPlaceholders: List[Tuple[str, str]]
+    dropPlaceholders: List[str]
+
+    def nodeIds(self) -> Set[str]:
+        """Every vertex the plan touches, for cache invalidation."""
+        ids = {node_id for node_id, _ in self.addPlaceholders}
+        ids.update(self.dropPlaceholders)
+        for source, target, _ in self.addEdges + self.removeEdges:
+            ids.add(source)
+            ids.add(target)
+        return ids
+
+
+class SymbolTable:
+    """
+    Every indexed file's module names, symbols and outgoing references, held in memory
+    so CALLS, IMPORTS and INHERITS edges resolve across files without querying the graph.
+
+    A reference's dotted target name is matched against module names, longest first:
+    'pkg.mod.func' resolves to the function 'func' of pkg/mod.py (or pkg/mod/__init__.py)
+    where Python would import it from: the referring file's own directory when that is
+    not a package, a workspace root in `roots`, or the directory holding the outermost
+    package (the top of its chain of directories with an __init__.py). A file is never
+    matched on its last path segments alone, so 'json.dumps' does not resolve into
+    tests/fixtures/json.py. When several files match, the one sharing the longest
+    directory prefix with the referring file wins. Targets that match no indexed symbol
+    point at a placeholder vertex ('ext:pkg.mod.func', label External), which is dropped
+    once nothing references it. Relative imports arrive spelled from the filesystem
+    root, which every file's full path also matches.
+
+    update() and remove() return a ReferencePlan. Besides the changed file's own
+    edges, it re-resolves the files whose references point into it, or at placeholders
+    it may now define, so the graph stays consistent as files arrive in any order.
+    """
+
+    def __init__(self, roots: Iterable[str] = (), isPackage: Callable[[str], bool] = hasInitFile):
+        self._lock = threading.Lock()
+        self._roots = [_pathParts(root) for root in roots]
+        # Directory -> whether it holds an __init__.py, asked once per directory.
+        self.isPackage = isPackage
+        self._packages: Dict[str, bool] = {}
+        # filePath -> qualified name -> node id; the file itself is ''.
+        self._symbols: Dict[str, Dict[str, str]] = {}
+        self._pathsById: Dict[str, str] = {}
+        self._references: Dict[str, List[CodeReference]] = {}
+        # Dotted module name (every suffix of a file's module path) -> files.
+        self._modules: Dict[str, Set[str]] = {}
+        # filePath -> reference edges currently written for it.
+        self._edges: Dict[str, Set[EdgeKey]] = {}
+        # Target file (or placeholder id) -> files with edges pointing there.
+        self._incoming: Dict[str, Set[str]] = {}
+        # Prefix of a placeholder's name -> placeholder ids, to find those a new file may define.
+        self._placeholdersByPrefix: Dict[str, Set[str]] = {}
+        self._placeholderUses: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def filePathOf(self, fileId: str) -> Optional[str]:
+        """The path of an indexed file, by the id of its File node."""
+        return self._pathsById.get(fileId)
+
+    def update(self, parsedCodes: Iterable[ParsedCodeModel], recreated: Iterable[str] = ()) -> ReferencePlan:
+        """
+        Register the symbols and references of `parsedCodes`, replacing what their files
+        had before. `recreated` names vertices that were dropped and written again, whose
+        edges must therefore be written again even where the resolution did not change.
+        """
+        with self._lock:
+            affected: Set[str] = set()
+            for parsedCode in parsedCodes:
+                file_path = parsedCode.file.filePath
+                affected |= self._unregister(file_path)
+                self._register(parsedCode)
+                affected.add(file_path)
+                affected |= self._waitingOn(file_path)
+            return self._replan(affected, set(recreated))
+
+    def seed(self, parsedCodes: Iterable[ParsedCodeModel]) -> ReferencePlan:
+        """
+        Register files whose vertices and reference edges are already in the graph, e.g.
+        from a previous session, so that re-ingesting their targets writes those edges
+        again. Files the table already knows are left alone. The plan only covers the
+        other files with placeholder edges the seeded files now resolve.
+        """
+        with self._lock:
+            seeded: Set[str] = set()
+            for parsedCode in parsedCodes:
+                file_path = parsedCode.file.filePath
+                if file_path not in self._symbols:
+                    self._register(parsedCode)
+                    seeded.add(file_path)
+            waiting: Set[str] = set()
+            for file_path in seeded:
+                waiting |= self._waitingOn(file_path)
+            # The seeded files' edges and placeholders are recorded, not written.
+            self._replan(seeded, set())
+            return self._replan(waiting - seeded, set())
+
+    def remove(self, filePaths: Iterable[str]) -> ReferencePlan:
+        """Forget files whose vertices were dropped, along with their outgoing edges."""
+        with self._lock:
+            affected: Set[str] = set()
+            gone: Set[str] = set()
+            for file_path in filePaths:
+                if file_path not in self._symbols:
+                    continue
+                affected |= self._unregister(file_path)
+                gone.add(file_path)
+            affected -= gone
+            plan = self._replan(affected, set())
+            # The dropped files' own edges went with their vertices.
+            for file_path in gone:
+                for edge in self._edges.pop(file_path, ()):
+                    self._unlink(edge[1], file_path)
+                    self._release(edge[1], plan.dropPlaceholders)
+            return plan
+
+    def resolve(self, sourcePath: str, reference: CodeReference) -> str:
+        """The node id a reference points at: an indexed symbol or file, or a placeholder."""
+        if reference.targetId:
+            return reference.targetId
+        name = reference.targetName
+        parts = name.split('.')
+        # A file outside any package imports its siblings by name, like a script does.
+        directory = os.path.dirname(sourcePath)
+        siblings = [] if self._isPackage(directory) else _pathParts(directory)
+        for split in range(len(parts), 0, -1):
+            module = parts[:split]
+            files = siblings and self._modules.get('.'.join(siblings + module)) \
+                or self._modules.get('.'.join(module))
+            if not files:
+                continue
+            symbols = self._symbols[self._closest(sourcePath, files)]
+            rest = parts[split:]
+            # 'Class.attr' falls back to 'Class' when the attribute is not a symbol.
+            for end in range(len(rest), 0, -1):
+                target = symbols.get('.'.join(rest[:end]))
+                if target:
+                    return target
+            if not rest or reference.type == 'IMPORTS':
+                return symbols['']
+            break
+        return placeholderId(name)
+
+    def _register(self, parsedCode: ParsedCodeModel) -> None:
+        file_path = parsedCode.file.filePath
+        symbols = {'': parsedCode.file.id}
+        for symbol in list(parsedCode.functions) + list(parsedCode.classes):
+            symbols.setdefault(qualifiedNameOf(symbol.id) or symbol.name, symbol.id)
+        self._symbols[file_path] = symbols
+        self._pathsById[parsedCode.file.id] = file_path
+        self._references[file_path] = list(parsedCode.references)
+        for module in self._moduleNames(file_path):
+            self._modules.setdefault(module, set()).add(file_path)
+
+    def _unregister(self, file_path: str) -> Set[str]:
+        """Drop a file's symbols; returns the other files whose edges may point into it."""
+        if file_path not in self._symbols:
+            return set()
+        for module in self._moduleNames(file_path):
+            files = self._modules.get(module)
+            if files is not None:
+                files.discard(file_path)
+                if not files:
+                    del self._modules[module]
+        self._pathsById.pop(self._symbols.pop(file_path)[''], None)
+        del self._references[file_path]
+        return set(self._incoming.get(file_path, ())) - {file_path}
+
+    def _waitingOn(self, file_path: str) -> Set[str]:
+        """Files with placeholder edges whose name may now resolve into `file_path`."""
+        sources: Set[str] = set()
+        names = self._moduleNames(file_path)
+        if not self._isPackage(os.path.dirname(file_path)):
+            # Its siblings may import it by its bare name; the re-plan sorts out the rest.
+            names.append(modulePath(file_path)[-1])
+        for module in names:
+            for placeholder in self._placeholdersByPrefix.get(module, ()):
+                sources |= self._incoming.get(placeholder, set())
+        return sources
+
+    def _replan(self, affected: Set[str], recreated: Set[str]) -> ReferencePlan:
+        plan = ReferencePlan([], [], [], [])
+        for source_path in sorted(affected):
+            old = self._edges.get(source_path, set())
+            new: Set[EdgeKey] = set()
+            for reference in self._references.get(source_path, ()):
+                target = self.resolve(source_path, reference)
+                if target != reference.sourceId:
+                    new.add((reference.sourceId, target, reference.type))
+            for edge in old:
+                self._unlink(edge[1], source_path)
+            for edge in sorted(new):
+                source, target, _ = edge
+                self._incoming.setdefault(self._targetKey(target), set()).add(source_path)
+                if edge not in old:
+                    self._hold(target, plan.addPlaceholders)
+                    plan.addEdges.append(edge)
+                elif source in recreated or target in recreated:
+                    plan.addEdges.append(edge)
+            for edge in sorted(old - new):
+                plan.removeEdges.append(edge)
+                self._release(edge[1], plan.dropPlaceholders)
+            if new:
+                self._edges[source_path] = new
+            else:
+                self._edges.pop(source_path, None)
+        return plan
+
+    def _targetKey(self, target: str) -> str:
+        # Edges are indexed by the file holding their target, or by the placeholder.
+        if isPlaceholder(target):
+            return target
+        if target.startswith('file:'):
+            return target[len('file:'):]
+        return target.split(':', 1)[1].split('::', 1)[0] if '::' in target else target
+
+    def _unlink(self, target: str, source_path: str) -> None:
+        key = self._targetKey(target)
+        sources = self._incoming.get(key)
+        if sources is not None:
+            sources.discard(source_path)
+            if not sources:
+                del self._incoming[key]
+
+    def _hold(self, target: str, created: List[Tuple[str, str]]) -> None:
+        if not isPlaceholder(target):
+            return
+        uses = self._placeholderUses.get(target, 0)
+        self._placeholderUses[target] = uses + 1
+        if uses == 0:
+            name = target[len(PLACEHOLDER_PREFIX):]
+            created.append((target, name))
+            for prefix in _prefixes(name):
+                self._placeholdersByPrefix.setdefault(prefix, set()).add(target)
+
+    def _release(self, target: str, dropped: List[str]) -> None:
+        if not isPlaceholder(target):
+            return
+        uses = self._placeholderUses.get(target, 0) - 1
+        if uses > 0:
+            self._placeholderUses[target] = uses
+            return
+        self._placeholderUses.pop(target, None)
+        dropped.append(target)
+        for prefix in _prefixes(target[len(PLACEHOLDER_PREFIX):]):
+            ids = self._placeholdersByPrefix.get(prefix)
+            if ids is not None:
+                ids.discard(target)
+                if not ids:
+                    del self._placeholdersByPrefix[prefix]
+
+    def _moduleNames(self, file_path: str) -> List[str]:
+        """The names a file is importable by: its full path, and from each root and package top."""
+        parts = modulePath(file_path)
+        starts = {0}
+        for root in self._roots:
+            if len(parts) > len(root) and parts[:len(root)] == root:
+                starts.add(len(root))
+        directory = os.path.dirname(file_path)
+        if self._isPackage(directory):
+            while self._isPackage(os.path.dirname(directory)) and os.path.dirname(directory) != directory:
+                directory = os.path.dirname(directory)
+            # The top package's own name is the first part of the module name.
+            starts.add(len(_pathParts(directory)) - 1)
+        return ['.'.join(parts[start:]) for start in sorted(starts) if start < len(parts)]
+
+    def _isPackage(self, directory: str) -> bool:
+        known = self._packages.get(directory)
+        if known is None:
+            known = self._packages[directory] = self.isPackage(directory)
+        return known
+
+    @staticmethod
+    def _closest(source_path: str, files: Set[str]) -> str:
+        if len(files) == 1:
+            return next(iter(files))
+        source = modulePath(source_path)
+
+        def shared(file_path: str) -> int:
+            count = 0
+            for a, b in zip(source, modulePath(file_path)):
+                if a != b:
+                    break
+                count += 1
+            return count
+        return min(files, key=lambda f: (-shared(f), f))
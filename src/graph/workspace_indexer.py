@@ -0,0 +1,254 @@
+# src/graph/workspace_indexer.py
+import gc
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from src.interfaces import IGraphQueryService, ParsedCodeModel
+from src.graph.index_store import IndexStore, IndexedFile, indexedFile
+from src.graph.ingest_cache import IngestCache, fingerprint
+from src.parser.code_parser import CodeParserService
+from src.file_walker import DEFAULT_EXCLUDES, walk_python_files
+
+# Files handed to a pool worker per task, and parsed files written to the graph per batch.
+DEFAULT_PARSE_CHUNK = 32
+DEFAULT_WRITE_BATCH = 64
+
+# (path, parsed model or None, content digest, encoded size, error message or None)
+ParseResult = Tuple[str, Optional[ParsedCodeModel], str, int, Optional[str]]
+
+_PARSER = CodeParserService()
+
+
+class IndexSummary(BaseModel):
+    """Outcome of one workspace indexing run."""
+    files: int = Field(0, description="Python files found under the workspace roots.")
+    indexed: int = Field(0, description="Files parsed and written to the graph.")
+    failed: int = Field(0, description="Files that could not be read or parsed.")
+    skipped: int = Field(0, description="Files left out by the caller's skip filter.")
+    unchanged: int = Field(0, description="Files the index store showed were already ingested.")
+    removed: int = Field(0, description="Files deleted since the last run, removed from the graph.")
+    requests: int = Field(0, description="Round trips made to the graph database.")
+    durationMs: float = Field(0.0, description="Wall time of the run, in milliseconds.")
+    errors: List[str] = Field([], description="One 'path: error' line per failed file.")
+
+
+def iterPythonFiles(root: str, excludes: Iterable[str] = DEFAULT_EXCLUDES) -> Iterator[str]:
+    """
+    Yield every .py file under `root`, without descending into directories matched by
+    `excludes` (.gitignore patterns) or a .gitignore, or into virtualenvs.
+    """
+    for full_path, _, _ in walk_python_files(root, tuple(excludes)):
+        yield full_path
+
+
+def parseFiles(paths: List[str]) -> List[ParseResult]:
+    """
+    Read and parse a chunk of files. Runs inside pool worker processes, where it is the
+    only work done, so the cyclic GC can be paused for the chunk: the ASTs hold no
+    cycles, and collections triggered mid-parse only cost time. (Spawned workers
+    re-import the server module as __mp_main__ and so also start its ingest queue
+    thread, but nothing is ever submitted to it there. The collector is process-wide,
+    so this is not done in CodeParserService, which the server calls from several
+    threads.)
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [_parseFile(path) for path in paths]
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _parseFile(path: str) -> ParseResult:
+    try:
+        # newline='' keeps the text byte-for-byte as an editor would send it, so the
+        # digest matches the one computed for the open document later.
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            source = f.read()
+        digest, size = fingerprint(source)
+        return path, _PARSER.parseCode(Path(path), source), digest, size, None
+    except (OSError, UnicodeDecodeError, SyntaxError, ValueError) as e:
+        return path, None, '', 0, f"{type(e).__name__}: {e}"
+
+
+class WorkspaceIndexer:
+    """
+    Cold-indexes whole workspace folders: files are parsed in parallel in a process pool,
+    and the results are streamed into the graph in multi-file batches as they complete.
+    """
+
+    def __init__(self, graphQueryService: IGraphQueryService,
+                 jobs: Optional[int] = None,
+                 parseChunk: int = DEFAULT_PARSE_CHUNK,
+                 writeBatch: int = DEFAULT_WRITE_BATCH,
+                 ingestCache: Optional[IngestCache] = None,
+                 onProgress: Optional[Callable[[int, int], None]] = None,
+                 shouldSkip: Optional[Callable[[str], bool]] = None,
+                 indexStore: Optional[IndexStore] = None):
+        self.graphQueryService = graphQueryService
+        self.jobs = jobs or os.cpu_count() or 1
+        self.parseChunk = max(1, parseChunk)
+        self.writeBatch = max(1, writeBatch)
+        self.ingestCache = ingestCache
+        self.onProgress = onProgress
+        # Lets the caller leave out files it manages itself, e.g. documents open in the editor.
+        self.shouldSkip = shouldSkip
+        # Records what previous runs ingested, so unchanged files are not parsed again.
+        self.indexStore = indexStore
+        self._stored: Dict[str, IndexedFile] = {}
+        self._fingerprints: Dict[str, Tuple[int, int]] = {}
+        # Models of files left unchanged, not yet seeded into the graph service.
+        self._unseeded: List[ParsedCodeModel] = []
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop after the parse results already received; pending chunks are discarded."""
+        self._cancelled.set()
+
+    def index(self, roots: Iterable[str]) -> IndexSummary:
+        started = time.perf_counter()
+        found = [path for root in roots for path in iterPythonFiles(root)]
+        summary = IndexSummary(files=len(found))
+        self._stored = self.indexStore.loadAll() if self.indexStore else {}
+        self._fingerprints = {}
+        self._unseeded = []
+        paths = self._changedFiles(found, summary)
+        self._removeDeleted(found, summary)
+        self._seed()
+        total = len(paths)
+        self._report(0, total)
+        if not paths:
+            summary.durationMs = (time.perf_counter() - started) * 1000.0
+            return summary
+
+        done = 0
+        batch: List[ParseResult] = []
+        # Not fork: the server has the ingest worker, graph connection and pygls threads
+        # running by now, and a forked child could inherit a lock one of them holds.
+        with ProcessPoolExecutor(max_workers=self.jobs, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [
+                pool.submit(parseFiles, paths[i:i + self.parseChunk])
+                for i in range(0, total, self.parseChunk)
+            ]
+            try:
+                for future in as_completed(futures):
+                    if self._cancelled.is_set():
+                        break
+                    for result in future.result():
+                        done += 1
+                        path, model, _, _, error = result
+                        if model is None:
+                            summary.failed += 1
+                            summary.errors.append(f"{path}: {error}")
+                        elif self.shouldSkip and self.shouldSkip(path):
+                            summary.skipped += 1
+                        elif self._contentUnchanged(result):
+                            summary.unchanged += 1
+                        else:
+                            batch.append(result)
+                    if len(batch) >= self.writeBatch:
+                        self._write(batch, summary)
+                        batch = []
+                    self._report(done, total)
+            finally:
+                for future in futures:
+                    future.cancel()
+        if batch and not self._cancelled.is_set():
+            self._write(batch, summary)
+        self._seed()
+        self._report(done, total)
+        summary.durationMs = (time.perf_counter() - started) * 1000.0
+        return summary
+
+    def _write(self, batch: List[ParseResult], summary: IndexSummary) -> None:
+        # Unchanged files must be in the symbol table before their targets are re-ingested.
+        self._seed()
+        stats = self.graphQueryService.ingestParsedCodeBatch([model for _, model, _, _, _ in batch])
+        summary.indexed += len(batch)
+        summary.requests += stats.requestCount if stats else 0
+        if self.ingestCache:
+            # Only the digest is recorded; caching every parsed model would just churn the LRU.
+            for path, _, digest, _, _ in batch:
+                self.ingestCache.markIngested(path, digest)
+        if self.indexStore:
+            self.indexStore.upsertMany(
+                self._record(path, digest, model) for path, model, digest, _, _ in batch
+            )
+
+    def _seed(self) -> None:
+        """
+        Register the symbols and references of files that are not re-ingested, so edges
+        into the files that are get written again.
+        """
+        if self._unseeded:
+            self.graphQueryService.seedSymbols(self._unseeded)
+            self._unseeded = []
+
+    def _changedFiles(self, paths: List[str], summary: IndexSummary) -> List[str]:
+        """
+        The files whose mtime or size differ from the index store's record, or whose
+        record predates stored models: skipping those would leave their symbols unknown.
+        """
+        changed: List[str] = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            self._fingerprints[path] = (st.st_mtime_ns, st.st_size)
+            record = self._stored.get(path)
+            if (record and record.model is not None
+                    and record.mtimeNs == st.st_mtime_ns and record.size == st.st_size):
+                summary.unchanged += 1
+                self._unseeded.append(record.model)
+                if self.ingestCache:
+                    self.ingestCache.markIngested(path, record.digest)
+            else:
+                changed.append(path)
+        return changed
+
+    def _contentUnchanged(self, result: ParseResult) -> bool:
+        """
+        True if a file that looked changed (e.g. touched, or rewritten by a branch switch)
+        hashes the same as when it was ingested; only its fingerprint is refreshed.
+        """
+        path, model, digest, _, _ = result
+        record = self._stored.get(path)
+        if record is None or record.digest != digest:
+            return False
+        self.indexStore.upsertMany([self._record(path, digest, model)])
+        self._unseeded.append(model)
+        if self.ingestCache:
+            self.ingestCache.markIngested(path, digest)
+        return True
+
+    def _removeDeleted(self, found: List[str], summary: IndexSummary) -> None:
+        """Drop the nodes of files the store knows about that no longer exist."""
+        present = set(found)
+        deleted = [record for path, record in self._stored.items() if path not in present]
+        if not deleted:
+            return
+        # Known to the symbol table first, so removing them re-points the edges into them.
+        self._unseeded.extend(record.model for record in deleted if record.model is not None)
+        self._seed()
+        self.graphQueryService.removeNodes([node_id for record in deleted for node_id in record.nodeIds])
+        self.indexStore.remove(record.path for record in deleted)
+        if self.ingestCache:
+            # Should the file come back with the same content, it must be ingested again.
+            for record in deleted:
+                self.ingestCache.invalidate(record.path)
+        summary.removed = len(deleted)
+
+    def _record(self, path: str, digest: str, model: ParsedCodeModel) -> IndexedFile:
+        mtime_ns, size = self._fingerprints[path]
+        return indexedFile(path, mtime_ns, size, digest, model)
+
+    def _report(self, done: int, total: int) -> None:
+        if self.onProgress:
+            self.onProgress(done, total)
@@ -1,8 +1,19 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from pydantic import BaseModel, Field
 import uuid
+from src.columnar import EdgeColumns, NodeColumns
+
+# Nodes per page when paging through getNodesPage / iterNodes.
+DEFAULT_PAGE_SIZE = 1000
+
+# Edges written for the references a parser finds between symbols and modules.
+REFERENCE_EDGE_TYPES = ('CALLS', 'IMPORTS', 'INHERITS')
+
+# Bounds of a getTransitiveDependents walk unless the caller sets them.
+DEFAULT_DEPENDENTS_DEPTH = 5
+DEFAULT_DEPENDENTS_LIMIT = 1000
 
 # --- Pydantic Data Models (Shared Contracts) --- 
  
@@ -30,11 +41,19 @@ class ClassNode(BaseModel):
     endLine: int = Field(..., description="Ending line number (0-indexed).") 
     # Add other relevant properties like 'bases', 'methods' later 
  
+class CodeReference(BaseModel):
+    """A CALLS, IMPORTS or INHERITS reference from a node of a file to a symbol or module."""
+    sourceId: str = Field(..., description="ID of the referring node (function, class, or the file for module level).")
+    type: str = Field(..., description="Edge type: 'CALLS', 'IMPORTS' or 'INHERITS'.")
+    targetName: str = Field(..., description="Dotted name of the target, e.g. 'pkg.module.func', resolved across files.")
+    targetId: Optional[str] = Field(None, description="ID of the target when it is defined in the same file.")
+
 class ParsedCodeModel(BaseModel): 
     """Represents the structured data extracted from a single source code file.""" 
     file: FileNode 
     functions: List[FunctionNode] = []
     classes: List[ClassNode] = [] 
+    references: List[CodeReference] = []
     # Add other types of nodes like 'variables', 'imports' as needed later 
  
 class GraphNodeData(BaseModel): 
@@ -53,7 +72,31 @@ class GraphEdgeData(BaseModel):
     targetId: str = Field(..., description="ID of the target node.") 
     type: str = Field(..., description="Type/label of the edge (e.g., 'CONTAINS', 'CALLS').") 
     properties: Dict[str, Any] = Field({}, description="Additional properties of the edge.") 
+
+class IngestStats(BaseModel):
+    """Summary of a single ingestParsedCode call, for logging and performance tracking."""
+    filePath: Optional[str] = Field(None, description="Path of the ingested file; None for a multi-file batch.")
+    fileCount: int = Field(1, description="Number of files ingested.")
+    requestCount: int = Field(0, description="Number of round trips made to the graph database.")
+    vertexCount: int = Field(0, description="Number of vertices written.")
+    edgeCount: int = Field(0, description="Number of edges written.")
+    removedCount: int = Field(0, description="Number of vertices and edges removed by an incremental ingest.")
+    incremental: bool = Field(False, description="True if only the difference from the previous ingest was sent.")
+    durationMs: float = Field(0.0, description="Wall time spent on the ingest, in milliseconds.")
  
+class NodePage(BaseModel):
+    """One page of nodes, ordered by id, from a paginated node query."""
+    nodes: List[GraphNodeData] = Field([], description="Nodes of this page, ordered by id.")
+    nextCursor: Optional[str] = Field(None, description="Pass as 'after' to get the next page; None on the last page.")
+
+class DependentsResult(BaseModel):
+    """Nodes that depend on a node, directly or through others, from getTransitiveDependents."""
+    nodeId: str = Field(..., description="ID of the node the walk started from.")
+    nodes: List[GraphNodeData] = Field([], description="Dependent nodes, nearest first.")
+    depths: Dict[str, int] = Field({}, description="Number of edges between each dependent and the start node.")
+    truncated: bool = Field(False, description="True if `limit` cut the result short.")
+    durationMs: float = Field(0.0, description="Wall time spent on the query, in milliseconds.")
+
 # Models for LLM communication 
 class LLMContext(BaseModel): 
     """Represents the context extracted from the graph for LLM input.""" 
@@ -101,35 +144,133 @@ class IGraphQueryService(ABC):
     Implemented by Developer 2. Used by Developer 3 and LSP Server Manager. 
     """ 
     @abstractmethod 
-    def ingestParsedCode(self, parsedCode: ParsedCodeModel): 
+    def ingestParsedCode(self, parsedCode: ParsedCodeModel) -> Optional[IngestStats]: 
         """ 
         Ingests parsed code data into the graph database, creating/updating nodes and edges. 
         This method consumes the output of ICodeParserService. 
+        Returns an IngestStats summary of the work done, if the implementation tracks it.
         """ 
         pass 
  
+    def ingestParsedCodeBatch(self, parsedCodes: List[ParsedCodeModel]) -> IngestStats:
+        """
+        Ingests several files at once, e.g. during workspace indexing. Implementations
+        that talk to a remote database should share round trips between files.
+        Returns aggregate IngestStats for the whole batch.
+        """
+        batch = IngestStats(fileCount=len(parsedCodes))
+        for parsedCode in parsedCodes:
+            stats = self.ingestParsedCode(parsedCode)
+            if stats:
+                batch.requestCount += stats.requestCount
+                batch.vertexCount += stats.vertexCount
+                batch.edgeCount += stats.edgeCount
+                batch.removedCount += stats.removedCount
+                batch.durationMs += stats.durationMs
+        return batch
+
+    @abstractmethod
+    def removeNodes(self, nodeIds: List[str]) -> Optional[IngestStats]:
+        """
+        Removes nodes and their edges by id, e.g. for files deleted from the workspace.
+        """
+        pass
+
+    def seedSymbols(self, parsedCodes: List[ParsedCodeModel]) -> int:
+        """
+        Tells the service what files ingested in an earlier session hold, e.g. from a
+        persistent index, so reference edges into them survive their next re-ingest.
+        Only for files whose vertices and edges are already in the graph. Returns the
+        number of files the service did not know yet; backends that keep no symbol table
+        (or whose graph does not outlive the process) have nothing to seed.
+        """
+        return 0
+
     @abstractmethod 
-    def getAllNodes(self, nodeType: Optional[str] = None) -> List[GraphNodeData]: 
+    def getAllNodes(self, nodeType: Optional[str] = None, fields: Optional[List[str]] = None) -> List[GraphNodeData]: 
         """ 
         Retrieves all graph nodes, optionally filtered by type. 
+        `fields` names the GraphNodeData fields (or property keys) the caller needs; 
+        implementations may skip fetching the others, leaving them at their defaults. 
+        The id is always filled in. None fetches everything. 
         """ 
         pass 
  
+    def getNodesPage(self, nodeType: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                     after: Optional[str] = None, fields: Optional[List[str]] = None) -> NodePage:
+        """
+        Retrieves up to `limit` nodes with an id greater than `after`, ordered by id,
+        optionally filtered by type. Follow nextCursor to walk the whole graph page by page.
+        This default pages over getAllNodes(); implementations should push it down.
+        """
+        nodes = sorted((n for n in self.getAllNodes(nodeType, fields) if after is None or n.id > after), key=lambda n: n.id)
+        page = nodes[:limit]
+        return NodePage(nodes=page, nextCursor=page[-1].id if len(nodes) > limit else None)
+
+    def iterNodes(self, nodeType: Optional[str] = None, pageSize: int = DEFAULT_PAGE_SIZE,
+                  fields: Optional[List[str]] = None) -> Iterator[GraphNodeData]:
+        """
+        Yields every node, optionally filtered by type, fetching one page at a time so
+        that at most `pageSize` nodes are held in memory.
+        """
+        after = None
+        while True:
+            page = self.getNodesPage(nodeType, pageSize, after, fields)
+            yield from page.nodes
+            if page.nextCursor is None:
+                return
+            after = page.nextCursor
+
     @abstractmethod
-    def getConnectedNodes(self, nodeId: str, edgeType: Optional[str] = None) -> List[GraphNodeData]: 
+    def getConnectedNodes(self, nodeId: str, edgeType: Optional[str] = None, fields: Optional[List[str]] = None) -> List[GraphNodeData]: 
         """ 
         Retrieves nodes connected to a given node, optionally filtered by edge type. 
         """ 
         pass 
  
     @abstractmethod 
-    def getCodeGraphSnapshot(self, filePath: str) -> Dict[str, Any]: 
+    def getCodeGraphSnapshot(self, filePath: str, hops: int = 0, limit: Optional[int] = None,
+                             fields: Optional[List[str]] = None) -> Dict[str, Any]: 
         """ 
         Retrieves a simplified graph structure (nodes and edges) for a given file 
         or a specific subgraph, suitable for visualization. 
-        Returns a dictionary like {'nodes': [...], 'edges': [...]}. 
+        With `hops` > 0 the nodes up to that many edges away from the file's nodes are 
+        included too; `limit` caps the number of nodes and of edges returned. 
+        Returns a dictionary like {'nodes': [...], 'edges': [...], 'truncated': bool}. 
         """ 
         pass 
+
+    @abstractmethod
+    def getTransitiveDependents(self, nodeId: str, edgeTypes: Optional[List[str]] = None,
+                                maxDepth: int = DEFAULT_DEPENDENTS_DEPTH,
+                                limit: int = DEFAULT_DEPENDENTS_LIMIT) -> DependentsResult:
+        """
+        Everything affected by a change to `nodeId`: the nodes with an edge of `edgeTypes`
+        (default: CALLS, IMPORTS, INHERITS) into it, the nodes with such an edge into
+        those, and so on, up to `maxDepth` edges away. Each node is listed once, at its
+        shortest distance, nearest first; at most `limit` are returned.
+        Computed by the backend in one query rather than one getConnectedNodes() per hop.
+        """
+        pass
+
+    def getNodeColumns(self, nodeType: Optional[str] = None) -> NodeColumns:
+        """
+        getAllNodes() in columnar form, for consumers that want thousands of nodes at once,
+        e.g. to count functions per file. This default converts getAllNodes();
+        implementations should build the columns without making a model per node.
+        """
+        return NodeColumns.fromNodes(self.getAllNodes(nodeType))
+
+    def getCodeGraphSnapshotColumns(self, filePath: str, hops: int = 0,
+                                    limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        getCodeGraphSnapshot() in columnar form:
+        {'nodes': NodeColumns, 'edges': EdgeColumns, 'truncated': bool}.
+        """
+        snapshot = self.getCodeGraphSnapshot(filePath, hops, limit)
+        nodes = NodeColumns.fromNodes(snapshot['nodes'])
+        return {'nodes': nodes, 'edges': EdgeColumns.fromEdges(snapshot['edges'], nodes),
+                'truncated': snapshot.get('truncated', False)}
  
 class ILLMService(ABC): 
     """ 
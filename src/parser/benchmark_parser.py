@@ -0,0 +1,110 @@
+# src/parser/benchmark_parser.py
+"""
+Micro-benchmark for CodeParserService.parseCode.
+
+Run from the extension root:
+    python -m src.parser.benchmark_parser [--lines 10000] [--repeat 20] [--target-ms 50]
+
+Exits with status 1 if the best run is slower than the target.
+"""
+import argparse
+import ast
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from src.parser.code_parser import CodeParserService
+
+_CLASS_TEMPLATE = '''
+class Service{n}(Base):
+    """Service number {n}."""
+
+    retries = {n}
+
+    def __init__(self, value):
+        self.value = value
+        self.items = [i * 2 for i in range(value)]
+
+    @property
+    def total(self):
+        return sum(self.items) + self.value
+
+    async def fetch(self, key, default=None):
+        if key in self.items:
+            return await self.lookup(key)
+        return default
+
+    class Config:
+        enabled = True
+
+        def describe(self):
+            return "config {n}"
+
+
+def helper_{n}(a, b=1, *args, **kwargs):
+    def inner(x):
+        return x + a
+    try:
+        result = inner(b)
+    except ValueError:
+        result = None
+    for item in args:
+        if item:
+            result = (result or 0) + item
+    return result
+
+
+async def task_{n}(queue):
+    async with queue.lock:
+        while not queue.empty():
+            await queue.get()
+'''
+
+
+def generateSource(lines: int) -> str:
+    """Synthetic module mixing classes, methods, nested classes and (async) functions."""
+    chunks = []
+    total = 0
+    n = 0
+    while total < lines:
+        chunk = _CLASS_TEMPLATE.format(n=n)
+        chunks.append(chunk)
+        total += chunk.count('\n')
+        n += 1
+    return ''.join(chunks)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=10000, help='Approximate size of the generated file.')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of timed runs.')
+    parser.add_argument('--target-ms', type=float, default=50.0, help='Budget for the best run.')
+    args = parser.parse_args(argv)
+
+    source = generateSource(args.lines)
+    service = CodeParserService()
+    path = Path('/benchmark/generated_module.py')
+    model = service.parseCode(path, source)  # warm-up
+
+    timings = []
+    parse_timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        service.parseCode(path, source)
+        timings.append((time.perf_counter() - started) * 1000.0)
+        # ast.parse alone: the floor no change to the collector can go below.
+        started = time.perf_counter()
+        ast.parse(source)
+        parse_timings.append((time.perf_counter() - started) * 1000.0)
+
+    best = min(timings)
+    print(f"Parsed {source.count(chr(10))} lines: {len(model.functions)} functions, {len(model.classes)} classes")
+    print(f"best {best:.2f} ms, median {statistics.median(timings):.2f} ms over {args.repeat} runs "
+          f"(target {args.target_ms:.0f} ms)")
+    print(f"ast.parse alone: best {min(parse_timings):.2f} ms, median {statistics.median(parse_timings):.2f} ms")
+    return 0 if best <= args.target_ms else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+# src/parser/code_parser.py
+import ast
+from pathlib import Path, PurePath
+from typing import Dict, List, Optional, Tuple
+from src.interfaces import ICodeParserService, ParsedCodeModel, FileNode, FunctionNode, ClassNode, CodeReference
+
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'python',
+    '.pyi': 'python',
+    '.pyw': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.java': 'java',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.c': 'c',
+    '.cpp': 'cpp',
+}
+
+# Statement fields that hold nested statement lists, for every compound statement
+# that is not itself a definition. Definitions found inside them keep the enclosing scope.
+_NESTED_BODIES: Dict[type, Tuple[str, ...]] = {
+    ast.If: ('body', 'orelse'),
+    ast.For: ('body', 'orelse'),
+    ast.AsyncFor: ('body', 'orelse'),
+    ast.While: ('body', 'orelse'),
+    ast.With: ('body',),
+    ast.AsyncWith: ('body',),
+    ast.Try: ('body', 'handlers', 'orelse', 'finalbody'),
+}
+if hasattr(ast, 'TryStar'):
+    _NESTED_BODIES[ast.TryStar] = ('body', 'handlers', 'orelse', 'finalbody')
+if hasattr(ast, 'Match'):
+    _NESTED_BODIES[ast.Match] = ('cases',)
+
+
+def fileNodeId(filePath: str) -> str:
+    return f"file:{filePath}"
+
+
+def symbolNodeId(kind: str, filePath: str, qualifiedName: str) -> str:
+    """Stable id for a symbol: the same path and qualified name always give the same id."""
+    return f"{kind}:{filePath}::{qualifiedName}"
+
+
+def qualifiedNameOf(nodeId: str) -> str:
+    """The qualified name inside a symbol id made by symbolNodeId."""
+    return nodeId.split('::', 1)[1] if '::' in nodeId else ''
+
+
+def modulePath(filePath: str) -> List[str]:
+    """
+    The dotted-name parts a file's path spells, e.g. ['w', 'pkg', 'mod'] for /w/pkg/mod.py
+    and ['w', 'pkg'] for /w/pkg/__init__.py. A module imported as 'pkg.mod' is one whose
+    parts end with those names.
+    """
+    path = PurePath(filePath)
+    parts = [p for p in path.with_suffix('').parts if p != path.anchor]
+    if parts and parts[-1] == '__init__':
+        parts.pop()
+    return parts
+
+
+class CodeParserService(ICodeParserService):
+    """ICodeParserService for Python sources, built on the standard library `ast` module."""
+
+    def identifyLanguage(self, filePath: Path) -> str:
+        return LANGUAGE_BY_EXTENSION.get(Path(filePath).suffix.lower(), 'unknown')
+
+    def parseCode(self, filePath: Path, codeContent: str) -> ParsedCodeModel:
+        """
+        Parse Python source into a ParsedCodeModel in a single pass over the statement tree.
+        Functions, async functions, methods and nested classes are all collected; nested
+        symbols are named by qualified name (e.g. 'Outer.Inner.method', 'fn.<locals>.helper'),
+        matching Python's __qualname__. Raises SyntaxError if the source does not parse.
+        """
+        path = str(filePath)
+        file_id = fileNodeId(path)
+        collector = _SymbolCollector(path, file_id)
+        tree = ast.parse(codeContent, filename=path)
+        collector.visitBody(tree.body, '', file_id, None)
+        return ParsedCodeModel(
+            file=FileNode(id=file_id, filePath=path, language=self.identifyLanguage(filePath)),
+            functions=collector.functions,
+            classes=collector.classes,
+            references=collector.references(),
+        )
+
+
+def _dottedName(node: ast.expr) -> Optional[str]:
+    """'a.b.c' for a chain of attribute accesses on a name, else None."""
+    parts = []
+    while type(node) is ast.Attribute:
+        parts.append(node.attr)
+        node = node.value
+    if type(node) is not ast.Name:
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
+
+
+# (sourceId, edge type, dotted name as written, enclosing class qualified name, scope prefix)
+_RawReference = Tuple[str, str, str, Optional[str], str]
+
+
+class _SymbolCollector:
+    """
+    Collects the symbols of a module and the references made from them: calls, imports
+    and base classes. References are resolved at the end, once every name in the file is
+    known: to a node id when the target is defined in the file, to an absolute dotted name
+    through the file's imports, or dropped (builtins, attributes of local objects).
+    """
+
+    def __init__(self, filePath: str, fileId: str):
+        self.filePath = filePath
+        self.fileId = fileId
+        self.functions: List[FunctionNode] = []
+        self.classes: List[ClassNode] = []
+        self._seen: Dict[str, int] = {}
+        # Qualified name -> id, for the first definition of each name.
+        self._qualIds: Dict[str, str] = {}
+        # Names bound by import statements anywhere in the file -> absolute dotted name.
+        self._aliases: Dict[str, str] = {}
+        self._raw: List[_RawReference] = []
+        self._imports: List[Tuple[str, str]] = []
+
+    def _uniqueName(self, qualifiedName: str) -> str:
+        # Redefinitions (e.g. in if/else branches) share a qualified name; number the later ones.
+        count = self._seen.get(qualifiedName, 0) + 1
+        self._seen[qualifiedName] = count
+        return qualifiedName if count == 1 else f"{qualifiedName}#{count}"
+
+    def visitBody(self, body: List[ast.stmt], prefix: str, scopeId: str, classQual: Optional[str]) -> None:
+        for node in body:
+            node_type = type(node)
+            if node_type is ast.FunctionDef or node_type is ast.AsyncFunctionDef:
+                qualified = self._uniqueName(prefix + node.name)
+                node_id = symbolNodeId('fn', self.filePath, qualified)
+                self._qualIds.setdefault(qualified, node_id)
+                self.functions.append(FunctionNode(
+                    id=node_id,
+                    name=node.name,
+                    fileId=self.fileId,
+                    startLine=node.lineno - 1,
+                    endLine=node.end_lineno - 1,
+                ))
+                # Decorators and defaults run in the enclosing scope.
+                self._collectCalls(node.decorator_list, scopeId, classQual, prefix)
+                self._collectCalls(node.args.defaults, scopeId, classQual, prefix)
+                self.visitBody(node.body, qualified + '.<locals>.', node_id, classQual)
+            elif node_type is ast.ClassDef:
+                qualified = self._uniqueName(prefix + node.name)
+                node_id = symbolNodeId('cls', self.filePath, qualified)
+                self._qualIds.setdefault(qualified, node_id)
+                self.classes.append(ClassNode(
+                    id=node_id,
+                    name=node.name,
+                    fileId=self.fileId,
+                    startLine=node.lineno - 1,
+                    endLine=node.end_lineno - 1,
+                ))
+                for base in node.bases:
+                    name = _dottedName(base)
+                    if name:
+                        self._raw.append((node_id, 'INHERITS', name, classQual, prefix))
+                self._collectCalls(node.decorator_list, scopeId, classQual, prefix)
+                self._collectCalls(node.bases, scopeId, classQual, prefix)
+                self.visitBody(node.body, qualified + '.', node_id, qualified)
+            elif node_type is ast.Import or node_type is ast.ImportFrom:
+                self._collectImport(node, scopeId)
+            else:
+                fields = _NESTED_BODIES.get(node_type)
+                if fields is None:
+                    self._collectCalls((node,), scopeId, classQual, prefix)
+                    continue
+                # Header expressions (conditions, iterables, context managers, subjects).
+                for field, value in ast.iter_fields(node):
+                    if field not in fields and isinstance(value, (ast.AST, list)):
+                        self._collectCalls(value if isinstance(value, list) else (value,), scopeId, classQual, prefix)
+                for field in fields:
+                    children = getattr(node, field)
+                    if field in ('handlers', 'cases'):
+                        for child in children:
+                            header = getattr(child, 'type', None) or getattr(child, 'guard', None)
+                            if header is not None:
+                                self._collectCalls((header,), scopeId, classQual, prefix)
+                            self.visitBody(child.body, prefix, scopeId, classQual)
+                    else:
+                        self.visitBody(children, prefix, scopeId, classQual)
+
+    def _collectCalls(self, nodes, scopeId: str, classQual: Optional[str], prefix: str) -> None:
+        raw = self._raw
+        for root in nodes:
+            if not isinstance(root, ast.AST):
+                continue
+            for sub in ast.walk(root):
+                if type(sub) is ast.Call:
+                    name = _dottedName(sub.func)
+                    if name:
+                        raw.append((scopeId, 'CALLS', name, classQual, prefix))
+
+    def _collectImport(self, node, scopeId: str) -> None:
+        if type(node) is ast.Import:
+            for alias in node.names:
+                if alias.asname:
+                    self._aliases[alias.asname] = alias.name
+                else:
+                    head = alias.name.split('.', 1)[0]
+                    self._aliases[head] = head
+                self._imports.append((scopeId, alias.name))
+            return
+        base = node.module or ''
+        if node.level:
+            # Relative to the file's directory, one level up per extra dot.
+            package = modulePath(self.filePath)[:-1] if not self.filePath.endswith('__init__.py') \
+                else modulePath(self.filePath)
+            package = package[:len(package) - (node.level - 1)] if node.level > 1 else package
+            base = '.'.join(package + ([base] if base else []))
+        for alias in node.names:
+            if alias.name == '*':
+                self._imports.append((scopeId, base))
+                continue
+            target = f"{base}.{alias.name}" if base else alias.name
+            self._aliases[alias.asname or alias.name] = target
+            self._imports.append((scopeId, target))
+
+    def _resolve(self, name: str, classQual: Optional[str], prefix: str) -> Optional[Tuple[str, Optional[str]]]:
+        """(targetName, targetId or None) for a dotted name used in the file, or None."""
+        head, _, rest = name.partition('.')
+        if head in ('self', 'cls'):
+            if classQual and rest:
+                target = self._qualIds.get(f"{classQual}.{rest}")
+                if target:
+                    return f"{classQual}.{rest}", target
+            return None
+        # Innermost first: a nested helper shadows a module-level name.
+        if prefix:
+            target = self._qualIds.get(prefix + name)
+            if target:
+                return prefix + name, target
+        target = self._qualIds.get(name)
+        if target:
+            return name, target
+        if head in self._aliases:
+            absolute = self._aliases[head]
+            return (f"{absolute}.{rest}" if rest else absolute), None
+        return None
+
+    def references(self) -> List[CodeReference]:
+        seen = set()
+        references: List[CodeReference] = []
+        for source_id, target in self._imports:
+            key = (source_id, 'IMPORTS', target, None)
+            if target and key not in seen:
+                seen.add(key)
+                references.append(CodeReference(sourceId=source_id, type='IMPORTS', targetName=target))
+        for source_id, edge_type, name, class_qual, prefix in self._raw:
+            resolved = self._resolve(name, class_qual, prefix)
+            if resolved is None:
+                continue
+            key = (source_id, edge_type) + resolved
+            if key in seen or resolved[1] == source_id:
+                continue
+            seen.add(key)
+            references.append(CodeReference(sourceId=source_id, type=edge_type,
+                                            targetName=resolved[0], targetId=resolved[1]))
+        return references
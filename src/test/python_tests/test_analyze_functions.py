@@ -0,0 +1,134 @@
+# tests/test_analyze_functions.py
+import json
+import os
+import sys
+from pathlib import Path
+import pytest
+
+# The script is not part of a package; import it by name so worker processes can too.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'pythonFiles'))
+import analyze_functions  # noqa: E402
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for i in range(80):
+        package = tmp_path / f"pkg{i % 4}"
+        package.mkdir(exist_ok=True)
+        (package / f"mod{i}.py").write_text("def a():\n    pass\n" * (i % 3) + "class C:\n    def m(self):\n        pass\n")
+    (tmp_path / 'top.py').write_text("def f():\n    pass\n")
+    (tmp_path / 'broken.py').write_text("def broken(:\n")
+    (tmp_path / 'notes.txt').write_text("def ignored(): pass\n")
+    return tmp_path
+
+
+def test_serial_scan_counts_top_level_functions_and_reports_failures(tree):
+    counter = analyze_functions.FunctionCounter(str(tree))
+    result = counter.scan()
+    assert result['top.py'] == 1
+    assert result[str(Path('pkg1') / 'mod1.py')] == 1
+    assert len(result) == 81 and 'broken.py' not in result
+    assert [path for path, _ in counter.errors] == ['broken.py']
+    assert counter.errors[0][1].startswith('SyntaxError')
+
+
+def test_parallel_scan_matches_serial_scan_exactly(tree):
+    serial = analyze_functions.FunctionCounter(str(tree), jobs=1).scan()
+    counter = analyze_functions.FunctionCounter(str(tree), jobs=3)
+    parallel = counter.scan()
+    # Same contents and the same key order, so the JSON output is identical.
+    assert json.dumps(parallel) == json.dumps(serial)
+    assert [path for path, _ in counter.errors] == ['broken.py']
+
+
+def test_main_keeps_the_json_contract(tree, capsys):
+    analyze_functions.main([str(tree), '--jobs', '2'])
+    out, err = capsys.readouterr()
+    assert json.loads(out)['top.py'] == 1
+    assert 'broken.py' in err
+
+    with pytest.raises(SystemExit):
+        analyze_functions.main([])
+    assert json.loads(capsys.readouterr().out) == {'error': 'No folder path provided'}
+
+
+def test_cache_skips_unchanged_files_and_prunes_deleted_ones(tree, tmp_path_factory, monkeypatch):
+    cache_file = tmp_path_factory.mktemp('cache') / 'counts.json'
+    first = analyze_functions.FunctionCounter(str(tree), cache=analyze_functions.CountCache(str(cache_file)).load())
+    expected = first.scan()
+    first.cache.save()
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError('unchanged file parsed again')
+    monkeypatch.setattr(analyze_functions, 'count_source', no_parse)
+    cache = analyze_functions.CountCache(str(cache_file)).load()
+    again = analyze_functions.FunctionCounter(str(tree), cache=cache)
+    assert again.scan() == expected
+    assert (cache.hits, cache.misses) == (82, 0)
+    assert [path for path, _ in again.errors] == ['broken.py']
+    monkeypatch.undo()
+
+    (tree / 'top.py').write_text("def f():\n    pass\n\ndef g():\n    pass\n")
+    (tree / 'broken.py').unlink()
+    cache = analyze_functions.CountCache(str(cache_file)).load()
+    result = analyze_functions.FunctionCounter(str(tree), cache=cache).scan()
+    assert result['top.py'] == 2 and cache.misses == 1
+    cache.save()
+    entries = json.loads(cache_file.read_text())['files']
+    assert len(entries) == 81 and not any(path.endswith('broken.py') for path in entries)
+
+
+def test_hash_verification_catches_edits_that_keep_mtime_and_size(tree, tmp_path):
+    cache_file = tmp_path / 'counts.json'
+    cache = analyze_functions.CountCache(str(cache_file), verify_hash=True).load()
+    analyze_functions.FunctionCounter(str(tree), cache=cache).scan()
+    cache.save()
+
+    target = tree / 'top.py'
+    before = target.stat()
+    target.write_text("X = 1234567890123\n")  # same length, no function
+    os.utime(target, ns=(before.st_atime_ns, before.st_mtime_ns))
+
+    trusting = analyze_functions.CountCache(str(cache_file)).load()
+    assert analyze_functions.FunctionCounter(str(tree), cache=trusting).scan()['top.py'] == 1
+    verifying = analyze_functions.CountCache(str(cache_file), verify_hash=True).load()
+    assert analyze_functions.FunctionCounter(str(tree), cache=verifying).scan()['top.py'] == 0
+    assert verifying.misses == 1
+
+
+def test_walker_prunes_default_excludes_gitignored_paths_and_virtualenvs(tmp_path):
+    def touch(rel):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("def f():\n    pass\n")
+    for rel in ['app/main.py', 'app/gen/out.py', 'app/gen/keep.py', 'app/skip_me.py', 'lib/a.py',
+                'node_modules/pkg/x.py', '.git/hooks/h.py', 'build/lib/b.py', 'app/__pycache__/c.py',
+                'env2/lib/site.py', 'docs/conf.py', 'deep/nested/tmp_cache.py']:
+        touch(rel)
+    (tmp_path / 'env2' / 'pyvenv.cfg').write_text("home = /usr/bin\n")
+    (tmp_path / '.gitignore').write_text("# generated\n*_cache.py\n/docs/\n")
+    (tmp_path / 'app' / '.gitignore').write_text("gen/*\n!gen/keep.py\nskip_me.py\n")
+
+    walked = [rel.replace(os.sep, '/') for _, rel, _ in analyze_functions.walk_python_files(str(tmp_path))]
+    assert walked == ['app/main.py', 'app/gen/keep.py', 'lib/a.py']
+
+    excluded = analyze_functions.DEFAULT_EXCLUDES + ('lib/',)
+    counter = analyze_functions.FunctionCounter(str(tmp_path), excludes=excluded, use_gitignore=False)
+    assert sorted(p.replace(os.sep, '/') for p in counter.scan()) == [
+        'app/gen/keep.py', 'app/gen/out.py', 'app/main.py', 'app/skip_me.py', 'deep/nested/tmp_cache.py', 'docs/conf.py']
+
+
+def test_ignore_rules_follow_gitignore_syntax():
+    rules = analyze_functions.IgnoreRules(['*.py[co]', 'logs/', 'a/**/z.py', '!keep.pyc', 'x\\#y.py'])
+    assert rules.match('pkg/mod.pyc', False)
+    assert rules.match('keep.pyc', False) is False
+    assert rules.match('logs', True) and rules.match('logs', False) is None
+    assert rules.match('a/z.py', False) and rules.match('a/b/c/z.py', False)
+    assert rules.match('b/a/z.py', False) is None
+    assert rules.match('x#y.py', False)
+
+
+def test_walk_is_a_generator(tree):
+    walk = analyze_functions.walk_python_files(str(tree))
+    first = next(walk)
+    assert first[1] == 'broken.py' and first[2].is_file()
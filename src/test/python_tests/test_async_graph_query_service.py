@@ -0,0 +1,94 @@
+# tests/test_async_graph_query_service.py
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from gremlin_python.driver.remote_connection import RemoteConnection, RemoteTraversal
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.traversal import Traverser
+from src.graph.async_graph_query_service import AsyncGraphQueryService
+from src.interfaces import ParsedCodeModel, FileNode, FunctionNode
+
+
+class SlowAsyncConnection(RemoteConnection):
+    """Answers each submission from a timer thread after `delay` seconds."""
+    def __init__(self, delay, rows):
+        super().__init__('ws://async', 'g')
+        self.delay = delay
+        self.rows = rows
+        self.submitted = []
+        self.maxInFlight = 0
+        self._inFlight = 0
+        self._lock = threading.Lock()
+
+    def submit(self, bytecode):
+        raise AssertionError("synchronous submission from the async service")
+
+    def submit_async(self, bytecode):
+        self.submitted.append(bytecode)
+        with self._lock:
+            self._inFlight += 1
+            self.maxInFlight = max(self.maxInFlight, self._inFlight)
+        future = Future()
+
+        def answer():
+            with self._lock:
+                self._inFlight -= 1
+            future.set_result(RemoteTraversal(iter([Traverser(row) for row in self.rows])))
+        threading.Timer(self.delay, answer).start()
+        return future
+
+
+class AsyncDbManager:
+    def __init__(self, connection):
+        self.g = traversal().with_remote(connection)
+
+    def getClient(self):
+        return self.g
+
+
+def vertex(node_id, name):
+    return {'nodeId': [node_id], 'name': [name], 'filePath': ['/tmp/a.py'], 'startLine': [1]}
+
+
+def test_queries_run_concurrently_without_blocking_the_loop():
+    conn = SlowAsyncConnection(0.2, [vertex('fn_1', 'foo')])
+    service = AsyncGraphQueryService(AsyncDbManager(conn), maxInFlight=4)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick_task = asyncio.ensure_future(ticker())
+        started = time.perf_counter()
+        results = await asyncio.gather(*(service.getAllNodes('Function') for _ in range(8)))
+        elapsed = time.perf_counter() - started
+        tick_task.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(main())
+    assert all([n.name for n in nodes] == ['foo'] for nodes in results)
+    # 8 queries of 0.2 s, at most 4 in flight: two waves rather than eight.
+    assert conn.maxInFlight == 4
+    assert elapsed < 0.8
+    assert ticks > 10
+
+
+def test_ingest_submits_chunks_in_order():
+    conn = SlowAsyncConnection(0.01, [])
+    service = AsyncGraphQueryService(AsyncDbManager(conn), batchSize=10)
+    fid = 'f_async'
+    model = ParsedCodeModel(
+        file=FileNode(id=fid, filePath='/tmp/async.py', language='python'),
+        functions=[FunctionNode(id=f"fn_{i}", name=f"fn{i}", fileId=fid, startLine=i, endLine=i) for i in range(20)],
+    )
+    stats = asyncio.run(service.ingestParsedCode(model))
+    # 2 drops + 21 vertices + 20 edges = 43 mutations -> 5 chunks of 10
+    assert stats.requestCount == len(conn.submitted) == 5
+    assert conn.maxInFlight == 1
+    assert (stats.vertexCount, stats.edgeCount) == (21, 20)
@@ -0,0 +1,102 @@
+# tests/test_code_parser.py
+from pathlib import Path
+import pytest
+from src.parser.code_parser import CodeParserService
+
+SOURCE = '''
+import os
+
+def top(a):
+    def inner():
+        return a
+    return inner
+
+class Outer:
+    class Inner:
+        def method(self):
+            pass
+
+    async def fetch(self):
+        return 1
+
+if os.name == "nt":
+    def platform():
+        return "win"
+else:
+    def platform():
+        return "posix"
+'''
+
+
+@pytest.fixture
+def parsed():
+    return CodeParserService().parseCode(Path('/tmp/pkg/mod.py'), SOURCE)
+
+
+def test_identify_language():
+    service = CodeParserService()
+    assert service.identifyLanguage(Path('a/b.py')) == 'python'
+    assert service.identifyLanguage(Path('a/b.PYI')) == 'python'
+    assert service.identifyLanguage(Path('a/b.txt')) == 'unknown'
+
+
+def test_collects_nested_methods_and_async_functions(parsed):
+    assert parsed.file.language == 'python'
+    assert {f.name for f in parsed.functions} == {'top', 'inner', 'method', 'fetch', 'platform'}
+    assert [c.name for c in parsed.classes] == ['Outer', 'Inner']
+    assert all(f.fileId == parsed.file.id for f in parsed.functions + parsed.classes)
+
+
+def test_ids_are_stable_and_qualified(parsed):
+    ids = {f.id for f in parsed.functions}
+    assert 'fn:/tmp/pkg/mod.py::top.<locals>.inner' in ids
+    assert 'fn:/tmp/pkg/mod.py::Outer.Inner.method' in ids
+    assert 'fn:/tmp/pkg/mod.py::Outer.fetch' in ids
+    # Redefinitions in different branches get distinct ids.
+    assert {'fn:/tmp/pkg/mod.py::platform', 'fn:/tmp/pkg/mod.py::platform#2'} <= ids
+    again = CodeParserService().parseCode(Path('/tmp/pkg/mod.py'), SOURCE)
+    assert [f.id for f in again.functions] == [f.id for f in parsed.functions]
+
+
+def test_lines_are_zero_indexed(parsed):
+    top = next(f for f in parsed.functions if f.name == 'top')
+    assert (top.startLine, top.endLine) == (3, 6)
+
+
+def test_syntax_error_is_raised():
+    with pytest.raises(SyntaxError):
+        CodeParserService().parseCode(Path('/tmp/bad.py'), 'def broken(:\n')
+
+
+def test_references_resolve_calls_imports_and_bases():
+    source = '''
+import os.path as osp
+from .sibling import helper
+from pkg.base import Base
+
+def top(a):
+    def inner():
+        return top(a)
+    helper(inner())
+    return osp.join(a, len(a))
+
+class Outer(Base):
+    def method(self):
+        self.other()
+        return Outer()
+
+    def other(self):
+        pass
+'''
+    model = CodeParserService().parseCode(Path('/w/pkg/mod.py'), source)
+    refs = {(r.sourceId.split('::')[-1], r.type, r.targetName, r.targetId) for r in model.references}
+    assert ('file:/w/pkg/mod.py', 'IMPORTS', 'os.path', None) in refs
+    assert ('file:/w/pkg/mod.py', 'IMPORTS', 'w.pkg.sibling.helper', None) in refs
+    assert ('top', 'CALLS', 'w.pkg.sibling.helper', None) in refs
+    assert ('top', 'CALLS', 'os.path.join', None) in refs
+    assert ('top', 'CALLS', 'top.<locals>.inner', 'fn:/w/pkg/mod.py::top.<locals>.inner') in refs
+    assert ('top.<locals>.inner', 'CALLS', 'top', 'fn:/w/pkg/mod.py::top') in refs
+    assert ('Outer', 'INHERITS', 'pkg.base.Base', None) in refs
+    assert ('Outer.method', 'CALLS', 'Outer.other', 'fn:/w/pkg/mod.py::Outer.other') in refs
+    # Builtins and calls on unknown objects are not references.
+    assert not any(r.targetName == 'len' for r in model.references)
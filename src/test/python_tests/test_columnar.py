@@ -0,0 +1,76 @@
+# tests/test_columnar.py
+import pytest
+from src import columnar
+from src.columnar import MISSING, EdgeColumns, NodeColumns
+from src.graph.in_memory_graph_query_service import InMemoryGraphQueryService
+from src.interfaces import ParsedCodeModel, FileNode, FunctionNode, ClassNode, GraphNodeData
+
+
+def parsed(path, functions=(), classes=()):
+    fid = f"file:{path}"
+    return ParsedCodeModel(
+        file=FileNode(id=fid, filePath=path, language='python'),
+        functions=[FunctionNode(id=f"fn:{path}::{n}", name=n, fileId=fid, startLine=i, endLine=i + 3)
+                   for i, n in enumerate(functions)],
+        classes=[ClassNode(id=f"cls:{path}::{n}", name=n, fileId=fid, startLine=i, endLine=i + 1)
+                 for i, n in enumerate(classes)],
+    )
+
+
+@pytest.fixture
+def service():
+    svc = InMemoryGraphQueryService()
+    svc.ingestParsedCode(parsed('/w/a.py', functions=['f', 'g'], classes=['C']))
+    svc.ingestParsedCode(parsed('/w/b.py', functions=['h']))
+    return svc
+
+
+def test_node_columns_are_parallel_and_intern_file_paths(service):
+    columns = service.getNodeColumns()
+    assert len(columns) == 6
+    assert columns.fileTable == ['/w/a.py', '/w/b.py']
+    assert sorted(columns.typeTable) == ['Class', 'File', 'Function']
+    row = columns.ids.index('fn:/w/a.py::g')
+    assert (columns.names[row], columns.startLines[row], columns.endLines[row]) == ('g', 1, 4)
+    assert columns.fileTable[columns.fileIndex[row]] == '/w/a.py'
+    assert columns.typeTable[columns.typeIndex[row]] == 'Function'
+    file_row = columns.ids.index('file:/w/a.py')
+    assert columns.startLines[file_row] == MISSING
+
+
+@pytest.mark.parametrize('use_numpy', [False, True], ids=['lists', 'numpy'])
+def test_count_by_file(service, monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(columnar, 'np', None)
+    columns = service.getNodeColumns()
+    assert columns.countByFile('Function') == {'/w/a.py': 2, '/w/b.py': 1}
+    assert columns.countByFile() == {'/w/a.py': 4, '/w/b.py': 2}
+    assert columns.countByFile('Method') == {}
+
+
+def test_default_columns_convert_models():
+    nodes = [GraphNodeData(id='n1', type='Function', name='f', filePath='/a.py', startLine=1, properties={'endLine': 5}),
+             GraphNodeData(id='n2', type='Function', name='g')]
+    columns = NodeColumns.fromNodes(nodes)
+    assert list(columns.endLines) == [5, MISSING]
+    assert list(columns.fileIndex) == [0, MISSING]
+    assert columns.toDict()['fileTable'] == ['/a.py']
+
+
+def test_snapshot_columns_index_edges_by_row(service):
+    snapshot = service.getCodeGraphSnapshotColumns('/w/a.py')
+    nodes, edges = snapshot['nodes'], snapshot['edges']
+    assert len(nodes) == 4 and len(edges) == 3 and not snapshot['truncated']
+    file_row = nodes.ids.index('file:/w/a.py')
+    assert set(edges.sourceIndex) == {file_row}
+    assert {nodes.ids[i] for i in edges.targetIndex} == {'fn:/w/a.py::f', 'fn:/w/a.py::g', 'cls:/w/a.py::C'}
+    assert edges.typeTable == ['CONTAINS']
+
+
+def test_edge_columns_mark_ends_outside_the_nodes():
+    nodes = NodeColumns.fromRows([{'id': 'a', 'type': 'Function', 'name': 'a', 'filePath': None,
+                                   'startLine': None, 'endLine': None}])
+    edges = EdgeColumns.fromTriples([('a', 'zz', 'CALLS')], nodes)
+    assert (edges.sourceIndex[0], edges.targetIndex[0]) == (0, MISSING)
@@ -0,0 +1,111 @@
+# tests/test_graph_database_manager.py
+import threading
+import pytest
+from gremlin_python.driver.protocol import GremlinServerError
+from gremlin_python.driver.remote_connection import RemoteConnection, RemoteTraversal
+from gremlin_python.process.traversal import Traverser
+from src.graph.graph_database_manager import GraphDatabaseManager
+
+
+class FakeConnection(RemoteConnection):
+    """Answers every traversal with a single 0; raises once marked broken."""
+    def __init__(self):
+        super().__init__('ws://fake', 'g')
+        self.broken = False
+        self.closed = False
+        self.submitted = 0
+
+    def submit(self, bytecode):
+        if self.broken:
+            raise ConnectionResetError("connection lost")
+        self.submitted += 1
+        return RemoteTraversal(iter([Traverser(0)]))
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connections():
+    return []
+
+
+@pytest.fixture
+def make_manager(connections):
+    def make(**kwargs):
+        def factory():
+            conn = FakeConnection()
+            connections.append(conn)
+            return conn
+        return GraphDatabaseManager('ws://fake', connectionFactory=factory, **kwargs)
+    return make
+
+
+def test_checkout_lends_distinct_connections_up_to_pool_size(make_manager, connections):
+    mgr = make_manager(poolSize=2)
+    both_held = threading.Barrier(3)
+    release = threading.Event()
+    borrowed = []
+
+    def hold():
+        with mgr.checkout() as g:
+            borrowed.append(g.remote_connection)
+            g.inject(1).to_list()
+            both_held.wait()
+            release.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for t in threads:
+        t.start()
+    both_held.wait()
+    assert borrowed[0] is not borrowed[1]
+    with pytest.raises(TimeoutError):
+        with mgr.checkout(timeout=0.05):
+            pass
+    release.set()
+    for t in threads:
+        t.join()
+
+    with mgr.checkout(timeout=1) as g:
+        assert g.remote_connection in borrowed
+    stats = mgr.poolStats()
+    # The shared getClient() connection plus two pooled ones.
+    assert len(connections) == 3
+    assert stats['open'] == 2 and stats['idle'] == 2 and stats['waits'] >= 1
+
+
+def test_failed_connection_is_replaced_but_query_errors_are_not(make_manager, connections):
+    mgr = make_manager(poolSize=1)
+    with pytest.raises(GremlinServerError):
+        with mgr.checkout() as g:
+            raise GremlinServerError({'code': 597, 'message': 'bad script', 'attributes': {}})
+    first = connections[-1]
+    with mgr.checkout() as g:
+        assert g.remote_connection is first
+
+    first.broken = True
+    with pytest.raises(ConnectionResetError):
+        with mgr.checkout() as g:
+            g.inject(1).to_list()
+    assert first.closed
+    with mgr.checkout() as g:
+        assert g.remote_connection is not first
+        assert g.inject(1).to_list() == [0]
+    assert mgr.poolStats()['replaced'] == 1
+
+
+def test_idle_connections_are_health_checked(make_manager, connections):
+    mgr = make_manager(poolSize=1, healthCheckSeconds=0.0)
+    with mgr.checkout():
+        pass
+    stale = connections[-1]
+    stale.broken = True
+    with mgr.checkout() as g:
+        assert g.remote_connection is not stale
+    assert stale.closed
+    assert mgr.poolStats()['replaced'] == 1
+
+    mgr.close()
+    with pytest.raises(RuntimeError):
+        with mgr.checkout():
+            pass
@@ -1,12 +1,17 @@
 # tests/test_graph_query_service.py
 import pytest
+from contextlib import contextmanager
 import socket
+import threading
 import time
 from pathlib import Path
 import uuid
+from gremlin_python.driver.remote_connection import RemoteConnection, RemoteTraversal
+from gremlin_python.process.anonymous_traversal import traversal
 from src.graph.graph_database_manager import GraphDatabaseManager
 from src.graph.graph_query_service import GraphQueryService
-from src.interfaces import ParsedCodeModel, FileNode, FunctionNode, ClassNode
+from src.graph.index_store import IndexStore, indexedFile
+from src.interfaces import ParsedCodeModel, FileNode, FunctionNode, ClassNode, CodeReference
 
 def is_gremlin_server_running(host='localhost', port=8182):
     """Check if Gremlin server is running"""
@@ -207,4 +212,324 @@ def test_getCodeGraphSnapshot(graph_service, mock_parsed_code, db_manager):
         
     except Exception as e:
         print(f"Error in test_getCodeGraphSnapshot: {e}")
-        raise
\ No newline at end of file
+        raise
+
+class RecordingConnection(RemoteConnection):
+    """Remote connection that records submitted bytecode instead of talking to a server."""
+    def __init__(self):
+        super().__init__('ws://recording', 'g')
+        self.submitted = []
+
+    def submit(self, bytecode):
+        self.submitted.append(bytecode)
+        return RemoteTraversal(iter([]))
+
+
+class RecordingDbManager:
+    def __init__(self):
+        self.connection = RecordingConnection()
+        self.g = traversal().with_remote(self.connection)
+
+    def getClient(self):
+        return self.g
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        yield self.g
+
+
+def test_ingest_round_trips_do_not_grow_per_symbol():
+    fid = "f_big"
+    file_node = FileNode(id=fid, filePath='/tmp/big_module.py', language='python')
+    funcs = [FunctionNode(id=f"fn_{i}", name=f"fn{i}", fileId=fid, startLine=i, endLine=i) for i in range(1500)]
+    classes = [ClassNode(id=f"cl_{i}", name=f"Cls{i}", fileId=fid, startLine=i, endLine=i) for i in range(500)]
+    db = RecordingDbManager()
+    service = GraphQueryService(db, batchSize=1000)
+
+    stats = service.ingestParsedCode(ParsedCodeModel(file=file_node, functions=funcs, classes=classes))
+
+    # 2 drops + 2001 vertices + 2000 edges = 4003 mutations -> 5 chunks of 1000
+    assert stats.requestCount == len(db.connection.submitted) == 5
+    assert stats.vertexCount == 2001
+    assert stats.edgeCount == 2000
+    assert stats.durationMs >= 0
+
+
+def test_incremental_ingest_sends_only_changes():
+    fid = "f_inc"
+    file_node = FileNode(id=fid, filePath='/tmp/inc_module.py', language='python')
+    funcs = [FunctionNode(id=f"fn_{i}", name=f"fn{i}", fileId=fid, startLine=i, endLine=i) for i in range(100)]
+    db = RecordingDbManager()
+    service = GraphQueryService(db, batchSize=1000, incremental=True)
+    first = service.ingestParsedCode(ParsedCodeModel(file=file_node, functions=funcs))
+    assert not first.incremental and first.vertexCount == 101
+
+    edited = funcs[:-1] + [FunctionNode(id="fn_new", name="fresh", fileId=fid, startLine=200, endLine=210)]
+    edited[0] = FunctionNode(id="fn_0", name="renamed", fileId=fid, startLine=0, endLine=0)
+    second = service.ingestParsedCode(ParsedCodeModel(file=file_node, functions=edited))
+
+    assert second.incremental
+    assert second.vertexCount == 2  # fn_new added, fn_0 renamed
+    assert second.edgeCount == 1
+    assert second.removedCount == 1  # fn_99 dropped along with its edge
+    assert second.requestCount == 1
+    steps = [step[0] for step in db.connection.submitted[-1].step_instructions]
+    assert steps.count('sideEffect') == 4  # drop, add_v, update, add_e
+
+
+def test_snapshot_is_one_traversal_anchored_at_the_file():
+    db = RecordingDbManager()
+    service = GraphQueryService(db)
+    snapshot = service.getCodeGraphSnapshot('/tmp/snap.py', hops=2, limit=50)
+
+    assert snapshot == {'nodes': [], 'edges': [], 'truncated': False}
+    assert len(db.connection.submitted) == 1
+    steps = [step[0] for step in db.connection.submitted[0].step_instructions]
+    assert steps[:2] == ['V', 'has'] and 'repeat' in steps and 'E' not in steps
+    assert ['limit', 51] in [list(step) for step in db.connection.submitted[0].step_instructions]
+
+
+def test_snapshot_decoder_applies_limit():
+    def vm(node_id):
+        return {'nodeId': [node_id], 'name': [node_id], 'filePath': ['/tmp/a.py']}
+    result = {
+        'nodes': [vm('f'), vm('a'), vm('b')],
+        'edges': [{'source': 'f', 'target': 'a', 'type': 'CONTAINS'},
+                  {'source': 'f', 'target': 'b', 'type': 'CONTAINS'}],
+    }
+    snapshot = GraphQueryService._decodeSnapshot(result, limit=2)
+    assert [n.id for n in snapshot['nodes']] == ['f', 'a']
+    assert [(e.sourceId, e.targetId) for e in snapshot['edges']] == [('f', 'a')]
+    assert snapshot['truncated']
+
+
+def test_nodes_page_is_bounded_and_cursored():
+    db = RecordingDbManager()
+    service = GraphQueryService(db)
+    page = service.getNodesPage('Function', limit=100, after='fn:/a.py::x')
+
+    assert page.nodes == [] and page.nextCursor is None
+    steps = [list(step) for step in db.connection.submitted[0].step_instructions]
+    assert ['hasLabel', 'Function'] in steps and ['limit', 101] in steps
+    assert [s[0] for s in steps] == ['V', 'hasLabel', 'has', 'order', 'by', 'limit', 'valueMap']
+
+
+def test_nodes_page_decoder_sets_cursor_only_when_more_follow():
+    rows = [{'nodeId': [f"n{i}"], 'name': [f"n{i}"]} for i in range(3)]
+    assert GraphQueryService._decodePage(rows, 2).nextCursor == 'n1'
+    assert GraphQueryService._decodePage(rows, 3).nextCursor is None
+
+
+def test_fields_are_pushed_down_into_value_map():
+    db = RecordingDbManager()
+    service = GraphQueryService(db)
+    service.getAllNodes('Function', fields=['id', 'type', 'name'])
+    service.getConnectedNodes('fn_1', fields=['name', 'startLine'])
+    service.getCodeGraphSnapshot('/tmp/a.py', fields=['id', 'name'])
+    service.getAllNodes()
+
+    def value_maps(bytecode):
+        return [list(step[1:]) for step in bytecode.step_instructions if step[0] == 'valueMap']
+    assert value_maps(db.connection.submitted[0]) == [[True, 'name', 'nodeId']]
+    assert value_maps(db.connection.submitted[1]) == [[True, 'name', 'nodeId', 'startLine']]
+    nodes_by = db.connection.submitted[2].step_instructions[-2]
+    assert "['valueMap', True, 'name', 'nodeId']" in str(nodes_by)
+    assert value_maps(db.connection.submitted[3]) == [[True]]
+
+
+
+def test_node_columns_are_built_from_projected_rows():
+    db = RecordingDbManager()
+    service = GraphQueryService(db)
+    columns = service.getNodeColumns('Function')
+    assert len(columns) == 0
+    steps = [step[0] for step in db.connection.submitted[0].step_instructions]
+    assert steps == ['V', 'hasLabel', 'map']
+    assert "'project', 'id', 'type', 'name', 'filePath', 'startLine', 'endLine'" in str(db.connection.submitted[0])
+
+    rows = [{'id': 'f', 'type': 'File', 'name': '', 'filePath': '/a.py', 'startLine': -1, 'endLine': -1},
+            {'id': 'a', 'type': 'Function', 'name': 'a', 'filePath': '/a.py', 'startLine': 1, 'endLine': 2},
+            {'id': 'b', 'type': 'Function', 'name': 'b', 'filePath': '/a.py', 'startLine': 3, 'endLine': 4}]
+    result = {'nodes': rows, 'edges': [{'source': 'f', 'target': 'a', 'type': 'CONTAINS'},
+                                       {'source': 'f', 'target': 'b', 'type': 'CONTAINS'}]}
+    snapshot = GraphQueryService._decodeSnapshotColumns(result, limit=2)
+    assert snapshot['nodes'].ids == ['f', 'a'] and snapshot['truncated']
+    assert list(snapshot['edges'].targetIndex) == [1]
+
+
+def test_repeated_reads_are_served_from_the_cache_until_an_ingest_touches_them():
+    db = RecordingDbManager()
+    service = GraphQueryService(db)
+    fid = "file:/tmp/cached.py"
+    model = ParsedCodeModel(file=FileNode(id=fid, filePath='/tmp/cached.py', language='python'),
+                            functions=[FunctionNode(id="fn_c", name="c", fileId=fid, startLine=1, endLine=2)])
+    other = ParsedCodeModel(file=FileNode(id="file:/tmp/other.py", filePath='/tmp/other.py', language='python'))
+
+    service.getCodeGraphSnapshot('/tmp/cached.py')
+    service.getCodeGraphSnapshot('/tmp/cached.py')
+    service.getConnectedNodes('fn_c')
+    service.getConnectedNodes('fn_c')
+    assert len(db.connection.submitted) == 2
+
+    service.ingestParsedCode(other)  # touches neither result
+    sent = len(db.connection.submitted)
+    service.getCodeGraphSnapshot('/tmp/cached.py')
+    service.getConnectedNodes('fn_c')
+    assert len(db.connection.submitted) == sent
+
+    service.ingestParsedCode(model)
+    sent = len(db.connection.submitted)
+    service.getCodeGraphSnapshot('/tmp/cached.py')
+    service.getConnectedNodes('fn_c')
+    assert len(db.connection.submitted) == sent + 2
+    assert service.cache.stats()['invalidations'] == 2
+
+
+def test_query_cache_can_be_turned_off():
+    db = RecordingDbManager()
+    service = GraphQueryService(db, cacheSize=0)
+    service.getConnectedNodes('fn_1')
+    service.getConnectedNodes('fn_1')
+    assert len(db.connection.submitted) == 2
+    assert not service.cache.stats()['enabled']
+
+
+def test_reference_edges_follow_the_vertices_and_are_guarded():
+    util = FileNode(id="file:/w/lib/util.py", filePath='/w/lib/util.py', language='python')
+    main = FileNode(id="file:/w/app/main.py", filePath='/w/app/main.py', language='python')
+    models = [
+        ParsedCodeModel(file=util, functions=[FunctionNode(id="fn:/w/lib/util.py::helper", name="helper",
+                                                           fileId=util.id, startLine=0, endLine=1)]),
+        ParsedCodeModel(file=main, functions=[FunctionNode(id="fn:/w/app/main.py::run", name="run",
+                                                           fileId=main.id, startLine=0, endLine=3)],
+                        references=[CodeReference(sourceId="fn:/w/app/main.py::run", type='CALLS',
+                                                  targetName='lib.util.helper'),
+                                    CodeReference(sourceId="fn:/w/app/main.py::run", type='CALLS',
+                                                  targetName='json.dumps')]),
+    ]
+    db = RecordingDbManager()
+    service = GraphQueryService(db, batchSize=1000, roots=['/w'])
+
+    stats = service.ingestParsedCodeBatch(models)
+
+    assert stats.edgeCount == 2 + 2  # two CONTAINS, two CALLS
+    assert stats.requestCount == 1
+    text = str(db.connection.submitted[-1])
+    # The placeholder upsert and the edges come after every vertex write.
+    assert text.rindex("'addV', 'Function'") < text.index("'addV', 'External'")
+    assert text.count("'addE', 'CALLS'") == 2
+    assert "'nodeId', 'ext:json.dumps'" in text
+    assert "'nodeId', 'fn:/w/lib/util.py::helper'" in text
+
+
+class StallingConnection(RecordingConnection):
+    """Holds the first submission until released, so a second writer can try to overtake it."""
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def submit(self, bytecode):
+        if not self.entered.is_set():
+            self.entered.set()
+            self.release.wait(5)
+        return super().submit(bytecode)
+
+
+def test_concurrent_ingests_reach_the_graph_in_the_order_they_were_planned():
+    caller = ParsedCodeModel(
+        file=FileNode(id="file:/w/app/main.py", filePath='/w/app/main.py', language='python'),
+        functions=[FunctionNode(id="fn:/w/app/main.py::run", name="run", fileId="file:/w/app/main.py",
+                                startLine=0, endLine=3)],
+        references=[CodeReference(sourceId="fn:/w/app/main.py::run", type='CALLS', targetName='lib.util.helper')],
+    )
+    callee = ParsedCodeModel(
+        file=FileNode(id="file:/w/lib/util.py", filePath='/w/lib/util.py', language='python'),
+        functions=[FunctionNode(id="fn:/w/lib/util.py::helper", name="helper", fileId="file:/w/lib/util.py",
+                                startLine=0, endLine=1)],
+    )
+    db = RecordingDbManager()
+    db.connection = StallingConnection()
+    db.g = traversal().with_remote(db.connection)
+    service = GraphQueryService(db, batchSize=1000, roots=['/w'])
+
+    first = threading.Thread(target=service.ingestParsedCode, args=(caller,))
+    first.start()
+    assert db.connection.entered.wait(5)
+    # The callee's plan drops the placeholder the caller's plan creates; it must not
+    # reach the graph first, or the placeholder and its edge would be left behind.
+    second = threading.Thread(target=service.ingestParsedCode, args=(callee,))
+    second.start()
+    second.join(0.2)
+    db.connection.release.set()
+    first.join(5)
+    second.join(5)
+
+    submitted = [str(bytecode) for bytecode in db.connection.submitted]
+    assert len(submitted) == 2
+    assert "'addV', 'External'" in submitted[0]
+    assert "'nodeId', 'file:/w/lib/util.py'" in submitted[1]
+    assert "'ext:lib.util.helper'" in submitted[1]
+
+
+def test_reference_edges_into_a_file_survive_its_reingest_after_a_restart(tmp_path):
+    caller = ParsedCodeModel(
+        file=FileNode(id="file:/w/app/main.py", filePath='/w/app/main.py', language='python'),
+        functions=[FunctionNode(id="fn:/w/app/main.py::run", name="run", fileId="file:/w/app/main.py",
+                                startLine=0, endLine=3)],
+        references=[CodeReference(sourceId="fn:/w/app/main.py::run", type='CALLS', targetName='lib.util.helper')],
+    )
+    callee = ParsedCodeModel(
+        file=FileNode(id="file:/w/lib/util.py", filePath='/w/lib/util.py', language='python'),
+        functions=[FunctionNode(id="fn:/w/lib/util.py::helper", name="helper", fileId="file:/w/lib/util.py",
+                                startLine=0, endLine=1)],
+    )
+    store = IndexStore(str(tmp_path / 'index.sqlite'))
+    GraphQueryService(RecordingDbManager(), roots=['/w']).ingestParsedCodeBatch([caller, callee])
+    store.upsertMany(indexedFile(m.file.filePath, 1, 1, 'digest', m) for m in (caller, callee))
+    store.close()
+
+    # A new session: the caller is not ingested again, only the callee.
+    db = RecordingDbManager()
+    service = GraphQueryService(db, batchSize=1000, roots=['/w'])
+    models = [record.model for record in IndexStore(store.dbPath).loadAll().values()]
+    assert service.seedSymbols(models) == 2
+    # Placeholders earlier sessions left without incoming edges are collected.
+    assert "'hasLabel', 'External'" in str(db.connection.submitted[-1])
+
+    service.ingestParsedCode(callee)
+
+    text = str(db.connection.submitted[-1])
+    # Dropping the callee's vertices takes the caller's CALLS edge with them; it is written again.
+    assert text.index("'drop'") < text.index("'addE', 'CALLS'")
+    assert "'nodeId', 'fn:/w/app/main.py::run'" in text
+    assert "'nodeId', 'fn:/w/lib/util.py::helper'" in text
+
+
+def test_transitive_dependents_is_one_bounded_repeat_traversal():
+    db = RecordingDbManager()
+    result = GraphQueryService(db).getTransitiveDependents('fn:/w/a.py::f', ['CALLS'], maxDepth=4, limit=20)
+
+    assert result.nodes == [] and not result.truncated and result.durationMs >= 0
+    assert len(db.connection.submitted) == 1
+    bytecode = db.connection.submitted[0]
+    steps = [list(step) for step in bytecode.step_instructions]
+    assert [s[0] for s in steps[:5]] == ['V', 'has', 'repeat', 'emit', 'times']
+    assert ['times', 4] in steps and ['limit', 21] in steps
+    assert "'in', 'CALLS'" in str(bytecode)
+
+
+def test_transitive_dependents_within_no_hops_is_empty_without_a_query():
+    db = RecordingDbManager()
+    for depth in (0, -1):
+        result = GraphQueryService(db).getTransitiveDependents('fn:/w/a.py::f', maxDepth=depth)
+        assert result.nodes == [] and result.depths == {} and not result.truncated
+    assert db.connection.submitted == []
+
+
+def test_transitive_dependents_decoder_keeps_depths_and_flags_the_cut():
+    rows = [{'node': {'nodeId': [f"fn_{i}"], 'name': [f"f{i}"]}, 'depth': 1 + i // 2} for i in range(4)]
+    result = GraphQueryService._decodeDependents('fn_x', rows, limit=3)
+    assert [n.id for n in result.nodes] == ['fn_0', 'fn_1', 'fn_2']
+    assert result.depths == {'fn_0': 1, 'fn_1': 1, 'fn_2': 2}
+    assert result.truncated
@@ -5,7 +5,7 @@ from uuid import uuid4
 #sys.path.insert(1, 'D:/VS-Code-Extension/vscode-extension/src/graph')
 from src.graph.mock_graph_query_service import MockGraphQueryService
 #sys.path.insert(1, 'D:/VS-Code-Extension/vscode-extension/src')
-from src.interfaces import ParsedCodeModel, FileNode, FunctionNode, ClassNode
+from src.interfaces import ParsedCodeModel, FileNode, FunctionNode, ClassNode, CodeReference
 
 @pytest.fixture
 def mock_service():
@@ -32,4 +32,55 @@ def test_mock_ingest_and_queries(mock_service, mock_parsed_code):
     assert mock_parsed_code.file.id in ids
     assert mock_parsed_code.functions[0].id in ids
     edge_pairs = {(e.sourceId, e.targetId) for e in snapshot['edges']}
-    assert (mock_parsed_code.file.id, mock_parsed_code.functions[0].id) in edge_pairs
\ No newline at end of file
+    assert (mock_parsed_code.file.id, mock_parsed_code.functions[0].id) in edge_pairs
+
+def test_mock_reingest_does_not_duplicate_edges(mock_service, mock_parsed_code):
+    mock_service.ingestParsedCode(mock_parsed_code)
+    mock_service.ingestParsedCode(mock_parsed_code)
+    connected = mock_service.getConnectedNodes(nodeId=mock_parsed_code.file.id)
+    assert len(connected) == 2
+    assert len(mock_service.getCodeGraphSnapshot(filePath=mock_parsed_code.file.filePath)['edges']) == 2
+
+def test_mock_reingest_drops_removed_symbols(mock_service, mock_parsed_code):
+    mock_service.ingestParsedCode(mock_parsed_code)
+    mock_parsed_code.classes = []
+    mock_service.ingestParsedCode(mock_parsed_code)
+    assert mock_service.getAllNodes(nodeType='Class') == []
+    snapshot = mock_service.getCodeGraphSnapshot(filePath=mock_parsed_code.file.filePath)
+    assert len(snapshot['nodes']) == 2 and len(snapshot['edges']) == 1
+
+def test_mock_queries_touch_only_the_file_involved(mock_service):
+    for i in range(2000):
+        fid = f"f{i}"
+        mock_service.ingestParsedCode(ParsedCodeModel(
+            file=FileNode(id=fid, filePath=f'/tmp/m{i}.py', language='python'),
+            functions=[FunctionNode(id=f"{fid}_fn{j}", name=f'fn{j}', fileId=fid, startLine=j, endLine=j)
+                       for j in range(10)],
+        ))
+    assert len(mock_service.getAllNodes()) == 22000
+    assert len(mock_service.getConnectedNodes(nodeId='f1234')) == 10
+    assert [n.id for n in mock_service.getConnectedNodes(nodeId='f1234_fn3', edgeType='CONTAINS')] == ['f1234']
+    snapshot = mock_service.getCodeGraphSnapshot(filePath='/tmp/m1234.py')
+    assert len(snapshot['nodes']) == 11 and len(snapshot['edges']) == 10
+
+def test_mock_dependents_follow_reference_edges(mock_service):
+    def module(name, calls=()):
+        fid = f"file:/w/{name}.py"
+        return ParsedCodeModel(
+            file=FileNode(id=fid, filePath=f'/w/{name}.py', language='python'),
+            functions=[FunctionNode(id=f"fn:/w/{name}.py::{name}", name=name, fileId=fid, startLine=0, endLine=1)],
+            references=[CodeReference(sourceId=f"fn:/w/{name}.py::{name}", type='CALLS', targetName=f'{callee}.{callee}')
+                        for callee in calls],
+        )
+    # c -> b -> a, with the callers ingested before what they call.
+    mock_service.ingestParsedCode(module('c', ['b']))
+    mock_service.ingestParsedCode(module('b', ['a']))
+    mock_service.ingestParsedCode(module('a'))
+    result = mock_service.getTransitiveDependents('fn:/w/a.py::a')
+    assert [n.name for n in result.nodes] == ['b', 'c']
+    assert result.depths == {'fn:/w/b.py::b': 1, 'fn:/w/c.py::c': 2}
+    assert mock_service.getAllNodes(nodeType='External') == []
+
+    mock_service.removeNodes(['file:/w/b.py', 'fn:/w/b.py::b'])
+    assert mock_service.getTransitiveDependents('fn:/w/a.py::a').nodes == []
+    assert [n.id for n in mock_service.getConnectedNodes('fn:/w/c.py::c', 'CALLS')] == ['ext:b.b']
@@ -0,0 +1,183 @@
+# tests/test_in_memory_graph_query_service.py
+import pytest
+from src.graph.in_memory_graph_query_service import InMemoryGraphQueryService
+from src.graph.in_memory_graph_store import InMemoryGraphStore, edgeId
+from src.graph.records import EdgeRecord, NodeRecord
+from src.interfaces import ParsedCodeModel, FileNode, FunctionNode, ClassNode, CodeReference, GraphNodeData, GraphEdgeData
+
+
+def parsed(path, functions=(), classes=()):
+    fid = f"file:{path}"
+    return ParsedCodeModel(
+        file=FileNode(id=fid, filePath=path, language='python'),
+        functions=[FunctionNode(id=f"fn:{path}::{n}", name=n, fileId=fid, startLine=i, endLine=i + 1)
+                   for i, n in enumerate(functions)],
+        classes=[ClassNode(id=f"cls:{path}::{n}", name=n, fileId=fid, startLine=i, endLine=i + 1)
+                 for i, n in enumerate(classes)],
+    )
+
+
+@pytest.fixture
+def service():
+    return InMemoryGraphQueryService(roots=['/w'])
+
+
+def test_ingest_and_queries(service):
+    model = parsed('/w/a.py', functions=['foo', 'bar'], classes=['Baz'])
+    stats = service.ingestParsedCode(model)
+    assert (stats.vertexCount, stats.edgeCount, stats.requestCount) == (4, 3, 0)
+
+    assert [n.name for n in service.getAllNodes('Function')] == ['foo', 'bar']
+    assert len(service.getAllNodes()) == 4
+    connected = service.getConnectedNodes(model.file.id, 'CONTAINS')
+    assert {n.name for n in connected} == {'foo', 'bar', 'Baz'}
+    assert [n.id for n in service.getConnectedNodes('fn:/w/a.py::foo')] == [model.file.id]
+
+    snapshot = service.getCodeGraphSnapshot('/w/a.py')
+    assert {n.id for n in snapshot['nodes']} == {model.file.id, 'fn:/w/a.py::foo', 'fn:/w/a.py::bar', 'cls:/w/a.py::Baz'}
+    assert len(snapshot['edges']) == 3
+    assert service.getCodeGraphSnapshot('/w/missing.py') == {'nodes': [], 'edges': [], 'truncated': False}
+
+
+def test_reingest_replaces_file_contents_without_duplicate_edges(service):
+    service.ingestParsedCode(parsed('/w/a.py', functions=['foo', 'bar']))
+    service.ingestParsedCode(parsed('/w/b.py', functions=['other']))
+    stats = service.ingestParsedCode(parsed('/w/a.py', functions=['foo', 'baz']))
+
+    assert stats.removedCount == 2  # 'bar' and its CONTAINS edge
+    assert sorted(n.name for n in service.getAllNodes('Function')) == ['baz', 'foo', 'other']
+    assert len(service.getCodeGraphSnapshot('/w/a.py')['edges']) == 2
+    assert service.store.edgeCount() == 3
+    assert [n.name for n in service.getCodeGraphSnapshot('/w/b.py')['nodes']] == ['b.py', 'other']
+
+
+def test_remove_nodes_drops_incident_edges(service):
+    model = parsed('/w/a.py', functions=['foo'])
+    service.ingestParsedCode(model)
+    stats = service.removeNodes([model.file.id])
+    assert stats.removedCount == 2
+    assert service.getConnectedNodes('fn:/w/a.py::foo') == []
+    assert service.store.edgeCount() == 0
+
+
+def test_reference_edges_resolve_across_files_through_placeholders(service):
+    caller = parsed('/w/app/main.py', functions=['run'])
+    caller.references = [CodeReference(sourceId='fn:/w/app/main.py::run', type='CALLS', targetName='lib.util.helper')]
+    service.ingestParsedCode(caller)
+    assert [n.id for n in service.getConnectedNodes('fn:/w/app/main.py::run', 'CALLS')] == ['ext:lib.util.helper']
+
+    stats = service.ingestParsedCode(parsed('/w/lib/util.py', functions=['helper']))
+    assert stats.edgeCount == 1 + 1  # CONTAINS, CALLS
+    assert [n.id for n in service.getConnectedNodes('fn:/w/app/main.py::run', 'CALLS')] == ['fn:/w/lib/util.py::helper']
+    assert service.store.getNode('ext:lib.util.helper') is None
+
+    service.removeNodes(['file:/w/lib/util.py', 'fn:/w/lib/util.py::helper'])
+    assert [n.type for n in service.getConnectedNodes('fn:/w/app/main.py::run', 'CALLS')] == ['External']
+
+
+def test_transitive_dependents_walk_incoming_edges_breadth_first(service):
+    # a <- b <- c <- d, and d also calls a directly.
+    for name in 'abcd':
+        service.ingestParsedCode(parsed(f'/w/{name}.py', functions=[name]))
+    calls = {'b': ['a'], 'c': ['b'], 'd': ['c', 'a']}
+    for caller, callees in calls.items():
+        model = parsed(f'/w/{caller}.py', functions=[caller])
+        model.references = [CodeReference(sourceId=f'fn:/w/{caller}.py::{caller}', type='CALLS',
+                                          targetName=f'{callee}.{callee}') for callee in callees]
+        service.ingestParsedCode(model)
+
+    result = service.getTransitiveDependents('fn:/w/a.py::a')
+    assert [n.name for n in result.nodes] == ['b', 'd', 'c']
+    assert result.depths == {'fn:/w/b.py::b': 1, 'fn:/w/d.py::d': 1, 'fn:/w/c.py::c': 2}
+    assert not result.truncated and result.durationMs >= 0
+
+    assert [n.name for n in service.getTransitiveDependents('fn:/w/a.py::a', maxDepth=1).nodes] == ['b', 'd']
+    assert service.getTransitiveDependents('fn:/w/a.py::a', maxDepth=0).nodes == []
+    limited = service.getTransitiveDependents('fn:/w/a.py::a', limit=2)
+    assert len(limited.nodes) == 2 and limited.truncated
+    assert service.getTransitiveDependents('fn:/w/a.py::a', edgeTypes=['INHERITS']).nodes == []
+
+
+def test_store_indexes_follow_node_updates():
+    store = InMemoryGraphStore()
+    store.putNode(GraphNodeData(id='n1', type='Function', name='f', filePath='/a.py'))
+    store.putNode(GraphNodeData(id='n2', type='Function', name='g', filePath='/a.py'))
+    store.putEdge(GraphEdgeData(id=edgeId('n1', 'n2', 'CALLS'), sourceId='n1', targetId='n2', type='CALLS'))
+    assert not store.putEdge(GraphEdgeData(id=edgeId('n1', 'n2', 'CALLS'), sourceId='n1', targetId='n2', type='CALLS'))
+
+    # Moving a node to another file and type re-indexes it but keeps its edges.
+    store.putNode(GraphNodeData(id='n2', type='Class', name='G', filePath='/b.py'))
+    assert [n.id for n in store.nodesInFile('/a.py')] == ['n1']
+    assert [n.id for n in store.nodes('Class')] == ['n2']
+    assert [n.id for n in store.neighbors('n1', 'out', 'CALLS')] == ['n2']
+    assert store.neighbors('n1', 'in') == []
+
+    with pytest.raises(KeyError):
+        store.putEdge(GraphEdgeData(id='x', sourceId='n1', targetId='missing', type='CALLS'))
+
+
+def test_snapshot_expands_hops_and_honours_limit():
+    store = InMemoryGraphStore()
+    service = InMemoryGraphQueryService(store)
+    service.ingestParsedCode(parsed('/w/a.py', functions=['caller']))
+    service.ingestParsedCode(parsed('/w/b.py', functions=['callee']))
+    service.ingestParsedCode(parsed('/w/c.py', functions=['far']))
+    store.putEdge(GraphEdgeData(id='c1', sourceId='fn:/w/a.py::caller', targetId='fn:/w/b.py::callee', type='CALLS'))
+    store.putEdge(GraphEdgeData(id='c2', sourceId='fn:/w/b.py::callee', targetId='fn:/w/c.py::far', type='CALLS'))
+
+    assert len(service.getCodeGraphSnapshot('/w/a.py')['nodes']) == 2
+    one_hop = service.getCodeGraphSnapshot('/w/a.py', hops=1)
+    assert [n.id for n in one_hop['nodes']] == ['file:/w/a.py', 'fn:/w/a.py::caller', 'fn:/w/b.py::callee']
+    assert {e.id for e in one_hop['edges']} == {edgeId('file:/w/a.py', 'fn:/w/a.py::caller', 'CONTAINS'), 'c1'}
+    assert len(service.getCodeGraphSnapshot('/w/a.py', hops=3)['nodes']) == 6
+
+    capped = service.getCodeGraphSnapshot('/w/a.py', hops=3, limit=3)
+    assert capped['truncated']
+    assert len(capped['nodes']) == 3 and len(capped['edges']) == 2
+    assert not service.getCodeGraphSnapshot('/w/a.py', hops=1, limit=3)['truncated']
+
+
+def test_pages_follow_node_id_order_and_type_filter(service):
+    for i in range(5):
+        service.ingestParsedCode(parsed(f'/w/m{i}.py', functions=['f', 'g'], classes=['C']))
+    pages = []
+    after = None
+    while True:
+        page = service.getNodesPage('Function', limit=3, after=after)
+        pages.append([n.id for n in page.nodes])
+        if page.nextCursor is None:
+            break
+        after = page.nextCursor
+    ids = [i for p in pages for i in p]
+    assert [len(p) for p in pages] == [3, 3, 3, 1]
+    assert ids == sorted(n.id for n in service.getAllNodes('Function'))
+
+    assert [n.id for n in service.iterNodes(pageSize=4)] == sorted(n.id for n in service.getAllNodes())
+    # A node added mid-walk, after the cursor, is still seen.
+    walk = service.iterNodes('Class', pageSize=2)
+    first = next(walk)
+    service.ingestParsedCode(parsed('/w/z.py', classes=['Z']))
+    assert [first.id] + [n.id for n in walk] == sorted(n.id for n in service.getAllNodes('Class'))
+
+
+def test_store_holds_records_and_service_returns_models(service):
+    service.ingestParsedCode(parsed('/w/a.py', functions=['foo']))
+    stored = service.store.getNode('fn:/w/a.py::foo')
+    assert isinstance(stored, NodeRecord) and not hasattr(stored, '__dict__')
+
+    node = service.getAllNodes('Function')[0]
+    assert isinstance(node, GraphNodeData)
+    assert node == GraphNodeData(id='fn:/w/a.py::foo', type='Function', name='foo', filePath='/w/a.py',
+                                 startLine=0, properties={'endLine': 1})
+    # Models handed out are copies; changing one leaves the stored record alone.
+    node.properties['endLine'] = 99
+    assert service.getAllNodes('Function')[0].properties == {'endLine': 1}
+    edge = service.getCodeGraphSnapshot('/w/a.py')['edges'][0]
+    assert isinstance(edge, GraphEdgeData) and edge.type == 'CONTAINS'
+
+
+def test_records_round_trip_through_models():
+    node = GraphNodeData(id='n', type='Class', name='C', filePath='/a.py', startLine=2, properties={'k': 'v'})
+    assert NodeRecord.fromModel(node).toModel() == node
+    edge = GraphEdgeData(id='e', sourceId='a', targetId='b', type='CALLS')
+    assert EdgeRecord.fromModel(edge).toModel() == edge
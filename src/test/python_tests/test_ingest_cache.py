@@ -0,0 +1,37 @@
+# tests/test_ingest_cache.py
+from src.graph.ingest_cache import IngestCache, fingerprint
+from src.interfaces import ParsedCodeModel, FileNode
+
+
+def _model(path):
+    return ParsedCodeModel(file=FileNode(id=f"file:{path}", filePath=path, language='python'))
+
+
+def test_fingerprint_is_content_based():
+    assert fingerprint("x = 1\n") == fingerprint("x = 1\n")
+    assert fingerprint("x = 1\n")[0] != fingerprint("x = 2\n")[0]
+    assert fingerprint("é")[1] == 2
+
+
+def test_hit_only_after_ingest_of_same_content():
+    cache = IngestCache()
+    digest, _ = fingerprint("a")
+    assert not cache.isIngested('/a.py', digest)
+    cache.markIngested('/a.py', digest)
+    assert cache.isIngested('/a.py', digest)
+    assert not cache.isIngested('/b.py', digest)
+    assert not cache.isIngested('/a.py', fingerprint("b")[0])
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 3
+
+
+def test_parsed_models_are_evicted_by_total_bytes():
+    cache = IngestCache(maxBytes=10)
+    cache.putParsed('/a.py', 'h1', 4, _model('/a.py'))
+    cache.putParsed('/b.py', 'h2', 4, _model('/b.py'))
+    assert cache.getParsed('/a.py', 'h1') is not None  # a is now most recently used
+    cache.putParsed('/c.py', 'h3', 4, _model('/c.py'))
+    assert cache.getParsed('/b.py', 'h2') is None
+    assert cache.getParsed('/a.py', 'h1') is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['bytes'] == 8 and stats['entries'] == 2
@@ -0,0 +1,80 @@
+# tests/test_ingest_queue.py
+import threading
+from src.graph.ingest_queue import IngestQueue
+
+
+def test_jobs_for_same_key_are_coalesced():
+    gate = threading.Event()
+    ran = []
+    queue = IngestQueue()
+    queue.submit('busy', gate.wait)  # occupy the worker
+    queue.submit('a', lambda: ran.append('a1'))
+    queue.submit('b', lambda: ran.append('b1'))
+    queue.submit('a', lambda: ran.append('a2'))
+    gate.set()
+    assert queue.flush(timeout=5)
+    assert ran == ['a2', 'b1']
+    assert queue.stats()['coalesced'] == 1
+    queue.close()
+
+
+def test_full_queue_applies_backpressure():
+    gate = threading.Event()
+    queue = IngestQueue(maxPending=1)
+    queue.submit('busy', gate.wait)
+    started = threading.Event()
+    queue.submit('started', started.set)
+    # 'busy' is running and 'started' fills the only slot.
+    assert not queue.submit('other', lambda: None, timeout=0.05)
+    assert queue.stats()['rejected'] == 1
+    gate.set()
+    assert queue.submit('other', lambda: None, timeout=5)
+    queue.close()
+    assert started.is_set()
+
+
+def test_close_flushes_pending_jobs_and_rejects_new_ones():
+    gate = threading.Event()
+    ran = []
+    queue = IngestQueue()
+    queue.submit('busy', gate.wait)
+    queue.submit('a', lambda: ran.append('a'))
+    gate.set()
+    assert queue.close(flush=True, timeout=5)
+    assert ran == ['a']
+    assert not queue.submit('b', lambda: ran.append('b'))
+
+
+def test_failing_job_is_reported_and_worker_survives():
+    errors = []
+    queue = IngestQueue(onError=lambda key, e: errors.append((key, str(e))))
+
+    def boom():
+        raise RuntimeError('graph down')
+
+    queue.submit('a', boom)
+    ran = []
+    queue.submit('b', lambda: ran.append('b'))
+    assert queue.flush(timeout=5)
+    assert errors == [('a', 'graph down')] and ran == ['b']
+    queue.close()
+
+
+def test_delayed_jobs_are_debounced():
+    ran = []
+    queue = IngestQueue()
+    for version in range(5):
+        queue.submit('a', lambda v=version: ran.append(v), delay=0.05)
+    queue.submit('b', lambda: ran.append('b'))
+    assert queue.flush(timeout=5)
+    # 'b' was ready first; only the last version of 'a' ran, once its delay passed.
+    assert ran == ['b', 4]
+    queue.close()
+
+
+def test_close_runs_delayed_jobs_immediately():
+    ran = []
+    queue = IngestQueue()
+    queue.submit('a', lambda: ran.append('a'), delay=60)
+    assert queue.close(flush=True, timeout=5)
+    assert ran == ['a']
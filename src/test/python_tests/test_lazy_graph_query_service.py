@@ -0,0 +1,99 @@
+# tests/test_lazy_graph_query_service.py
+import threading
+from src.graph.lazy_graph_query_service import LazyGraphQueryService, READY
+from src.graph.mock_graph_query_service import MockGraphQueryService
+from src.interfaces import ParsedCodeModel, FileNode, FunctionNode
+
+
+def parsed(path, *functions):
+    fid = f"file:{path}"
+    return ParsedCodeModel(
+        file=FileNode(id=fid, filePath=path, language='python'),
+        functions=[FunctionNode(id=f"fn:{path}::{n}", name=n, fileId=fid, startLine=0, endLine=1) for n in functions],
+    )
+
+
+def test_serves_locally_until_connected_then_replays():
+    remote = MockGraphQueryService()
+    gate = threading.Event()
+    calls = []
+
+    def connect():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionRefusedError("server not up")
+        gate.wait(5)
+        return remote
+
+    states = []
+    svc = LazyGraphQueryService(connect, initialBackoff=0.01, onStateChange=lambda s, e: states.append((s, type(e).__name__ if e else None)))
+    svc.start()
+    svc.ingestParsedCode(parsed('/w/a.py', 'old'))
+    svc.ingestParsedCode(parsed('/w/a.py', 'foo'))
+    svc.ingestParsedCode(parsed('/w/b.py', 'bar'))
+    svc.removeNodes(['file:/w/b.py', 'fn:/w/b.py::bar'])
+    assert [n.name for n in svc.getAllNodes('Function')] == ['foo']
+    assert svc.status()['pendingFiles'] == 1
+    assert remote.getAllNodes() == []
+
+    gate.set()
+    assert svc.waitUntilReady(5)
+    assert svc.state == READY and svc.attempts == 3
+    assert states[:2] == [('connecting', 'ConnectionRefusedError')] * 2 and states[-1] == ('ready', None)
+    # Only the latest model of a.py reaches the backend; b.py was deleted before it came up.
+    assert [n.name for n in remote.getAllNodes('Function')] == ['foo']
+    svc.ingestParsedCode(parsed('/w/c.py', 'baz'))
+    assert sorted(n.name for n in svc.getAllNodes('Function')) == ['baz', 'foo']
+    assert svc.status()['pendingFiles'] == 0
+
+
+def test_slow_connect_times_out_and_late_backend_is_disposed():
+    release = threading.Event()
+    disposed = []
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            release.wait(5)
+            return 'late'
+        return MockGraphQueryService()
+
+    svc = LazyGraphQueryService(connect, connectTimeout=0.05, initialBackoff=0.01, dispose=disposed.append)
+    svc.start()
+    assert svc.waitUntilReady(5)
+    assert svc.lastError is None
+    release.set()
+    for _ in range(50):
+        if disposed:
+            break
+        threading.Event().wait(0.02)
+    assert disposed == ['late']
+
+
+def test_close_stops_retrying():
+    def connect():
+        raise OSError("down")
+
+    svc = LazyGraphQueryService(connect, initialBackoff=0.01)
+    svc.start()
+    svc.close()
+    assert not svc.waitUntilReady(1)
+    assert svc.status()['state'] == 'closed'
+
+
+def test_prepare_runs_before_the_replay_and_outside_the_connect_timeout():
+    remote = MockGraphQueryService()
+    seen = []
+
+    def prepare(backend):
+        # Slower than connectTimeout, and the backend has not had the kept changes yet.
+        threading.Event().wait(0.2)
+        seen.append((backend, len(backend.getAllNodes())))
+
+    svc = LazyGraphQueryService(lambda: remote, connectTimeout=0.05, initialBackoff=0.01, prepare=prepare)
+    svc.ingestParsedCode(parsed('/w/a.py', 'foo'))
+    svc.start()
+    assert svc.waitUntilReady(5)
+    assert svc.attempts == 1 and seen == [(remote, 0)]
+    assert [n.name for n in remote.getAllNodes('Function')] == ['foo']
@@ -0,0 +1,42 @@
+# tests/test_model_diff.py
+from src.graph.model_diff import diffParsedCode
+from src.interfaces import ParsedCodeModel, FileNode, FunctionNode, ClassNode
+
+FID = "f_diff"
+FILE = FileNode(id=FID, filePath='/tmp/diff.py', language='python')
+
+
+def _model(functions=(), classes=()):
+    return ParsedCodeModel(file=FILE, functions=list(functions), classes=list(classes))
+
+
+def test_diff_against_nothing_adds_everything():
+    new = _model([FunctionNode(id="fn_a", name='a', fileId=FID, startLine=0, endLine=1)])
+    diff = diffParsedCode(None, new)
+    assert [v.nodeId for v in diff.addedVertices] == [FID, "fn_a"]
+    assert diff.addedEdges == [(FID, "fn_a", 'CONTAINS')]
+    assert not diff.removedVertexIds and not diff.changedVertices
+
+
+def test_identical_models_produce_empty_diff():
+    fn = FunctionNode(id="fn_a", name='a', fileId=FID, startLine=0, endLine=1)
+    assert diffParsedCode(_model([fn]), _model([fn])).isEmpty()
+
+
+def test_diff_reports_changed_properties_only():
+    old = _model([FunctionNode(id="fn_a", name='a', fileId=FID, startLine=0, endLine=1)])
+    new = _model([FunctionNode(id="fn_a", name='a', fileId=FID, startLine=4, endLine=5)])
+    diff = diffParsedCode(old, new)
+    assert len(diff.changedVertices) == 1
+    assert diff.changedVertices[0].properties == {'startLine': 4, 'endLine': 5}
+    assert not diff.addedVertices and not diff.addedEdges and not diff.removedEdges
+
+
+def test_label_change_is_remove_and_add():
+    old = _model(functions=[FunctionNode(id="n", name='x', fileId=FID, startLine=0, endLine=1)])
+    new = _model(classes=[ClassNode(id="n", name='x', fileId=FID, startLine=0, endLine=1)])
+    diff = diffParsedCode(old, new)
+    assert diff.removedVertexIds == ["n"]
+    assert [v.label for v in diff.addedVertices] == ['Class']
+    assert diff.addedEdges == [(FID, "n", 'CONTAINS')]
+    assert diff.removedEdges == []
@@ -0,0 +1,43 @@
+# tests/test_query_cache.py
+from src.graph.query_cache import QueryCache
+
+
+def test_invalidation_drops_only_dependent_entries():
+    cache = QueryCache()
+    cache.put('a', 1, cache.begin(), nodeIds=['n1', 'n2'])
+    cache.put('b', 2, cache.begin(), filePaths=['/x.py'])
+    cache.put('c', 3, cache.begin(), nodeIds=['n3'])
+
+    assert cache.invalidate(nodeIds=['n2']) == 1
+    assert cache.get('a') is None and cache.get('c') == 3
+    assert cache.invalidate(filePaths=['/x.py']) == 1
+    assert cache.get('b') is None
+    assert cache.stats()['entries'] == 1
+
+
+def test_volatile_entries_go_on_any_invalidation():
+    cache = QueryCache()
+    cache.put('cut', [1], cache.begin(), nodeIds=['n1'], volatile=True)
+    cache.invalidate(nodeIds=['unrelated'])
+    assert cache.get('cut') is None
+
+
+def test_results_fetched_across_an_invalidation_are_not_stored():
+    cache = QueryCache()
+    token = cache.begin()
+    cache.invalidate(nodeIds=['n1'])
+    cache.put('late', 'stale', token, nodeIds=['n1'])
+    assert cache.get('late') is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(maxEntries=2)
+    cache.put('a', 1, cache.begin(), nodeIds=['n'])
+    cache.put('b', 2, cache.begin())
+    cache.get('a')
+    cache.put('c', 3, cache.begin())
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['hits'] == 3 and stats['misses'] == 1
+    # The evicted entry's dependencies went with it.
+    assert cache.invalidate(nodeIds=['n']) == 1
@@ -0,0 +1,96 @@
+# tests/test_symbol_table.py
+from pathlib import Path
+from src.graph.symbol_table import SymbolTable
+from src.parser.code_parser import CodeParserService
+
+
+def parse(path, source):
+    return CodeParserService().parseCode(Path(path), source)
+
+
+CALLER = parse('/w/app/main.py', '''
+from lib.util import helper
+import requests
+
+def run():
+    helper()
+    requests.get("x")
+''')
+
+
+def test_references_resolve_across_files_in_one_batch():
+    util = parse('/w/lib/util.py', 'def helper():\n    pass\n')
+    plan = SymbolTable(['/w']).update([CALLER, util])
+    assert ('fn:/w/app/main.py::run', 'fn:/w/lib/util.py::helper', 'CALLS') in plan.addEdges
+    assert ('file:/w/app/main.py', 'fn:/w/lib/util.py::helper', 'IMPORTS') in plan.addEdges
+    assert [p for p, _ in plan.addPlaceholders] == ['ext:requests', 'ext:requests.get']
+
+
+def test_placeholder_is_replaced_when_the_target_file_arrives_and_restored_when_it_goes():
+    table = SymbolTable(['/w'])
+    first = table.update([CALLER])
+    assert ('fn:/w/app/main.py::run', 'ext:lib.util.helper', 'CALLS') in first.addEdges
+
+    util = parse('/w/lib/util.py', 'def helper():\n    pass\n')
+    second = table.update([util], recreated=['fn:/w/lib/util.py::helper'])
+    assert ('fn:/w/app/main.py::run', 'fn:/w/lib/util.py::helper', 'CALLS') in second.addEdges
+    assert ('fn:/w/app/main.py::run', 'ext:lib.util.helper', 'CALLS') in second.removeEdges
+    assert second.dropPlaceholders == ['ext:lib.util.helper']
+
+    # A re-ingest that recreates the target vertex writes the unchanged edge again.
+    third = table.update([util], recreated=['fn:/w/lib/util.py::helper'])
+    assert ('fn:/w/app/main.py::run', 'fn:/w/lib/util.py::helper', 'CALLS') in third.addEdges
+    assert not third.removeEdges
+
+    fourth = table.remove([table.filePathOf('file:/w/lib/util.py')])
+    assert ('fn:/w/app/main.py::run', 'ext:lib.util.helper', 'CALLS') in fourth.addEdges
+    assert ('ext:lib.util.helper', 'lib.util.helper') in fourth.addPlaceholders
+
+
+def test_ambiguous_module_names_prefer_the_nearest_file():
+    near = parse('/w/app/util.py', 'def helper():\n    pass\n')
+    far = parse('/w/other/util.py', 'def helper():\n    pass\n')
+    caller = parse('/w/app/main.py', 'import util\n\ndef run():\n    util.helper()\n')
+    plan = SymbolTable(['/w']).update([far, near, caller])
+    assert ('fn:/w/app/main.py::run', 'fn:/w/app/util.py::helper', 'CALLS') in plan.addEdges
+
+
+def test_seeded_files_write_nothing_but_resolve_waiting_placeholders():
+    table = SymbolTable(['/w'])
+    live = table.update([CALLER])
+    assert ('fn:/w/app/main.py::run', 'ext:lib.util.helper', 'CALLS') in live.addEdges
+
+    util = parse('/w/lib/util.py', 'def helper():\n    pass\n')
+    other = parse('/w/app/other.py', 'from lib.util import helper\n\ndef go():\n    helper()\n')
+    plan = table.seed([util, other, CALLER])
+    # The seeded files' own edges are already in the graph; only the live caller moves.
+    assert all(source.startswith(('fn:/w/app/main.py', 'file:/w/app/main.py')) for source, _, _ in plan.addEdges)
+    assert ('fn:/w/app/main.py::run', 'fn:/w/lib/util.py::helper', 'CALLS') in plan.addEdges
+    assert plan.dropPlaceholders == ['ext:lib.util.helper']
+    assert len(table) == 3
+
+    # Once seeded, re-ingesting the target writes its incoming edges again.
+    again = table.update([util], recreated=['fn:/w/lib/util.py::helper'])
+    assert ('fn:/w/app/other.py::go', 'fn:/w/lib/util.py::helper', 'CALLS') in again.addEdges
+
+
+def test_workspace_files_do_not_shadow_modules_by_their_last_path_segments():
+    fixture = parse('/w/tests/fixtures/json.py', 'def dumps(obj):\n    pass\n')
+    caller = parse('/w/app/main.py', 'import json\n\ndef run():\n    json.dumps(1)\n')
+    plan = SymbolTable(['/w']).update([fixture, caller])
+    assert ('file:/w/app/main.py', 'ext:json', 'IMPORTS') in plan.addEdges
+    assert ('fn:/w/app/main.py::run', 'ext:json.dumps', 'CALLS') in plan.addEdges
+    assert not [edge for edge in plan.addEdges if edge[1].startswith(('file:/w/tests', 'fn:/w/tests'))]
+
+
+def test_modules_resolve_from_the_top_of_their_package(tmp_path):
+    package = tmp_path / 'src' / 'pkg'
+    (package / 'sub').mkdir(parents=True)
+    for directory in (package, package / 'sub'):
+        (directory / '__init__.py').write_text('')
+    mod = parse(str(package / 'sub' / 'mod.py'), 'def helper():\n    pass\n')
+    caller = parse(str(tmp_path / 'app' / 'main.py'), 'from pkg.sub.mod import helper\n\ndef run():\n    helper()\n')
+    # No workspace root covers src/, but pkg is the top of its package chain.
+    plan = SymbolTable().update([mod, caller])
+    assert (caller.functions[0].id, mod.functions[0].id, 'CALLS') in plan.addEdges
+    assert SymbolTable().update([mod, parse(caller.file.filePath, 'import sub.mod\n')]).addPlaceholders
@@ -0,0 +1,35 @@
+# tests/test_vertex_decoder.py
+import pytest
+from gremlin_python.process.traversal import T
+from src.graph.vertex_decoder import VertexDecoder
+from src.graph.benchmark_decoder import generateRows, legacyDecode
+
+
+@pytest.fixture
+def decoder():
+    return VertexDecoder()
+
+
+def test_decoder_reads_the_vertex_label(decoder):
+    node = decoder.decodeVertex({T.id: 7, T.label: 'Function', 'nodeId': ['fn_1'], 'name': ['foo']})
+    assert (node.id, node.type, node.name) == ('fn_1', 'Function', 'foo')
+
+
+def test_decoder_flattens_values_and_keeps_unknown_keys_as_properties(decoder):
+    node = decoder.decodeVertex({
+        T.label: 'Class', 'nodeId': ['cl_1'], 'name': ['Foo'], 'filePath': ['/a.py'],
+        'startLine': [3], 'endLine': [9], 'fileId': ['f_1'], 'bases': ['Base'], 'tags': ['x', 'y'],
+    })
+    assert node.filePath == '/a.py' and node.startLine == 3
+    assert node.properties == {'bases': 'Base', 'tags': ['x', 'y']}
+
+
+def test_decoders_match_the_previous_inline_loop(decoder):
+    rows = generateRows(50)
+    assert decoder.decodeVertices(rows) == [legacyDecode(vm) for vm in rows]
+
+
+
+def test_decoder_builds_edges_between_the_projected_ends(decoder):
+    edge = decoder.decodeEdge({'source': 'a', 'target': 'b', 'type': 'CALLS'})
+    assert edge.model_dump() == {'id': 'a->b', 'sourceId': 'a', 'targetId': 'b', 'type': 'CALLS', 'properties': {}}
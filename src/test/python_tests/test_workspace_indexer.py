@@ -0,0 +1,143 @@
+# tests/test_workspace_indexer.py
+import os
+import sqlite3
+import pytest
+from src.graph.index_store import IndexStore
+from src.graph.ingest_cache import IngestCache, fingerprint
+from src.graph.mock_graph_query_service import MockGraphQueryService
+from src.graph.workspace_indexer import WorkspaceIndexer, iterPythonFiles
+
+
+def _write_tree(root):
+    (root / 'pkg').mkdir()
+    (root / 'pkg' / 'a.py').write_text("def a():\n    pass\n\nclass A:\n    def m(self):\n        pass\n")
+    (root / 'pkg' / 'b.py').write_text("async def b():\n    return 1\n")
+    (root / 'pkg' / 'broken.py').write_text("def broken(:\n")
+    (root / 'node_modules').mkdir()
+    (root / 'node_modules' / 'skip.py').write_text("def skipped():\n    pass\n")
+    (root / 'README.md').write_text("not python\n")
+
+
+def test_iter_python_files_prunes_excluded_dirs(tmp_path):
+    _write_tree(tmp_path)
+    # The same rules as the Analyze Functions walk: virtualenvs and .gitignore too.
+    (tmp_path / 'env').mkdir()
+    (tmp_path / 'env' / 'pyvenv.cfg').write_text("home = /usr\n")
+    (tmp_path / 'env' / 'lib.py').write_text("def vendored():\n    pass\n")
+    (tmp_path / 'generated').mkdir()
+    (tmp_path / 'generated' / 'out.py').write_text("x = 1\n")
+    (tmp_path / '.gitignore').write_text("generated/\n")
+    found = sorted(p.replace(str(tmp_path), '') for p in iterPythonFiles(str(tmp_path)))
+    assert [p.replace('\\', '/') for p in found] == ['/pkg/a.py', '/pkg/b.py', '/pkg/broken.py']
+
+
+def test_index_parses_in_pool_and_writes_batches(tmp_path):
+    _write_tree(tmp_path)
+    service = MockGraphQueryService()
+    cache = IngestCache()
+    progress = []
+    indexer = WorkspaceIndexer(service, jobs=2, parseChunk=1, writeBatch=1,
+                               ingestCache=cache, onProgress=lambda done, total: progress.append((done, total)))
+
+    summary = indexer.index([str(tmp_path)])
+
+    assert (summary.files, summary.indexed, summary.failed) == (3, 2, 1)
+    assert 'broken.py' in summary.errors[0]
+    assert {n.name for n in service.getAllNodes(nodeType='Function')} == {'a', 'm', 'b'}
+    assert progress[0] == (0, 3) and progress[-1] == (3, 3)
+    a_path = str(tmp_path / 'pkg' / 'a.py')
+    assert cache.isIngested(a_path, fingerprint((tmp_path / 'pkg' / 'a.py').read_text())[0])
+
+
+def test_skip_filter_leaves_files_out(tmp_path):
+    _write_tree(tmp_path)
+    service = MockGraphQueryService()
+    indexer = WorkspaceIndexer(service, jobs=1, shouldSkip=lambda path: path.endswith('a.py'))
+    summary = indexer.index([str(tmp_path)])
+    assert summary.skipped == 1 and summary.indexed == 1
+    assert {n.name for n in service.getAllNodes(nodeType='Function')} == {'b'}
+
+
+def test_index_store_skips_unchanged_files_and_removes_deleted(tmp_path):
+    root = tmp_path / 'ws'
+    root.mkdir()
+    _write_tree(root)
+    store = IndexStore(str(tmp_path / 'index.sqlite'))
+    service = MockGraphQueryService()
+    first = WorkspaceIndexer(service, jobs=1, indexStore=store).index([str(root)])
+    assert first.indexed == 2 and first.unchanged == 0
+
+    # Same mtime and size: nothing is parsed. Touched but identical: hash check skips it.
+    b_path = root / 'pkg' / 'b.py'
+    os.utime(b_path, ns=(b_path.stat().st_atime_ns, b_path.stat().st_mtime_ns + 10**9))
+    (root / 'pkg' / 'a.py').unlink()
+    service = MockGraphQueryService()
+    service.ingestParsedCodeBatch = lambda models: pytest.fail("nothing should be re-ingested")
+    second = WorkspaceIndexer(service, jobs=1, indexStore=IndexStore(store.dbPath)).index([str(root)])
+
+    assert (second.indexed, second.unchanged, second.removed) == (0, 1, 1)
+    assert 'a.py' not in ' '.join(IndexStore(store.dbPath).loadAll())
+
+
+def test_index_store_keeps_models_and_opens_stores_without_them(tmp_path):
+    db_path = str(tmp_path / 'old.sqlite')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE files (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,'
+                 ' digest TEXT NOT NULL, node_ids TEXT NOT NULL)')
+    conn.execute("INSERT INTO files VALUES ('/w/old.py', 1, 2, 'd', '[]')")
+    conn.commit()
+    conn.close()
+
+    store = IndexStore(db_path)
+    assert store.loadAll()['/w/old.py'].model is None
+    root = tmp_path / 'ws'
+    root.mkdir()
+    _write_tree(root)
+    WorkspaceIndexer(MockGraphQueryService(), jobs=1, indexStore=store).index([str(root)])
+    records = IndexStore(db_path).loadAll()
+    model = records[str(root / 'pkg' / 'b.py')].model
+    assert model is not None and [f.name for f in model.functions] == ['b']
+
+
+class SeedRecordingService(MockGraphQueryService):
+    def __init__(self):
+        super().__init__()
+        self.seeded = []
+
+    def seedSymbols(self, parsedCodes):
+        self.seeded.extend(model.file.filePath for model in parsedCodes)
+        return len(parsedCodes)
+
+
+def test_warm_start_seeds_skipped_files_and_forgets_deleted_ones(tmp_path):
+    root = tmp_path / 'ws'
+    root.mkdir()
+    _write_tree(root)
+    store = IndexStore(str(tmp_path / 'index.sqlite'))
+    cache = IngestCache()
+    WorkspaceIndexer(MockGraphQueryService(), jobs=1, indexStore=store, ingestCache=cache).index([str(root)])
+    a_path, b_path = str(root / 'pkg' / 'a.py'), str(root / 'pkg' / 'b.py')
+    a_digest = fingerprint((root / 'pkg' / 'a.py').read_text())[0]
+    (root / 'pkg' / 'a.py').unlink()
+
+    service = SeedRecordingService()
+    summary = WorkspaceIndexer(service, jobs=1, indexStore=IndexStore(store.dbPath), ingestCache=cache).index([str(root)])
+
+    assert (summary.unchanged, summary.removed) == (1, 1)
+    # The skipped file's symbols reach the table; the deleted one is known before it goes.
+    assert sorted(service.seeded) == [a_path, b_path]
+    assert not cache.isIngested(a_path, a_digest)
+
+
+def test_records_without_models_are_parsed_again(tmp_path):
+    root = tmp_path / 'ws'
+    root.mkdir()
+    _write_tree(root)
+    store = IndexStore(str(tmp_path / 'index.sqlite'))
+    WorkspaceIndexer(MockGraphQueryService(), jobs=1, indexStore=store).index([str(root)])
+    store.upsertMany(record._replace(model=None) for record in store.loadAll().values())
+
+    summary = WorkspaceIndexer(MockGraphQueryService(), jobs=1, indexStore=store).index([str(root)])
+    # Same content, so the hash check still spares the graph write.
+    assert (summary.unchanged, summary.indexed) == (2, 0)
+    assert all(record.model is not None for record in store.loadAll().values())